@@ -7,6 +7,9 @@ from datetime import datetime
 # --- PAGE CONFIGURATION (must be first Streamlit command) ---
 st.set_page_config(page_title="HRL Project Tracker", layout="wide")
 
+# Run queued background jobs (calendar publishing, emails) in the app process only
+data_manager.start_job_worker()
+
 # --- AUTHENTICATION FUNCTIONS (using the database) ---
 
 def check_login(username, password):
@@ -177,5 +180,19 @@ else:
         st.session_state.user_data = None
         st.rerun()
 
-    # --- Run the selected page ---
-    pg.run()
+    # --- Run the selected page (profiled when page profiling is on) ---
+    page_name = "Notifications" if pg.title == notif_title else pg.title
+    with data_manager.profile_page(page_name, user=user_email) as profile:
+        pg.run()
+
+    if profile is not None and user_role == 'admin':
+        with st.sidebar.expander("⏱️ Page profile"):
+            st.write(f"**{profile['ms']:,.0f} ms** for this rerun of {page_name}")
+            st.write(f"{profile['queries']} queries ({profile['query_ms']:,.0f} ms), "
+                     f"{profile['frame_copies']} DataFrame copies, "
+                     f"{profile['rows_read']:,} rows read, {profile['rows_copied']:,} rows copied")
+            if profile['spans']:
+                spans = pd.DataFrame(profile['spans'], columns=['function', 'ms'])
+                spans = spans.groupby('function', as_index=False).agg(calls=('ms', 'size'), ms=('ms', 'sum'))
+                st.dataframe(spans.sort_values('ms', ascending=False).head(10).round({'ms': 1}),
+                             hide_index=True, width='stretch')
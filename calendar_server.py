@@ -1,6 +1,11 @@
-from flask import Flask, request, Response
+from flask import Flask, request, Response, jsonify
 import sys
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 # Make sure project root is importable
 proj_root = os.path.dirname(__file__)
@@ -8,11 +13,175 @@ if proj_root not in sys.path:
     sys.path.insert(0, proj_root)
 
 import data_manager
-import ics_export
 import pandas as pd
 
 app = Flask(__name__)
 
+
+def _env_flag(name, default='false'):
+    return os.environ.get(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# --- Serving settings ---
+# Read by serve_production(); `python calendar_server.py` without --production (or
+# CALENDAR_SERVER_MODE=production) keeps using Flask's development server.
+HOST = os.environ.get('CALENDAR_SERVER_HOST', '0.0.0.0')
+PORT = int(os.environ.get('CALENDAR_SERVER_PORT', 5005))
+WORKERS = int(os.environ.get('CALENDAR_SERVER_WORKERS', 2))
+THREADS = int(os.environ.get('CALENDAR_SERVER_THREADS', 8))
+KEEPALIVE = int(os.environ.get('CALENDAR_SERVER_KEEPALIVE', 5))
+TIMEOUT = int(os.environ.get('CALENDAR_SERVER_TIMEOUT', 60))
+# Render the all-tasks, per-bucket and per-year feeds ahead of time after each change
+PRECOMPUTE = _env_flag('CALENDAR_SERVER_PRECOMPUTE')
+PRECOMPUTE_INTERVAL = float(os.environ.get('CALENDAR_SERVER_PRECOMPUTE_INTERVAL', 10))
+
+# --- Rendered feed cache ---
+# Calendar clients poll the feed often. Rendered feeds are kept per (bucket, year)
+# together with the shared tasks data version they were built from, and answered
+# from memory (or with 304 Not Modified) until a task is written.
+FEED_CACHE_SIZE = int(os.environ.get('CALENDAR_FEED_CACHE_SIZE', 32))
+# Larger feeds are streamed without being kept
+FEED_CACHE_MAX_BYTES = int(os.environ.get('CALENDAR_FEED_CACHE_MAX_BYTES', 20 * 1024 * 1024))
+
+_feed_cache = OrderedDict()
+_feed_lock = threading.Lock()
+_feed_stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'uncached': 0, 'precomputed': 0}
+_last_version = None
+_precomputed_keys = 0
+_precompute_started = False
+_precompute_stats = {'version': None, 'feeds': 0, 'seconds': None, 'error': None}
+_started_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _count(outcome):
+    with _feed_lock:
+        _feed_stats[outcome] += 1
+
+
+def _feed_validators(version, changed_at, bucket, year):
+    """ETag and Last-Modified for a feed built from the given tasks data version."""
+    digest = hashlib.sha1(f"{version}|{bucket}|{year}".encode('utf-8')).hexdigest()[:20]
+    if changed_at is None:
+        last_modified = _started_at
+    else:
+        last_modified = pd.Timestamp(changed_at)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.tz_localize(datetime.now().astimezone().tzinfo)
+        last_modified = last_modified.tz_convert('UTC').floor('s').to_pydatetime()
+    return digest, last_modified
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _feed_response(body, etag, last_modified, status=200):
+    response = Response(body, status=status, mimetype='text/calendar')
+    # Weak: two workers may render the same data with different DTSTAMPs for never-edited tasks
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _get_cached_feed(key, version):
+    with _feed_lock:
+        entry = _feed_cache.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        _feed_cache.move_to_end(key)
+        return entry[1]
+
+
+def _store_feed(key, version, body):
+    with _feed_lock:
+        # Feeds built from an older version will never be served again
+        for stale in [k for k, entry in _feed_cache.items() if entry[0] != version]:
+            del _feed_cache[stale]
+        _feed_cache[key] = (version, body)
+        _feed_cache.move_to_end(key)
+        while len(_feed_cache) > max(FEED_CACHE_SIZE, _precomputed_keys):
+            _feed_cache.popitem(last=False)
+
+
+def _stream_and_cache(chunks, key, version):
+    """Pass the chunks through, keeping a copy to cache once the feed is complete."""
+    parts, size = [], 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size <= FEED_CACHE_MAX_BYTES:
+                parts.append(chunk)
+            else:
+                parts = None
+        yield chunk
+    if parts is not None and FEED_CACHE_SIZE > 0:
+        _store_feed(key, version, b''.join(parts))
+
+
+# --- Precomputed feeds ---
+def _feed_keys():
+    """(bucket, year) query keys of the all-tasks feed and every per-bucket and per-year feed."""
+    options = data_manager.load_tasks(columns=['PLANNER BUCKET', 'Fiscal Year'])
+    if options is None:
+        return [(None, None)]
+    buckets = sorted(options['PLANNER BUCKET'].dropna().unique())
+    years = sorted(int(y) for y in pd.to_numeric(options['Fiscal Year'], errors='coerce').dropna().unique())
+    return [(None, None)] + [(b, None) for b in buckets] + [(None, str(y)) for y in years]
+
+
+def precompute_feeds():
+    """Render every standard feed for the current tasks version into the feed cache.
+    Returns the number of feeds rendered (0 if they were already current)."""
+    global _precomputed_keys
+    version, _ = data_manager.sync_data_version('tasks')
+    if version is None or version == _precompute_stats['version']:
+        return 0
+    started = time.perf_counter()
+    keys = _feed_keys()
+    _precomputed_keys = len(keys)
+    for bucket, year in keys:
+        build = data_manager.build_calendar(years=year, buckets=bucket)
+        if build is None:
+            continue
+        body = build['ics']
+        if len(body) <= FEED_CACHE_MAX_BYTES:
+            _store_feed((bucket, year), version, body)
+    with _feed_lock:
+        _feed_stats['precomputed'] += len(keys)
+        _precompute_stats.update(version=version, feeds=len(keys),
+                                 seconds=round(time.perf_counter() - started, 3), error=None)
+    return len(keys)
+
+
+def _precompute_loop():
+    while True:
+        try:
+            precompute_feeds()
+        except Exception as e:
+            with _feed_lock:
+                _precompute_stats['error'] = str(e)
+        time.sleep(PRECOMPUTE_INTERVAL)
+
+
+@app.before_request
+def _start_precompute():
+    """Start the precompute thread in whichever process ends up serving requests
+    (each gunicorn worker keeps its own feed cache)."""
+    global _precompute_started
+    if not PRECOMPUTE or _precompute_started:
+        return
+    with _feed_lock:
+        if _precompute_started:
+            return
+        _precompute_started = True
+    threading.Thread(target=_precompute_loop, name='calendar-precompute', daemon=True).start()
+
+
 @app.route('/calendar.ics')
 def calendar_feed():
     """Return an ICS calendar for all tasks or filtered by query params.
@@ -20,30 +189,111 @@ def calendar_feed():
     Query params supported:
     - bucket: planner bucket name (exact match)
     - year: fiscal year (string or number)
+
+    Responses carry an ETag and Last-Modified derived from the tasks data version,
+    and conditional requests are answered with 304 while no task has changed.
     """
     try:
-        df = data_manager.load_table('tasks')
-        if df is None:
+        bucket = request.args.get('bucket') or None
+        year = request.args.get('year') or None
+        key = (bucket, year)
+
+        global _last_version
+        version, changed_at = data_manager.sync_data_version('tasks')
+        _last_version = version
+        if version is not None:
+            etag, last_modified = _feed_validators(version, changed_at, bucket, year)
+            if _not_modified(etag, last_modified):
+                _count('not_modified')
+                return _feed_response(b'', etag, last_modified, status=304)
+            body = _get_cached_feed(key, version)
+            if body is not None:
+                _count('hits')
+                return _feed_response(body, etag, last_modified)
+
+        # Stream the calendar chunk by chunk so large feeds start arriving immediately
+        # (errors after this point can only cut the response short)
+        chunks = data_manager.calendar_ics_chunks(years=year, buckets=bucket)
+        if chunks is None:
             return Response('No data available', status=500)
+        if version is None:
+            # No shared data version to validate against: serve without caching
+            _count('uncached')
+            return Response(chunks, mimetype='text/calendar')
+        _count('misses')
+        return _feed_response(_stream_and_cache(chunks, key, version), etag, last_modified)
+    except Exception as e:
+        return Response(f'Error generating calendar: {e}', status=500)
 
-        bucket = request.args.get('bucket')
-        year = request.args.get('year')
 
-        if bucket:
-            df = df[df['PLANNER BUCKET'] == bucket]
-        if year:
-            df = df[df['Fiscal Year'].astype(str) == str(year)]
+@app.route('/calendar/stats')
+def calendar_stats():
+    """Feed cache counters as JSON."""
+    with _feed_lock:
+        stats = dict(_feed_stats)
+        stats['entries'] = len(_feed_cache)
+        stats['cached_bytes'] = sum(len(entry[1]) for entry in _feed_cache.values())
+    served = stats['hits'] + stats['misses'] + stats['not_modified']
+    stats['hit_rate'] = round((stats['hits'] + stats['not_modified']) / served, 3) if served else 0.0
+    stats['tasks_version'] = _last_version
+    stats['cache_size'] = FEED_CACHE_SIZE
+    stats['pid'] = os.getpid()
+    if PRECOMPUTE:
+        with _feed_lock:
+            stats['precompute'] = dict(_precompute_stats)
+    return jsonify(stats)
 
-        # Keep only rows with START and END
-        df = df[pd.notna(df['START']) & pd.notna(df['END'])]
 
-        ics_bytes = ics_export.generate_ics_from_df(df, calendar_name='HRL Project Tracker')
-        return Response(ics_bytes, mimetype='text/calendar')
-    except Exception as e:
-        return Response(f'Error generating calendar: {e}', status=500)
+# --- Production entry point ---
+def _after_fork(server, worker):
+    # Don't share the parent's pooled database connections with the worker
+    data_manager.engine.dispose(close=False)
+
+
+def serve_production():
+    """Serve the app with a production WSGI server.
+
+    gunicorn (Linux/macOS) runs CALENDAR_SERVER_WORKERS processes with
+    CALENDAR_SERVER_THREADS threads each; waitress (any platform, including
+    Windows) runs one process with CALENDAR_SERVER_THREADS threads and ignores
+    CALENDAR_SERVER_WORKERS and CALENDAR_SERVER_TIMEOUT.
+    """
+    if os.name != 'nt':
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            BaseApplication = None
+        if BaseApplication is not None:
+            class _Gunicorn(BaseApplication):
+                def load_config(self):
+                    self.cfg.set('bind', f'{HOST}:{PORT}')
+                    self.cfg.set('workers', WORKERS)
+                    self.cfg.set('threads', THREADS)
+                    self.cfg.set('worker_class', 'gthread')
+                    self.cfg.set('keepalive', KEEPALIVE)
+                    self.cfg.set('timeout', TIMEOUT)
+                    self.cfg.set('post_fork', _after_fork)
+
+                def load(self):
+                    return app
+
+            print(f"Serving calendar feed with gunicorn on {HOST}:{PORT} ({WORKERS} workers x {THREADS} threads)")
+            _Gunicorn().run()
+            return
+    try:
+        from waitress import serve
+    except ImportError:
+        print("No production server installed: pip install waitress (or gunicorn on Linux/macOS)")
+        sys.exit(1)
+    print(f"Serving calendar feed with waitress on {HOST}:{PORT} ({THREADS} threads)")
+    _start_precompute()
+    # waitress has no per-request timeout; idle keep-alive connections close after KEEPALIVE seconds
+    serve(app, host=HOST, port=PORT, threads=THREADS, channel_timeout=KEEPALIVE)
+
 
 if __name__ == '__main__':
-    # Default host/port; can be changed by environment variables
-    host = os.environ.get('CALENDAR_SERVER_HOST', '0.0.0.0')
-    port = int(os.environ.get('CALENDAR_SERVER_PORT', 5005))
-    app.run(host=host, port=port)
+    if '--production' in sys.argv[1:] or os.environ.get('CALENDAR_SERVER_MODE', '').lower() == 'production':
+        serve_production()
+    else:
+        # Development server; host/port can be changed by environment variables
+        app.run(host=HOST, port=PORT)
@@ -1,20 +1,38 @@
 # File: data_manager.py
 import streamlit as st
 from streamlit.errors import StreamlitSecretNotFoundError
+from streamlit.runtime.scriptrunner import RerunException, StopException
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError
+import numpy as np
+from sqlalchemy import (create_engine, text, MetaData, Table, select, and_, or_, bindparam, inspect,
+                        column, literal_column, table as sql_table, DateTime, Integer, func, event,
+                        Column, Index, String, Text, case)
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.exc import OperationalError, NoSuchTableError, TimeoutError as PoolTimeoutError
 from datetime import datetime
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from icalendar import Calendar, Event
-import uuid
+from icalendar import Calendar
 import os
 import json
 import sqlite3
 import hashlib
+import gzip
+import re
+import threading
+import atexit
+import functools
+import types
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from inspect import isgeneratorfunction
+from concurrent.futures import ThreadPoolExecutor
+import time
 import secrets as _secrets
+import db_schema
+import ics_export
 try:
     import boto3
     from botocore.exceptions import BotoCoreError, NoCredentialsError
@@ -73,7 +91,8 @@ def _safe_secret(key, default=None):
 
 # --- Database Connection ---
 # Prefer explicit secret access but handle missing secrets.toml gracefully.
-DB_CONNECTION_STRING = _safe_secret("db_connection_string")
+# DB_CONNECTION_STRING in the environment wins (e.g. scripts pointed at a scratch database).
+DB_CONNECTION_STRING = os.environ.get('DB_CONNECTION_STRING') or _safe_secret("db_connection_string")
 
 # Fallback to a local SQLite file for development if no connection string is provided.
 if not DB_CONNECTION_STRING:
@@ -87,11 +106,440 @@ if not DB_CONNECTION_STRING:
         # If st isn't fully initialized (tests, import-time), don't fail.
         pass
 
-# For sqlite, include connect_args to be safe in multi-threaded contexts
+
+def _db_setting(key, default, cast=str):
+    """Read a database tuning setting from the environment (upper case) or secrets (lower case)."""
+    value = os.environ.get(key.upper())
+    if value is None:
+        value = _safe_secret(key.lower())
+    if value is None or value == '':
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _as_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Pool sizing (both SQLite and Postgres). Defaults suit a single Streamlit process;
+# raise DB_POOL_SIZE if the pool statistics on the Admin Dashboard show waiting.
+DB_POOL_SIZE = _db_setting('DB_POOL_SIZE', 5, int)
+DB_MAX_OVERFLOW = _db_setting('DB_MAX_OVERFLOW', 10, int)
+DB_POOL_TIMEOUT = _db_setting('DB_POOL_TIMEOUT', 30.0, float)
+DB_POOL_RECYCLE = _db_setting('DB_POOL_RECYCLE', 1800, int)
+DB_POOL_PRE_PING = _db_setting('DB_POOL_PRE_PING', True, _as_bool)
+
+# SQLite pragmas applied to every new connection. WAL lets readers run while a
+# write is in progress; NORMAL synchronous is safe with WAL and much faster.
+SQLITE_JOURNAL_MODE = _db_setting('DB_SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = _db_setting('DB_SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = _db_setting('DB_SQLITE_BUSY_TIMEOUT_MS', 5000, int)
+SQLITE_MMAP_SIZE = _db_setting('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024, int)
+SQLITE_CACHE_SIZE_KB = _db_setting('DB_SQLITE_CACHE_SIZE_KB', 16 * 1024, int)
+
+# --- Connection pool statistics ---
+_POOL_WAIT_SAMPLES = deque(maxlen=1000)
+_POOL_STATS = {'checkouts': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+_pool_stats_lock = threading.Lock()
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with _pool_stats_lock:
+                _POOL_STATS['timeouts'] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with _pool_stats_lock:
+                _POOL_STATS['checkouts'] += 1
+                _POOL_STATS['total_wait'] += waited
+                _POOL_STATS['max_wait'] = max(_POOL_STATS['max_wait'], waited)
+                _POOL_WAIT_SAMPLES.append(waited)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+        if _SQLITE_FILE_DB and SQLITE_JOURNAL_MODE:
+            cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        if SQLITE_SYNCHRONOUS:
+            cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        if _SQLITE_FILE_DB and SQLITE_MMAP_SIZE:
+            cursor.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+        if SQLITE_CACHE_SIZE_KB:
+            # Negative cache_size is in KiB rather than pages
+            cursor.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+    finally:
+        cursor.close()
+
+
+_SQLITE_FILE_DB = False
 if DB_CONNECTION_STRING.startswith('sqlite'):
-    engine = create_engine(DB_CONNECTION_STRING, connect_args={"check_same_thread": False})
+    _sqlite_url = make_url(DB_CONNECTION_STRING)
+    _SQLITE_FILE_DB = _sqlite_url.database not in (None, '', ':memory:')
+    if _SQLITE_FILE_DB:
+        # include check_same_thread so pooled connections can move between Streamlit threads
+        engine = create_engine(DB_CONNECTION_STRING, connect_args={"check_same_thread": False},
+                               poolclass=_TimedQueuePool, pool_size=DB_POOL_SIZE,
+                               max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    else:
+        # An in-memory database only exists inside its one connection
+        engine = create_engine(DB_CONNECTION_STRING, connect_args={"check_same_thread": False},
+                               poolclass=StaticPool)
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
 else:
-    engine = create_engine(DB_CONNECTION_STRING)
+    engine = create_engine(DB_CONNECTION_STRING, poolclass=_TimedQueuePool, pool_size=DB_POOL_SIZE,
+                           max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                           pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+
+
+def get_pool_stats():
+    """Return connection pool settings, current usage and checkout wait times (in ms) as a dict."""
+    pool = engine.pool
+    with _pool_stats_lock:
+        samples = sorted(_POOL_WAIT_SAMPLES)
+        stats = dict(_POOL_STATS)
+
+    def _percentile(q):
+        if not samples:
+            return 0.0
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 3)
+
+    checkouts = stats['checkouts']
+    return {
+        'pool': type(pool).__name__,
+        'pool_size': pool.size() if hasattr(pool, 'size') else None,
+        'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+        'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'timeout_s': DB_POOL_TIMEOUT,
+        'checkouts': checkouts,
+        'timeouts': stats['timeouts'],
+        'avg_wait_ms': round(stats['total_wait'] / checkouts * 1000, 3) if checkouts else 0.0,
+        'p50_wait_ms': _percentile(0.50),
+        'p95_wait_ms': _percentile(0.95),
+        'max_wait_ms': round(stats['max_wait'] * 1000, 3),
+    }
+
+
+def reset_pool_stats():
+    """Zero the pool checkout counters (e.g. after resizing the pool)."""
+    with _pool_stats_lock:
+        _POOL_WAIT_SAMPLES.clear()
+        _POOL_STATS.update({'checkouts': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+
+
+# --- Timing spans ---
+# Every public function of this module (wrapped at the bottom of the file) and the
+# phases of the heavier ones (timed_span below) record how long they took into an
+# in-memory ring buffer, summarized on the Admin Dashboard by get_timing_stats().
+# TIMING_LOG names a file the spans are also appended to (JSON lines), so they
+# survive a restart and can be analysed offline; TIMING_ENABLED=false turns it off.
+TIMING_ENABLED = _db_setting('TIMING_ENABLED', True, _as_bool)
+TIMING_BUFFER_SIZE = _db_setting('TIMING_BUFFER_SIZE', 50000, int)
+TIMING_LOG = _db_setting('TIMING_LOG', '')
+_TIMING_LOG_BATCH = 200
+# Called per row or per widget option; timing them would only add noise
+_UNTIMED_FUNCTIONS = {'format_fy', 'timed_span', 'get_timing_stats', 'reset_timing_stats', 'flush_timing_log'}
+
+_TIMINGS = deque(maxlen=TIMING_BUFFER_SIZE)
+_pending_timing_log = []
+_timing_lock = threading.Lock()
+
+
+def _record_timing(name, seconds, ok):
+    entry = (time.time(), name, seconds, ok)
+    profile = getattr(_page_profile, 'current', None)
+    if profile is not None:
+        profile['spans'].append((name, seconds * 1000))
+    flush = None
+    with _timing_lock:
+        _TIMINGS.append(entry)
+        if TIMING_LOG:
+            _pending_timing_log.append(entry)
+            if len(_pending_timing_log) >= _TIMING_LOG_BATCH:
+                flush = _pending_timing_log[:]
+                _pending_timing_log.clear()
+    if flush:
+        _write_timing_log(flush)
+
+
+def _write_timing_log(entries):
+    try:
+        with open(TIMING_LOG, 'a', encoding='utf-8') as f:
+            for ended_at, name, seconds, ok in entries:
+                f.write(json.dumps({'ended_at': round(ended_at, 3), 'name': name,
+                                    'ms': round(seconds * 1000, 3), 'ok': ok}) + '\n')
+    except Exception as e:
+        print(f"Could not write timing log {TIMING_LOG}: {e}")
+
+
+def flush_timing_log():
+    """Append spans not yet written to TIMING_LOG (also done when the process exits)."""
+    with _timing_lock:
+        entries = _pending_timing_log[:]
+        _pending_timing_log.clear()
+    if entries:
+        _write_timing_log(entries)
+
+
+atexit.register(flush_timing_log)
+
+
+@contextmanager
+def timed_span(name):
+    """Record the time spent in the `with` block under `name` (e.g. 'save_and_log_changes: diff')."""
+    if not TIMING_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        _record_timing(name, time.perf_counter() - started, ok)
+
+
+def _timed(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not TIMING_ENABLED:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            _record_timing(fn.__name__, time.perf_counter() - started, ok)
+    return wrapper
+
+
+def get_timing_stats(window_seconds=None):
+    """
+    Summarize the recorded spans, optionally only those that ended in the last
+    `window_seconds`. Returns a DataFrame with one row per function or phase: calls,
+    errors (calls that raised), total / p50 / p95 / p99 / max milliseconds, slowest first.
+    """
+    with _timing_lock:
+        entries = list(_TIMINGS)
+    columns = ['function', 'calls', 'errors', 'total_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    if window_seconds is not None:
+        since = time.time() - window_seconds
+        entries = [e for e in entries if e[0] >= since]
+    if not entries:
+        return pd.DataFrame(columns=columns)
+    spans = pd.DataFrame(entries, columns=['ended_at', 'function', 'seconds', 'ok'])
+    spans['ms'] = spans['seconds'] * 1000
+    grouped = spans.groupby('function')['ms']
+    stats = pd.DataFrame({
+        'calls': grouped.size(),
+        'errors': (~spans['ok']).groupby(spans['function']).sum(),
+        'total_ms': grouped.sum(),
+        'p50_ms': grouped.quantile(0.50),
+        'p95_ms': grouped.quantile(0.95),
+        'p99_ms': grouped.quantile(0.99),
+        'max_ms': grouped.max(),
+    }).reset_index().rename(columns={'index': 'function'})
+    stats = stats.sort_values('total_ms', ascending=False, ignore_index=True)
+    return stats.round({'total_ms': 1, 'p50_ms': 2, 'p95_ms': 2, 'p99_ms': 2, 'max_ms': 2})[columns]
+
+
+def reset_timing_stats():
+    """Forget every recorded span (the TIMING_LOG file is left alone)."""
+    with _timing_lock:
+        _TIMINGS.clear()
+
+
+# --- Page profiling ---
+# Opt-in (PAGE_PROFILING=true, or the toggle on the Admin Dashboard): Main.py runs the
+# selected page inside profile_page(), which counts what one rerun of that page cost:
+# wall time, SQL statements and the time spent in them, DataFrame copies, rows read
+# from the database and rows copied, plus the data_manager spans recorded meanwhile.
+# Streamlit runs each session's script in its own thread, so the counters are
+# per thread. Finished runs are kept in memory for get_page_profile_stats() and,
+# with PAGE_PROFILE_LOG set, appended to that file (JSON lines) so runs from many
+# sessions and restarts can be aggregated with read_page_profile_log().
+PAGE_PROFILING = _db_setting('PAGE_PROFILING', False, _as_bool)
+PAGE_PROFILE_LOG = _db_setting('PAGE_PROFILE_LOG', '')
+PAGE_PROFILE_BUFFER_SIZE = _db_setting('PAGE_PROFILE_BUFFER_SIZE', 5000, int)
+PAGE_PROFILE_COLUMNS = ['ended_at', 'page', 'user', 'ms', 'ok', 'queries', 'query_ms',
+                        'frame_copies', 'rows_read', 'rows_copied']
+_UNTIMED_FUNCTIONS |= {'profile_page', 'set_page_profiling'}
+
+_PAGE_PROFILES = deque(maxlen=PAGE_PROFILE_BUFFER_SIZE)
+_page_profile = threading.local()
+_original_frame_copy = None
+
+
+def _active_profile():
+    return getattr(_page_profile, 'current', None)
+
+
+def _profile_add(counter, amount=1):
+    profile = _active_profile()
+    if profile is not None:
+        profile[counter] += amount
+
+
+def _counting_frame_copy(self, *args, **kwargs):
+    profile = _active_profile()
+    if profile is not None:
+        profile['frame_copies'] += 1
+        profile['rows_copied'] += len(self)
+    return _original_frame_copy(self, *args, **kwargs)
+
+
+def _install_copy_counter():
+    # DataFrame.copy is only replaced once profiling is turned on; the wrapper counts
+    # nothing in threads that aren't running a profiled page
+    global _original_frame_copy
+    if _original_frame_copy is None:
+        _original_frame_copy = pd.DataFrame.copy
+        pd.DataFrame.copy = _counting_frame_copy
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def _profile_query_start(conn, cursor, statement, parameters, context, executemany):
+    if _active_profile() is not None:
+        conn.info['profile_query_started'] = time.perf_counter()
+
+
+@event.listens_for(engine, 'after_cursor_execute')
+def _profile_query_end(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile()
+    started = conn.info.pop('profile_query_started', None)
+    if profile is not None and started is not None:
+        profile['queries'] += 1
+        profile['query_ms'] += (time.perf_counter() - started) * 1000
+
+
+def set_page_profiling(enabled):
+    """Turn page profiling on or off for this app process."""
+    global PAGE_PROFILING
+    PAGE_PROFILING = bool(enabled)
+    if PAGE_PROFILING:
+        _install_copy_counter()
+
+
+@contextmanager
+def profile_page(page_name, user=None):
+    """
+    Profile one run of a page: `with profile_page('Dashboard') as profile: pg.run()`.
+
+    Yields the profile dict (filled in when the block ends, including a 'spans' list of
+    (name, ms) for the data_manager calls made meanwhile), or None when profiling is off.
+    """
+    if not PAGE_PROFILING or _active_profile() is not None:
+        yield None
+        return
+    _install_copy_counter()
+    profile = {'page': page_name, 'user': user, 'queries': 0, 'query_ms': 0.0,
+               'frame_copies': 0, 'rows_read': 0, 'rows_copied': 0, 'spans': []}
+    _page_profile.current = profile
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield profile
+        ok = True
+    except (RerunException, StopException):
+        # st.rerun() and st.stop() end the run early but normally
+        ok = True
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _page_profile.current = None
+        profile.update(ended_at=time.time(), ms=seconds * 1000, ok=ok)
+        entry = {c: profile[c] for c in PAGE_PROFILE_COLUMNS}
+        with _timing_lock:
+            _PAGE_PROFILES.append(entry)
+        _record_timing(f'page: {page_name}', seconds, ok)
+        if PAGE_PROFILE_LOG:
+            _write_page_profile(entry)
+
+
+def _write_page_profile(entry):
+    try:
+        with open(PAGE_PROFILE_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({**entry, 'ended_at': round(entry['ended_at'], 3), 'ms': round(entry['ms'], 3),
+                                'query_ms': round(entry['query_ms'], 3)}) + '\n')
+    except Exception as e:
+        print(f"Could not write page profile log {PAGE_PROFILE_LOG}: {e}")
+
+
+def read_page_profile_log(path=None):
+    """Read the runs appended to PAGE_PROFILE_LOG (or `path`) as a DataFrame; empty if there are none."""
+    path = path or PAGE_PROFILE_LOG
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=PAGE_PROFILE_COLUMNS)
+    try:
+        runs = pd.read_json(path, lines=True)
+    except ValueError as e:
+        print(f"Could not read page profile log {path}: {e}")
+        return pd.DataFrame(columns=PAGE_PROFILE_COLUMNS)
+    return runs.reindex(columns=PAGE_PROFILE_COLUMNS)
+
+
+def summarize_page_profiles(runs):
+    """
+    Aggregate page runs (rows shaped like PAGE_PROFILE_COLUMNS) per page: runs, p50 / p95 /
+    max milliseconds and the average queries, query time, copies and rows per run,
+    slowest total first.
+    """
+    columns = ['page', 'runs', 'errors', 'p50_ms', 'p95_ms', 'max_ms', 'avg_queries', 'avg_query_ms',
+               'avg_frame_copies', 'avg_rows_read', 'avg_rows_copied']
+    if runs is None or runs.empty:
+        return pd.DataFrame(columns=columns)
+    grouped = runs.groupby('page')
+    stats = pd.DataFrame({
+        'runs': grouped.size(),
+        'errors': (~runs['ok'].astype(bool)).groupby(runs['page']).sum(),
+        'total_ms': grouped['ms'].sum(),
+        'p50_ms': grouped['ms'].quantile(0.50),
+        'p95_ms': grouped['ms'].quantile(0.95),
+        'max_ms': grouped['ms'].max(),
+        'avg_queries': grouped['queries'].mean(),
+        'avg_query_ms': grouped['query_ms'].mean(),
+        'avg_frame_copies': grouped['frame_copies'].mean(),
+        'avg_rows_read': grouped['rows_read'].mean(),
+        'avg_rows_copied': grouped['rows_copied'].mean(),
+    }).reset_index()
+    stats = stats.sort_values('total_ms', ascending=False, ignore_index=True)
+    return stats.round({'p50_ms': 1, 'p95_ms': 1, 'max_ms': 1, 'avg_queries': 1, 'avg_query_ms': 1,
+                        'avg_frame_copies': 1, 'avg_rows_read': 0, 'avg_rows_copied': 0})[columns]
+
+
+def get_page_profile_stats(window_seconds=None):
+    """Per-page summary (see summarize_page_profiles) of the runs profiled by this process,
+    optionally only those that ended in the last `window_seconds`."""
+    with _timing_lock:
+        runs = pd.DataFrame(list(_PAGE_PROFILES), columns=PAGE_PROFILE_COLUMNS)
+    if window_seconds is not None:
+        runs = runs[runs['ended_at'] >= time.time() - window_seconds]
+    return summarize_page_profiles(runs)
+
+
+def reset_page_profiles():
+    """Forget the profiled page runs kept in memory (the PAGE_PROFILE_LOG file is left alone)."""
+    with _timing_lock:
+        _PAGE_PROFILES.clear()
+
+
+if PAGE_PROFILING:
+    _install_copy_counter()
+
 
 # Flag to indicate we auto-created the bucket_icons table on this run
 BUCKET_ICONS_AUTO_CREATED = False
@@ -115,31 +563,190 @@ def pop_notifications_auto_created():
 
 # --- Email Configuration ---
 # Use the safe _safe_secret so missing secrets don't raise on import
-SENDER_EMAIL = _safe_secret("SENDER_EMAIL")
-SENDER_PASSWORD = _safe_secret("SENDER_PASSWORD")
-SMTP_SERVER = _safe_secret("SMTP_SERVER", "smtp.gmail.com")
-SMTP_PORT = int(_safe_secret("SMTP_PORT", 587))
+# Environment variables take precedence so a local SMTP stand-in (e.g. aiosmtpd) can be used for testing
+SENDER_EMAIL = os.environ.get("SENDER_EMAIL") or _safe_secret("SENDER_EMAIL")
+SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD") or _safe_secret("SENDER_PASSWORD")
+SMTP_SERVER = os.environ.get("SMTP_SERVER") or _safe_secret("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT") or _safe_secret("SMTP_PORT", 587))
+# Plain, unauthenticated SMTP (SMTP_STARTTLS off, no password) is only meant for local stand-ins
+SMTP_STARTTLS = _as_bool(os.environ.get("SMTP_STARTTLS") or _safe_secret("SMTP_STARTTLS", True))
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT") or _safe_secret("SMTP_TIMEOUT", 30))
+# Messages sent per SMTP session, and how many sessions may be open at once (process-wide)
+SMTP_BATCH_SIZE = int(os.environ.get("SMTP_BATCH_SIZE") or _safe_secret("SMTP_BATCH_SIZE", 50))
+SMTP_MAX_CONNECTIONS = int(os.environ.get("SMTP_MAX_CONNECTIONS") or _safe_secret("SMTP_MAX_CONNECTIONS", 2))
+_smtp_slots = threading.BoundedSemaphore(max(1, SMTP_MAX_CONNECTIONS))
+
+# --- PROCESS-WIDE TABLE CACHE ---
+# Streamlit serves every session from the same process, so a single cache is shared
+# by all of them. Every write bumps a monotonically increasing data version and
+# records it against the table that was written; a cached frame is reused until the
+# version recorded for its table moves on. Writes made by other processes are only
+# seen through sync_data_version() (below), so scripts that edit the database
+# directly should call clear_table_cache().
+_cache_lock = threading.Lock()
+_DATA_VERSION = 0
+_TABLE_VERSIONS = {}
+_TABLE_CACHE = {}
+_CACHE_STATS = {}
+
+
+def get_data_version(table_name=None):
+    """Return the current data version of one table, or of the whole database if no table is given."""
+    with _cache_lock:
+        if table_name is None:
+            return _DATA_VERSION
+        return _TABLE_VERSIONS.get(table_name, 0)
+
+
+def _invalidate_table(table_name):
+    global _DATA_VERSION
+    with _cache_lock:
+        _DATA_VERSION += 1
+        _TABLE_VERSIONS[table_name] = _DATA_VERSION
+        _TABLE_CACHE.pop(table_name, None)
+        if table_name == 'tasks':
+            _TASK_QUERY_CACHE.clear()
+            _CALENDAR_BUILDS.clear()
+            _SEARCH_KEY_CACHE.clear()
+            _FACET_CACHE.clear()
+        return _DATA_VERSION
+
+
+def bump_data_version(table_name):
+    """Mark `table_name` as changed so cached copies of it are reloaded, here and (through
+    the shared counter) in other processes. Returns the new local version."""
+    version = _invalidate_table(table_name)
+    shared = _store_shared_version(table_name)
+    with _cache_lock:
+        # Only skip the next sync if nobody else wrote in between
+        if shared is not None and _SHARED_VERSIONS.get(table_name, 0) == shared - 1:
+            _SHARED_VERSIONS[table_name] = shared
+    return version
+
+
+def clear_table_cache():
+    """Drop every cached table (e.g. after the database was changed outside this process)."""
+    global _DATA_VERSION
+    with _cache_lock:
+        _DATA_VERSION += 1
+        for table_name in set(_TABLE_VERSIONS) | set(_TABLE_CACHE):
+            _TABLE_VERSIONS[table_name] = _DATA_VERSION
+        _TABLE_CACHE.clear()
+        _TASK_QUERY_CACHE.clear()
+        _CALENDAR_BUILDS.clear()
+        _SEARCH_KEY_CACHE.clear()
+        _FACET_CACHE.clear()
+
+
+# --- Shared data versions ---
+# The versions above only see writes made by this process. Every write also bumps a
+# counter for its table in the data_versions table; sync_data_version() compares that
+# counter with the one this process last saw, so another process (calendar_server,
+# a second app instance) can notice a change with one small query.
+_SHARED_VERSIONS = {}
+_shared_versions_ready = False
+
+
+def _ensure_shared_versions():
+    global _shared_versions_ready
+    if not _shared_versions_ready:
+        db_schema.data_versions.create(engine, checkfirst=True)
+        _shared_versions_ready = True
+
+
+def _store_shared_version(table_name):
+    """Increment the shared counter of `table_name`. Returns its new value, or None on failure."""
+    table = db_schema.data_versions
+    try:
+        _ensure_shared_versions()
+        with engine.begin() as conn:
+            now = datetime.now()
+            result = conn.execute(table.update().where(table.c.table_name == table_name)
+                                  .values(version=table.c.version + 1, updated_at=now))
+            if result.rowcount == 0:
+                conn.execute(table.insert().values(table_name=table_name, version=1, updated_at=now))
+            return conn.execute(select(table.c.version).where(table.c.table_name == table_name)).scalar()
+    except Exception as e:
+        print(f"Could not record the shared data version of '{table_name}': {e}")
+        return None
+
+
+def sync_data_version(table_name):
+    """
+    Pick up writes to `table_name` made by other processes.
+
+    Returns (version, changed_at): the shared counter and the time of the last write
+    recorded for the table ((0, None) if it was never written through data_manager).
+    If the counter moved since this process last looked, cached copies of the table
+    are dropped. Returns (None, None) if the counter can't be read.
+    """
+    table = db_schema.data_versions
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(select(table.c.version, table.c.updated_at)
+                               .where(table.c.table_name == table_name)).first()
+    except Exception:
+        return None, None
+    version, changed_at = (row[0], row[1]) if row is not None else (0, None)
+    with _cache_lock:
+        seen = _SHARED_VERSIONS.get(table_name)
+        _SHARED_VERSIONS[table_name] = version
+    if seen != version:
+        _invalidate_table(table_name)
+    return version, changed_at
+
+
+def get_table_cache_stats():
+    """Return cache hit/miss counters as a DataFrame with one row per table."""
+    with _cache_lock:
+        rows = [
+            {'table': name, 'hits': counts['hits'], 'misses': counts['misses'],
+             'version': _TABLE_VERSIONS.get(name, 0), 'cached': name in _TABLE_CACHE}
+            for name, counts in sorted(_CACHE_STATS.items())
+        ]
+    stats = pd.DataFrame(rows, columns=['table', 'hits', 'misses', 'version', 'cached'])
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] / total.where(total > 0)).fillna(0.0).round(3)
+    return stats
+
+
+def _count_cache(table_name, outcome):
+    counts = _CACHE_STATS.setdefault(table_name, {'hits': 0, 'misses': 0})
+    counts[outcome] += 1
+
 
 # --- THE STABLE DATA LOADING FUNCTION ---
 def load_table(table_name):
     """
     Loads any table from the database and correctly handles dates for the 'tasks' table.
+
+    Results are served from the process-wide cache until the table is written again.
+    Every caller gets its own copy, so pages may modify the returned frame freely.
     """
+    with _cache_lock:
+        version = _TABLE_VERSIONS.get(table_name, 0)
+        cached = _TABLE_CACHE.get(table_name)
+        if cached is not None and cached[0] == version:
+            _count_cache(table_name, 'hits')
+            return cached[1].copy()
+        _count_cache(table_name, 'misses')
+
     try:
-        with engine.connect() as conn:
+        with timed_span('load_table: read'), engine.connect() as conn:
             df = pd.read_sql_query(text(f"SELECT * FROM {table_name}"), conn)
+        _profile_add('rows_read', len(df))
         
         if table_name == 'tasks':
-            if 'START' in df.columns:
-                df['START'] = pd.to_datetime(df['START'], errors='coerce')
-            if 'END' in df.columns:
-                df['END'] = pd.to_datetime(df['END'], errors='coerce')
-            if 'PROGRESS' in df.columns:
-                df['PROGRESS'] = df['PROGRESS'].fillna('NOT STARTED')
-            else:
+            with timed_span('load_table: parse'):
+                _prepare_task_columns(df)
+            if 'PROGRESS' not in df.columns:
                 df['PROGRESS'] = 'NOT STARTED'
-            
-        return df
+
+        with _cache_lock:
+            # Only cache if no write happened while we were reading
+            if _TABLE_VERSIONS.get(table_name, 0) == version:
+                _TABLE_CACHE[table_name] = (version, df)
+        return df.copy()
     except Exception as e:
         # Auto-create the bucket_icons table if it doesn't exist (common first-run issue)
         msg = str(e).lower()
@@ -214,161 +821,1430 @@ def load_table(table_name):
             print(f"Failed to load table '{table_name}'. Error: {e}")
         return None
 
+def _prepare_task_columns(df):
+    """Parse task dates and default PROGRESS in place, for whichever of those columns `df` has."""
+    for col in ('START', 'END', TASK_UPDATED_COLUMN):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    if 'PROGRESS' in df.columns:
+        df['PROGRESS'] = df['PROGRESS'].fillna('NOT STARTED')
+
+
+# --- FILTERED TASK QUERIES ---
+# load_tasks() pushes the filters the pages use into the SQL WHERE clause (and the
+# column list into the SELECT), so only the rows and columns a page shows are read.
+# Results are cached per filter set and invalidated with the 'tasks' data version.
+_TASK_QUERY_CACHE_SIZE = 64
+_TASK_QUERY_CACHE = OrderedDict()
+# Task numbers per IN (...) list when reading or indexing a subset of tasks
+_TASK_ID_CHUNK = 500
+
+
+def _as_list(values):
+    if values is None:
+        return None
+    if isinstance(values, (str, int, float)):
+        return [values]
+    return list(values)
+
+
+def _as_year(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return value
+
+
+def _as_timestamp(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or value == '':
+        return None
+    return pd.Timestamp(value)
+
+
+def _tasks_query(years=None, buckets=None, assignees=None, progress=None, start_between=None, columns=None):
+    """Build the SELECT for load_tasks(). Filter arguments are already normalized."""
+    if columns:
+        query = select(*[column(col) for col in columns])
+    else:
+        query = select(literal_column('*'))
+    query = query.select_from(sql_table('tasks'))
+    conditions = _task_conditions(years, buckets, assignees, progress, start_between)
+    if conditions:
+        query = query.where(and_(*conditions))
+    return query
+
+
+def _task_conditions(years=None, buckets=None, assignees=None, progress=None, start_between=None):
+    """WHERE conditions on the tasks table for the load_tasks() filters (already normalized)."""
+    conditions = []
+    if years is not None:
+        conditions.append(column('Fiscal Year').in_(years))
+    if buckets is not None:
+        conditions.append(column('PLANNER BUCKET').in_(buckets))
+    if assignees is not None:
+        conditions.append(column('ASSIGNMENT TITLE').in_(assignees))
+    if progress is not None:
+        progress_col = column('PROGRESS')
+        condition = progress_col.in_(progress)
+        if 'NOT STARTED' in progress:
+            # Missing progress is shown as NOT STARTED everywhere
+            condition = or_(condition, progress_col.is_(None))
+        conditions.append(condition)
+    if start_between is not None:
+        start_col = column('START', DateTime)
+        low, high = start_between
+        if low is not None:
+            conditions.append(start_col >= low.to_pydatetime())
+        if high is not None:
+            if high == high.normalize():
+                # A bare date includes every task starting on that day
+                conditions.append(start_col < (high + pd.Timedelta(days=1)).to_pydatetime())
+            else:
+                conditions.append(start_col <= high.to_pydatetime())
+    return conditions
+
+
+def _normalize_task_filters(years=None, buckets=None, assignees=None, progress=None, start_between=None):
+    years = _as_list(years)
+    if years is not None:
+        years = [_as_year(y) for y in years]
+    if start_between is not None:
+        start_between = tuple(_as_timestamp(v) for v in start_between)
+    return {'years': years, 'buckets': _as_list(buckets), 'assignees': _as_list(assignees),
+            'progress': _as_list(progress), 'start_between': start_between}
+
+
+def load_tasks(years=None, buckets=None, assignees=None, progress=None, start_between=None, columns=None):
+    """
+    Loads only the tasks matching the given filters, with the filtering done in SQL.
+
+    years, buckets, assignees (ASSIGNMENT TITLE) and progress each take a value or a
+    list of values; None means "don't filter on this". start_between is a
+    (start, end) pair of dates, inclusive, where either end may be None.
+    columns limits which columns are read (all of them by default).
+    Returns a DataFrame shaped like load_table('tasks'), or None on failure.
+    Every caller gets its own copy, so pages may modify the returned frame freely.
+    """
+    filters = _normalize_task_filters(years, buckets, assignees, progress, start_between)
+    years, buckets, assignees, progress, start_between = filters.values()
+    columns = _as_list(columns)
+
+    cache_key = tuple(
+        None if v is None else tuple(map(str, v))
+        for v in (years, buckets, assignees, progress, start_between, columns)
+    )
+    with _cache_lock:
+        version = _TABLE_VERSIONS.get('tasks', 0)
+        cached = _TASK_QUERY_CACHE.get(cache_key)
+        if cached is not None and cached[0] == version:
+            _TASK_QUERY_CACHE.move_to_end(cache_key)
+            _count_cache('tasks (filtered)', 'hits')
+            return cached[1].copy()
+        _count_cache('tasks (filtered)', 'misses')
+
+    try:
+        query = _tasks_query(years, buckets, assignees, progress, start_between, columns)
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        _profile_add('rows_read', len(df))
+        _prepare_task_columns(df)
+
+        with _cache_lock:
+            if _TABLE_VERSIONS.get('tasks', 0) == version:
+                _TASK_QUERY_CACHE[cache_key] = (version, df)
+                _TASK_QUERY_CACHE.move_to_end(cache_key)
+                while len(_TASK_QUERY_CACHE) > _TASK_QUERY_CACHE_SIZE:
+                    _TASK_QUERY_CACHE.popitem(last=False)
+        return df.copy()
+    except Exception as e:
+        try:
+            st.error(f"Failed to load tasks. Error: {e}")
+        except Exception:
+            print(f"Failed to load tasks. Error: {e}")
+        return None
+
+
+# --- Facet counts ---
+# The distinct values, with task counts, that the filter dropdowns offer, counted with
+# GROUP BY in the database instead of unique()/value_counts() on the whole table.
+# Results are cached per filter set and invalidated with the 'tasks' data version.
+FACET_FIELDS = ['PLANNER BUCKET', 'Fiscal Year', 'PROGRESS', 'ASSIGNMENT TITLE', 'SEMESTER', 'AUDIENCE']
+# The load_tasks() filter on each field; a field's own filter is left out of its facet
+# so its dropdown keeps listing the other choices
+_FACET_FILTERS = {'Fiscal Year': 'years', 'PLANNER BUCKET': 'buckets', 'ASSIGNMENT TITLE': 'assignees',
+                  'PROGRESS': 'progress'}
+_FACET_CACHE_SIZE = 64
+_FACET_CACHE = OrderedDict()
+
+
+def facet_counts(filters=None, fields=None):
+    """
+    Count the tasks per distinct value of each of `fields` (default FACET_FIELDS) among
+    the tasks passing `filters` (the load_tasks() filters as a dict). Each field's own
+    filter is ignored for its count, so the year facet under {'years': 2025} still lists
+    every year. Missing progress counts as NOT STARTED; other empty values are left out.
+    Returns {field: DataFrame of 'value' and 'count' sorted by value}, or None on failure.
+    """
+    fields = list(fields or FACET_FIELDS)
+    unknown = [field for field in fields if field not in FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"No facet for {', '.join(unknown)}; choose from {', '.join(FACET_FIELDS)}")
+    normalized = _normalize_task_filters(**(filters or {}))
+    cache_key = (tuple(None if v is None else tuple(map(str, v)) for v in normalized.values()), tuple(fields))
+    with _cache_lock:
+        version = _TABLE_VERSIONS.get('tasks', 0)
+        cached = _FACET_CACHE.get(cache_key)
+        if cached is not None and cached[0] == version:
+            _FACET_CACHE.move_to_end(cache_key)
+            _count_cache('tasks (facets)', 'hits')
+            return {field: counts.copy() for field, counts in cached[1].items()}
+        _count_cache('tasks (facets)', 'misses')
+
+    try:
+        facets = {}
+        with engine.connect() as conn:
+            for field in fields:
+                own_filter = _FACET_FILTERS.get(field)
+                conditions = _task_conditions(**{k: None if k == own_filter else v for k, v in normalized.items()})
+                value = column(field)
+                if field == 'PROGRESS':
+                    value = func.coalesce(value, 'NOT STARTED')
+                else:
+                    conditions.append(value.is_not(None))
+                query = (select(value.label('value'), func.count().label('count'))
+                         .select_from(sql_table('tasks')).where(*conditions)
+                         .group_by(value).order_by(value))
+                counts = pd.read_sql_query(query, conn)
+                if field == 'Fiscal Year':
+                    counts['value'] = counts['value'].map(_as_year)
+                facets[field] = counts
+        with _cache_lock:
+            if _TABLE_VERSIONS.get('tasks', 0) == version:
+                _FACET_CACHE[cache_key] = (version, facets)
+                _FACET_CACHE.move_to_end(cache_key)
+                while len(_FACET_CACHE) > _FACET_CACHE_SIZE:
+                    _FACET_CACHE.popitem(last=False)
+        return {field: counts.copy() for field, counts in facets.items()}
+    except Exception as e:
+        try:
+            st.error(f"Failed to count task filter values. Error: {e}")
+        except Exception:
+            print(f"Failed to count task filter values. Error: {e}")
+        return None
+
+
+def facet_values(field, filters=None):
+    """The sorted distinct values of one facet field (see facet_counts); [] on failure."""
+    facets = facet_counts(filters, [field])
+    return [] if facets is None else facets[field]['value'].tolist()
+
+
+# --- Dashboard summary ---
+# The Dashboard's metric row and charts read a small materialized summary instead of
+# the tasks table. It holds the task counts per fiscal year, bucket, progress and
+# assignment title, with the overdue and unscheduled counts as of one day (as_of).
+# Tasks starting on or after that day keep their start date, so upcoming windows of
+# any length can be summed. Task writes apply their change to it inside their own
+# transaction. It is rebuilt on the first read of a new day, by full table saves, and
+# the first time a process finds it out of step with the tasks table.
+SUMMARY_TABLE = 'dashboard_summary'
+_SUMMARY_DIMENSIONS = [('fiscal_year', 'Fiscal Year'), ('planner_bucket', 'PLANNER BUCKET'),
+                       ('progress', 'PROGRESS'), ('assignment_title', 'ASSIGNMENT TITLE')]
+_SUMMARY_KEYS = [name for name, _ in _SUMMARY_DIMENSIONS] + ['start_date']
+_SUMMARY_COUNTS = ['tasks', 'overdue', 'unscheduled']
+# Changes touching more summary rows than this rebuild it instead
+_SUMMARY_DELTA_MAX = 1000
+_SUMMARY = Table(
+    SUMMARY_TABLE, MetaData(),
+    Column('fiscal_year', Integer), Column('planner_bucket', Text), Column('progress', Text),
+    Column('assignment_title', Text), Column('start_date', String(10)),
+    Column('tasks', Integer, nullable=False), Column('overdue', Integer, nullable=False),
+    Column('unscheduled', Integer, nullable=False), Column('as_of', String(10), nullable=False),
+    Index(f'ix_{SUMMARY_TABLE}_keys', *_SUMMARY_KEYS),
+)
+_summary_ready = False
+_summary_stale = False
+
+
+def _summary_day():
+    return pd.Timestamp.today().normalize()
+
+
+def _summary_snapshot(conn, task_ids=None):
+    """The summarized columns of the given task numbers' rows (all tasks when None)."""
+    columns = [col for _, col in _SUMMARY_DIMENSIONS] + ['START', 'END']
+    query = select(*[column(col) for col in columns]).select_from(sql_table('tasks'))
+    if task_ids is None:
+        return pd.read_sql_query(query, conn)
+    task_ids = sorted({int(i) for i in task_ids if pd.notna(i)})
+    frames = [pd.read_sql_query(query.where(column('#').in_(task_ids[start:start + _TASK_ID_CHUNK])), conn)
+              for start in range(0, len(task_ids), _TASK_ID_CHUNK)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def _summary_groups(tasks, as_of):
+    """
+    Summarize task rows as of the day `as_of`, with the Dashboard's rules: overdue tasks
+    ended before that day, aren't COMPLETE and have a real end date; unscheduled tasks
+    carry a placeholder end date (1901 or earlier).
+    """
+    frame = pd.DataFrame({name: tasks[col] for name, col in _SUMMARY_DIMENSIONS})
+    frame['fiscal_year'] = pd.to_numeric(frame['fiscal_year'], errors='coerce').astype('Int64')
+    frame['progress'] = frame['progress'].fillna('NOT STARTED')
+    start = pd.to_datetime(tasks['START'], errors='coerce').dt.normalize()
+    end = pd.to_datetime(tasks['END'], errors='coerce')
+    frame['start_date'] = start.where(start >= as_of).dt.strftime('%Y-%m-%d')
+    frame['tasks'] = 1
+    frame['overdue'] = ((end < as_of) & (frame['progress'] != 'COMPLETE') & (end.dt.year > 1901)).astype(int)
+    frame['unscheduled'] = (end.dt.year <= 1901).astype(int)
+    return frame.groupby(_SUMMARY_KEYS, dropna=False, as_index=False)[_SUMMARY_COUNTS].sum()
+
+
+def _summary_rows(groups, as_of):
+    rows = groups.astype(object)
+    rows = rows.where(rows.notna(), None)
+    rows['as_of'] = as_of.strftime('%Y-%m-%d')
+    return rows.to_dict('records')
+
+
+def _build_summary(conn):
+    """Refill the summary from the whole tasks table as of today."""
+    if conn.dialect.name == 'postgresql':
+        # Keep a concurrent rebuild from adding its rows next to ours
+        conn.execute(text(f"LOCK TABLE {SUMMARY_TABLE} IN EXCLUSIVE MODE"))
+    as_of = _summary_day()
+    conn.execute(_SUMMARY.delete())
+    rows = _summary_rows(_summary_groups(_summary_snapshot(conn), as_of), as_of)
+    if rows:
+        conn.execute(_SUMMARY.insert(), rows)
+
+
+def _apply_summary_delta(conn, before, after):
+    """Add the difference between two snapshots of the same tasks to the summary."""
+    stored = conn.execute(select(func.max(_SUMMARY.c.as_of))).scalar()
+    as_of = _summary_day()
+    if stored != as_of.strftime('%Y-%m-%d'):
+        _build_summary(conn)
+        return
+    removed = _summary_groups(before, as_of)
+    removed[_SUMMARY_COUNTS] *= -1
+    delta = (pd.concat([_summary_groups(after, as_of), removed], ignore_index=True)
+             .groupby(_SUMMARY_KEYS, dropna=False, as_index=False)[_SUMMARY_COUNTS].sum())
+    delta = delta[(delta[_SUMMARY_COUNTS] != 0).any(axis=1)]
+    if len(delta) > _SUMMARY_DELTA_MAX:
+        _build_summary(conn)
+        return
+    update = (_SUMMARY.update()
+              .where(*[_SUMMARY.c[key].is_not_distinct_from(bindparam(f'_key_{key}')) for key in _SUMMARY_KEYS])
+              .values({count: _SUMMARY.c[count] + bindparam(f'_add_{count}') for count in _SUMMARY_COUNTS}))
+    for row in _summary_rows(delta, as_of):
+        params = {f'_key_{key}': row[key] for key in _SUMMARY_KEYS}
+        params.update({f'_add_{count}': row[count] for count in _SUMMARY_COUNTS})
+        if conn.execute(update, params).rowcount == 0:
+            if row['tasks'] < 0:
+                raise ValueError("the summary has no row for a task being changed")
+            conn.execute(_SUMMARY.insert(), row)
+    conn.execute(_SUMMARY.delete().where(_SUMMARY.c.tasks <= 0))
+
+
+def _summary_before(conn, task_ids):
+    """The snapshot _update_dashboard_summary() needs, taken before a write to the given
+    task numbers; None when there is no summary to maintain (or reading failed)."""
+    try:
+        if _summary_ready or inspect(conn).has_table(SUMMARY_TABLE):
+            return _summary_snapshot(conn, task_ids)
+    except Exception as e:
+        print(f"Could not read the tasks for the dashboard summary: {e}")
+    return None
+
+
+def _update_dashboard_summary(conn, task_ids=None, before=None):
+    """
+    Apply a write to the given task numbers to the summary inside the caller's
+    transaction, if the summary exists. `before` is their _summary_before() snapshot;
+    without task numbers or a snapshot the summary is rebuilt. A failure is reported and
+    the summary rebuilt on its next read, but the write it follows is never undone.
+    """
+    global _summary_ready, _summary_stale
+    try:
+        with conn.begin_nested():
+            if not (_summary_ready or inspect(conn).has_table(SUMMARY_TABLE)):
+                return
+            if task_ids is None or before is None:
+                _build_summary(conn)
+            else:
+                _apply_summary_delta(conn, before, _summary_snapshot(conn, task_ids))
+    except Exception as e:
+        _summary_ready = False
+        _summary_stale = True
+        print(f"Could not update the dashboard summary: {e}")
+
+
+def _ensure_dashboard_summary(conn):
+    """Create and fill the summary if it doesn't exist yet or, the first time this process
+    looks, doesn't count every task once."""
+    global _summary_ready, _summary_stale
+    if _summary_ready:
+        return
+    if not inspect(conn).has_table(SUMMARY_TABLE):
+        _SUMMARY.create(conn)
+        _build_summary(conn)
+    else:
+        summarized = conn.execute(select(func.coalesce(func.sum(_SUMMARY.c.tasks), 0))).scalar()
+        if _summary_stale or summarized != conn.execute(text('SELECT COUNT(*) FROM tasks')).scalar():
+            _build_summary(conn)
+    _summary_ready = True
+    _summary_stale = False
+
+
+def rebuild_dashboard_summary():
+    """Rebuild the dashboard summary from the tasks table. Returns True on success."""
+    global _summary_ready, _summary_stale
+    try:
+        with engine.begin() as conn:
+            _SUMMARY.create(conn, checkfirst=True)
+            _build_summary(conn)
+        _summary_ready = True
+        _summary_stale = False
+        return True
+    except Exception as e:
+        st.error(f"Failed to rebuild the dashboard summary. Error: {e}")
+        return False
+
+
+def get_dashboard_summary(year=None, days_forward=30):
+    """
+    The Dashboard's numbers for one fiscal year (None or 'All' for every year), read from
+    the summary table: a dict of 'total', 'overdue', 'unscheduled', 'upcoming' (tasks
+    starting today through `days_forward` days ahead), 'by_bucket' and 'by_progress'
+    (task counts, largest first) and 'as_of' (the day overdue is counted from).
+    Returns None on failure.
+    """
+    as_of = _summary_day()
+    horizon = (as_of + pd.Timedelta(days=int(days_forward))).strftime('%Y-%m-%d')
+    summary = _SUMMARY.c
+    # Summed per bucket and progress in the database, so only a few dozen rows come back
+    query = (select(summary.planner_bucket, summary.progress,
+                    *[func.sum(summary[count]).label(count) for count in _SUMMARY_COUNTS],
+                    func.sum(case((summary.start_date <= horizon, summary.tasks), else_=0)).label('upcoming'),
+                    func.min(summary.as_of).label('as_of'))
+             .group_by(summary.planner_bucket, summary.progress))
+    if year is not None and year != 'All':
+        query = query.where(summary.fiscal_year == _as_year(year))
+    try:
+        if not _summary_ready:
+            with engine.begin() as conn:
+                _ensure_dashboard_summary(conn)
+        # A plain read; a write transaction is only opened when the summary is from an earlier day
+        with engine.connect() as conn:
+            rows = pd.read_sql_query(query, conn)
+        if (rows['as_of'] != as_of.strftime('%Y-%m-%d')).any():
+            with engine.begin() as conn:
+                _build_summary(conn)
+                rows = pd.read_sql_query(query, conn)
+    except Exception as e:
+        st.error(f"Failed to load the dashboard summary. Error: {e}")
+        return None
+
+    return {
+        'total': int(rows['tasks'].sum()),
+        'overdue': int(rows['overdue'].sum()),
+        'unscheduled': int(rows['unscheduled'].sum()),
+        'upcoming': int(rows['upcoming'].sum()),
+        'by_bucket': (rows.groupby('planner_bucket')['tasks'].sum().sort_values(ascending=False)
+                      .rename_axis('PLANNER BUCKET').rename('count')),
+        'by_progress': (rows.groupby('progress')['tasks'].sum().sort_values(ascending=False)
+                        .rename_axis('PROGRESS').rename('count')),
+        'as_of': as_of,
+    }
+
+
+# --- Full-text task search ---
+# search_tasks() answers "search across all fields" from an index kept next to the
+# tasks table: an FTS5 virtual table on SQLite, a table of weighted tsvectors with a
+# GIN index on PostgreSQL. Every task (one index row per # and fiscal year) is indexed
+# with its TASK, PLANNER BUCKET, ASSIGNMENT TITLE, AUDIENCE, SEMESTER and the text
+# of its comments. Task writes made through this module update the index in the same
+# transaction and new comments update their task; a missing index is built on first
+# use. rebuild_search_index() catches up after the database was changed by other
+# means. Index rows are found by the task's '#' and fiscal year (task_id and
+# fiscal_year): the tsvector table has them as its primary key, and on SQLite a
+# keys table maps them to the FTS5 rowid, so updating a task's row stays a lookup
+# by key instead of a scan of the FTS table. Other databases, and SQLite builds
+# without FTS5, fall back to LIKE over the task columns (without comments); Find &
+# Filter then searches in memory instead (search_index_available()).
+SEARCH_INDEX_TABLE = 'task_search'
+SEARCH_KEYS_TABLE = 'task_search_keys'
+_SEARCH_FIELDS = [('task', 'TASK'), ('bucket', 'PLANNER BUCKET'), ('assignment', 'ASSIGNMENT TITLE'),
+                  ('audience', 'AUDIENCE'), ('semester', 'SEMESTER')]
+# Ranking weight of each field, then of the comments
+_SEARCH_WEIGHTS = (10.0, 4.0, 4.0, 2.0, 2.0, 1.0)
+_SEARCH_PG_WEIGHTS = ('A', 'B', 'B', 'C', 'C', 'D')
+_search_index_ready = False
+_fts5_available = None
+
+
+def _probe_fts5(conn):
+    """Whether this SQLite build has the FTS5 module (tried once, on a throwaway temp table)."""
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(probe)"))
+            conn.execute(text("DROP TABLE temp.fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def _search_backend(conn=None):
+    global _fts5_available
+    if engine.dialect.name == 'postgresql':
+        return 'tsvector'
+    if engine.dialect.name != 'sqlite':
+        return None
+    if _fts5_available is None:
+        if conn is not None:
+            _fts5_available = _probe_fts5(conn)
+        else:
+            with engine.begin() as probe_conn:
+                _fts5_available = _probe_fts5(probe_conn)
+        if not _fts5_available:
+            print("This SQLite build has no FTS5; task searches scan the task columns instead.")
+    return 'fts5' if _fts5_available else None
+
+
+def search_index_available():
+    """Whether search_tasks() can use a full-text index on this database."""
+    return _search_backend() is not None
+
+
+def _search_terms(query):
+    return re.findall(r'\w+', str(query or '').lower())
+
+
+def _search_documents(conn, task_ids=None):
+    """The index rows of the given task numbers (all tasks when None): the key, the
+    indexed fields and the task's comments joined."""
+    comments = {}
+    if inspect(conn).has_table('comments'):
+        comments_query = select(column('task_id'), column('comment_text')).select_from(sql_table('comments'))
+        if task_ids is not None:
+            comments_query = comments_query.where(column('task_id').in_(task_ids))
+        for task_id, comment_text in conn.execute(comments_query):
+            if task_id is not None and comment_text is not None:
+                comments.setdefault(_as_year(task_id), []).append(str(comment_text))
+
+    field_columns = [col for _, col in _SEARCH_FIELDS]
+    query = select(*[column(col) for col in ['#', 'Fiscal Year'] + field_columns]).select_from(sql_table('tasks'))
+    if task_ids is not None:
+        query = query.where(column('#').in_(task_ids))
+    docs = []
+    for number, year, *values in conn.execute(query):
+        number, year = _as_year(number), _as_year(year)
+        if not isinstance(number, int) or not isinstance(year, int):
+            continue
+        doc = {name: '' if value is None else str(value) for (name, _), value in zip(_SEARCH_FIELDS, values)}
+        doc['task_id'] = number
+        doc['fiscal_year'] = year
+        doc['comments'] = ' '.join(comments.get(number, ()))
+        docs.append(doc)
+    return docs
+
+
+def _write_search_documents(conn, backend, docs):
+    if not docs:
+        return
+    names = [name for name, _ in _SEARCH_FIELDS] + ['comments']
+    if backend == 'fts5':
+        next_id = conn.execute(text(f"SELECT COALESCE(MAX(doc_id), 0) + 1 FROM {SEARCH_KEYS_TABLE}")).scalar()
+        for doc_id, doc in enumerate(docs, next_id):
+            doc['doc_id'] = doc_id
+        conn.execute(text(f"INSERT INTO {SEARCH_KEYS_TABLE} (doc_id, task_id, fiscal_year) "
+                          "VALUES (:doc_id, :task_id, :fiscal_year)"), docs)
+        statement = text(f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, {', '.join(names)}) "
+                         f"VALUES (:doc_id, {', '.join(':' + n for n in names)})")
+    else:
+        vector = ' || '.join(f"setweight(to_tsvector('simple', CAST(:{n} AS TEXT)), '{w}')"
+                             for n, w in zip(names, _SEARCH_PG_WEIGHTS))
+        statement = text(f"INSERT INTO {SEARCH_INDEX_TABLE} (task_id, fiscal_year, document) "
+                         f"VALUES (:task_id, :fiscal_year, {vector})")
+    conn.execute(statement, docs)
+
+
+def _index_tasks(conn, backend, task_ids=None):
+    """Replace the index rows of the given task numbers (all tasks when None)."""
+    keyed_table = SEARCH_KEYS_TABLE if backend == 'fts5' else SEARCH_INDEX_TABLE
+    if task_ids is None:
+        conn.execute(text(f"DELETE FROM {SEARCH_INDEX_TABLE}"))
+        if backend == 'fts5':
+            conn.execute(text(f"DELETE FROM {SEARCH_KEYS_TABLE}"))
+        _write_search_documents(conn, backend, _search_documents(conn))
+        return
+    keys = sql_table(keyed_table, column('doc_id'), column('task_id'))
+    task_ids = sorted({int(i) for i in task_ids if pd.notna(i)})
+    for start in range(0, len(task_ids), _TASK_ID_CHUNK):
+        chunk = task_ids[start:start + _TASK_ID_CHUNK]
+        if backend == 'fts5':
+            doc_ids = select(keys.c.doc_id).where(keys.c.task_id.in_(chunk))
+            conn.execute(sql_table(SEARCH_INDEX_TABLE, column('rowid')).delete()
+                         .where(column('rowid').in_(doc_ids)))
+        conn.execute(keys.delete().where(keys.c.task_id.in_(chunk)))
+        _write_search_documents(conn, backend, _search_documents(conn, chunk))
+
+
+def _create_search_index(conn, backend):
+    """Create the (empty) index tables unless they exist. Returns True if they were created."""
+    keyed_table = SEARCH_KEYS_TABLE if backend == 'fts5' else SEARCH_INDEX_TABLE
+    db = inspect(conn)
+    if db.has_table(SEARCH_INDEX_TABLE):
+        if db.has_table(keyed_table) and 'task_id' in {col['name'] for col in db.get_columns(keyed_table)}:
+            return False
+        # An index from before its rows were keyed by task_id and fiscal_year
+        conn.execute(text(f"DROP TABLE {SEARCH_INDEX_TABLE}"))
+    if backend == 'fts5':
+        conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5("
+                          f"{', '.join(name for name, _ in _SEARCH_FIELDS)}, comments, "
+                          "tokenize = 'unicode61 remove_diacritics 2')"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_KEYS_TABLE}"))
+        conn.execute(text(f"CREATE TABLE {SEARCH_KEYS_TABLE} (doc_id INTEGER PRIMARY KEY, "
+                          "task_id INTEGER NOT NULL, fiscal_year INTEGER NOT NULL, UNIQUE (task_id, fiscal_year))"))
+    else:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} "
+                          "(task_id INTEGER NOT NULL, fiscal_year INTEGER NOT NULL, document TSVECTOR NOT NULL, "
+                          "PRIMARY KEY (task_id, fiscal_year))"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_INDEX_TABLE}_document "
+                          f"ON {SEARCH_INDEX_TABLE} USING GIN (document)"))
+    return True
+
+
+def _ensure_search_index(conn):
+    """
+    Create and fill the search index if it doesn't exist yet (or, the first time this
+    process looks, doesn't hold one row per task). Returns the backend, or None if
+    this database has no full-text index.
+    """
+    global _search_index_ready
+    backend = _search_backend(conn)
+    if backend is None or _search_index_ready:
+        return backend
+    if _create_search_index(conn, backend):
+        _index_tasks(conn, backend)
+    else:
+        indexed = conn.execute(text(f"SELECT COUNT(*) FROM {SEARCH_INDEX_TABLE}")).scalar()
+        if indexed != conn.execute(text('SELECT COUNT(*) FROM tasks')).scalar():
+            _index_tasks(conn, backend)
+    _search_index_ready = True
+    return backend
+
+
+def _update_search_index(conn, task_ids=None):
+    """Re-index the given task numbers (every task when None) inside the caller's transaction,
+    if the index exists. A failure is reported but never undoes the write it follows."""
+    global _search_index_ready
+    backend = _search_backend(conn)
+    if backend is None:
+        return
+    try:
+        with conn.begin_nested():
+            if _search_index_ready or inspect(conn).has_table(SEARCH_INDEX_TABLE):
+                _index_tasks(conn, backend, task_ids)
+    except Exception as e:
+        _search_index_ready = False
+        print(f"Could not update the task search index: {e}")
+
+
+def rebuild_search_index():
+    """Rebuild the whole search index from the tasks and comments tables.
+    Returns the number of tasks indexed, or None on failure (or without a full-text index)."""
+    global _search_index_ready
+    backend = _search_backend()
+    if backend is None:
+        return None
+    try:
+        with engine.begin() as conn:
+            _create_search_index(conn, backend)
+            _index_tasks(conn, backend)
+            _search_index_ready = True
+            return conn.execute(text(f"SELECT COUNT(*) FROM {SEARCH_INDEX_TABLE}")).scalar()
+    except Exception as e:
+        _search_index_ready = False
+        st.error(f"Failed to rebuild the search index. Error: {e}")
+        return None
+
+
+def _search_statement(conn, query, filters):
+    """The ranked SELECT of '#', 'Fiscal Year' and 'score' behind search_tasks()."""
+    conditions = _task_conditions(**_normalize_task_filters(**(filters or {})))
+    terms = _search_terms(query)
+    tasks = sql_table('tasks', column('#'), column('Fiscal Year'))
+    backend = _ensure_search_index(conn) if terms else None
+    if backend is None:
+        matches = [or_(*[func.lower(column(col)).contains(term, autoescape=True) for _, col in _SEARCH_FIELDS])
+                   for term in terms]
+        return (select(tasks.c['#'], tasks.c['Fiscal Year'], literal_column('0.0').label('score'))
+                .select_from(tasks).where(*matches, *conditions)
+                .order_by(tasks.c['Fiscal Year'].desc(), tasks.c['#']))
+
+    if backend == 'fts5':
+        keys = sql_table(SEARCH_KEYS_TABLE, column('doc_id'), column('task_id'), column('fiscal_year'))
+        indexed = (tasks.join(keys, and_(tasks.c['#'] == keys.c.task_id, tasks.c['Fiscal Year'] == keys.c.fiscal_year))
+                   .join(sql_table(SEARCH_INDEX_TABLE), literal_column(f'{SEARCH_INDEX_TABLE}.rowid') == keys.c.doc_id))
+        match = literal_column(SEARCH_INDEX_TABLE).op('MATCH')(' '.join(f'"{t}"*' for t in terms))
+        # bm25() is lower for better matches
+        score = -func.bm25(literal_column(SEARCH_INDEX_TABLE), *_SEARCH_WEIGHTS)
+    else:
+        keys = sql_table(SEARCH_INDEX_TABLE, column('task_id'), column('fiscal_year'))
+        indexed = tasks.join(keys, and_(tasks.c['#'] == keys.c.task_id, tasks.c['Fiscal Year'] == keys.c.fiscal_year))
+        document = literal_column(f'{SEARCH_INDEX_TABLE}.document')
+        ts_query = func.to_tsquery('simple', ' & '.join(f'{t}:*' for t in terms))
+        match = document.op('@@')(ts_query)
+        score = func.ts_rank(document, ts_query)
+    return (select(tasks.c['#'], tasks.c['Fiscal Year'], score.label('score'))
+            .select_from(indexed)
+            .where(match, *conditions)
+            .order_by(literal_column('score').desc(), tasks.c['Fiscal Year'].desc(), tasks.c['#']))
+
+
+def search_tasks(query, filters=None, limit=50, offset=0):
+    """
+    Find tasks matching every word of `query` (each as a word prefix, case-insensitive).
+
+    filters takes the load_tasks() filters as a dict, e.g. {'years': 2025, 'buckets': [...]}.
+    Returns a DataFrame of '#', 'Fiscal Year' and 'score' (higher is a better match), best
+    first, `limit` rows (all when None) starting at `offset`; without search words every
+    task passing the filters is returned, newest year first. Returns None on failure.
+    """
+    global _search_index_ready
+    try:
+        with engine.begin() as conn:
+            statement = _search_statement(conn, query, filters)
+            if limit is not None:
+                statement = statement.limit(limit)
+            if offset:
+                statement = statement.offset(offset)
+            results = pd.read_sql_query(statement, conn)
+    except Exception as e:
+        _search_index_ready = False
+        st.error(f"Search failed. Error: {e}")
+        return None
+    _profile_add('rows_read', len(results))
+    results['score'] = results['score'].astype(float)
+    return results
+
+
+def paginate(total, page, page_size):
+    """
+    Clamp a 1-based `page` to the pages `total` rows make at `page_size` per page.
+    Returns {'page', 'pages', 'start', 'stop'}: start/stop are the row offsets of that page.
+    """
+    page_size = max(1, int(page_size))
+    pages = max(1, -(-int(total) // page_size))
+    page = min(max(1, int(page or 1)), pages)
+    start = (page - 1) * page_size
+    return {'page': page, 'pages': pages, 'start': start, 'stop': min(start + page_size, int(total))}
+
+
+def search_tasks_page(query, filters=None, page=1, page_size=50):
+    """
+    One page of search_tasks() results plus the total number of matches, both counted and
+    fetched in SQL (COUNT, then LIMIT/OFFSET). A page past the end is moved to the last one.
+    Returns paginate()'s dict with 'rows' (the search_tasks() frame) and 'total', or None on failure.
+    """
+    global _search_index_ready
+    try:
+        with engine.begin() as conn:
+            statement = _search_statement(conn, query, filters)
+            total = conn.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar()
+            bounds = paginate(total, page, page_size)
+            rows = pd.read_sql_query(statement.limit(page_size).offset(bounds['start']), conn)
+    except Exception as e:
+        _search_index_ready = False
+        st.error(f"Search failed. Error: {e}")
+        return None
+    _profile_add('rows_read', len(rows))
+    rows['score'] = rows['score'].astype(float)
+    return {**bounds, 'rows': rows, 'total': total}
+
+
+# --- In-memory task search ---
+# For searching a tasks frame the page already holds (the Dashboard's task finder, and
+# Find & Filter when TASK_SEARCH=pandas): the searchable fields of every saved task are
+# joined into one lower-cased key, built once per 'tasks' data version with vectorized
+# string operations, so a search is a single str.contains over that column.
+TASK_SEARCH = _db_setting('TASK_SEARCH', 'index')
+TASK_SEARCH_COLUMNS = [col for _, col in _SEARCH_FIELDS]
+_SEARCH_KEY_SEPARATOR = '\x1f'
+_SEARCH_KEY_CACHE = {}
+
+
+def _search_key_series(frame):
+    parts = [frame[col].fillna('').astype(str) if col in frame.columns else pd.Series('', index=frame.index)
+             for col in TASK_SEARCH_COLUMNS]
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + _SEARCH_KEY_SEPARATOR + part
+    return keys.str.lower()
+
+
+def _task_row_keys(frame):
+    """The ('#', 'Fiscal Year') key of every row, as a MultiIndex of numbers."""
+    return pd.MultiIndex.from_arrays([pd.to_numeric(frame['#'], errors='coerce'),
+                                      pd.to_numeric(frame['Fiscal Year'], errors='coerce')])
+
+
+def task_search_keys(df):
+    """
+    The lower-cased search key (TASK_SEARCH_COLUMNS joined) of every row of the tasks
+    frame `df`, aligned with its index. Keys of saved tasks come from the per-version
+    cache; rows it doesn't know (new or unkeyed) are computed on the spot.
+    """
+    with _cache_lock:
+        version = _TABLE_VERSIONS.get('tasks', 0)
+        cached = _SEARCH_KEY_CACHE.get('tasks')
+    if cached is None or cached[0] != version:
+        tasks = load_table('tasks')
+        keys = None
+        if tasks is not None:
+            row_keys = _task_row_keys(tasks)
+            keys = _search_key_series(tasks).set_axis(row_keys)
+            if not row_keys.is_unique or row_keys.to_frame().isna().any().any():
+                keys = None
+        with _cache_lock:
+            if _TABLE_VERSIONS.get('tasks', 0) == version:
+                _SEARCH_KEY_CACHE['tasks'] = (version, keys)
+    else:
+        keys = cached[1]
+
+    if keys is None or '#' not in df.columns or 'Fiscal Year' not in df.columns:
+        return _search_key_series(df)
+    found = keys.reindex(_task_row_keys(df)).set_axis(df.index)
+    missing = found.isna().to_numpy()
+    if missing.any():
+        found[missing] = _search_key_series(df[missing])
+    return found
+
+
+def search_task_frame(df, query):
+    """Rows of the tasks frame `df` where any of TASK_SEARCH_COLUMNS contains `query`
+    (case-insensitive substring). A blank query returns `df` as is."""
+    query = str(query or '').strip().lower()
+    if not query or df is None or df.empty:
+        return df
+    return df[task_search_keys(df).str.contains(query, regex=False).to_numpy()]
+
+
 # --- THE STABLE DATA SAVING FUNCTION ---
 def save_table(df, table_name):
     """
-    Saves any DataFrame to a table, replacing it. It saves raw datetime objects,
-    which is the correct and most stable method.
+    Saves any DataFrame to a table, replacing its contents. It saves raw datetime
+    objects, which is the correct and most stable method.
+
+    Tables declared in db_schema are emptied and refilled in one transaction so
+    their keys and indexes survive; other (or not yet migrated) tables are
+    replaced wholesale as before.
     """
+    written = False
     try:
+        if table_name in db_schema.TABLES:
+            with engine.begin() as conn:
+                typed = not inspect(conn).has_table(table_name) or db_schema.is_typed(conn, table_name)
+                if typed:
+                    db_schema.write_frame(conn, df, table_name)
+                    if table_name == 'tasks':
+                        _update_search_index(conn)
+                        _update_dashboard_summary(conn)
+            if typed:
+                written = True
+                return True
         with engine.connect() as conn:
             # We no longer apply string formatting here. We save the proper datetime objects.
             df.to_sql(table_name, conn, if_exists='replace', index=False, method='multi')
+        written = True
+        if table_name == 'tasks':
+            with engine.begin() as conn:
+                _update_search_index(conn)
+                _update_dashboard_summary(conn)
         return True
     except Exception as e:
         st.error(f"Error saving table '{table_name}': {e}")
         return False
+    finally:
+        # Only a write that went through changes what cached copies should show
+        if written:
+            bump_data_version(table_name)
 
 
-def append_changelog_entry(action, source, field_changed, old_value, new_value, user="system"):
-    """Append a single changelog entry to the changelog table."""
+# --- ROW-LEVEL (UPSERT) SAVING ---
+# A task is identified by its '#' *and* its fiscal year: the same '#' is reused
+# when a task is carried over into another year.
+TASK_KEY_COLUMNS = ['#', 'Fiscal Year']
+
+
+def _sql_value(val):
+    """Convert a pandas/numpy cell into a plain Python value the DB driver can bind."""
+    if val is None:
+        return None
+    if isinstance(val, pd.Timestamp):
+        return None if pd.isna(val) else val.to_pydatetime()
+    try:
+        if pd.isna(val):
+            return None
+    except (TypeError, ValueError):
+        # Lists/arrays are not "NA" scalars; bind them as-is
+        return val
+    if hasattr(val, 'item'):
+        # numpy scalar -> native Python scalar
+        return val.item()
+    return val
+
+
+def _key_filter(table, key_columns):
+    """WHERE clause matching one row by its key columns, bound as _key_0.._key_n."""
+    return and_(*[table.c[col] == bindparam(f'_key_{i}') for i, col in enumerate(key_columns)])
+
+
+def _diff_keyed_frames(new_df, old_df, key_columns, value_columns):
+    """
+    Lines up two frames on `key_columns` (which must be non-empty and unique in both).
+    Returns (new_rows, old_rows, added_keys, deleted_keys, changed_keys): both frames
+    re-indexed by key, and the keys only in new_df, only in old_df, and in both but
+    with a different value in any of `value_columns`.
+    """
+    new_keys = pd.MultiIndex.from_frame(new_df[key_columns].astype(object))
+    old_keys = pd.MultiIndex.from_frame(old_df[key_columns].astype(object))
+    new_rows = new_df.set_axis(new_keys)
+    old_rows = old_df.set_axis(old_keys)
+
+    deleted_keys = old_keys.difference(new_keys, sort=False)
+    added_keys = new_keys.difference(old_keys, sort=False)
+    common_keys = new_keys.intersection(old_keys, sort=False)
+
+    changed = pd.Series(False, index=common_keys)
+    if len(common_keys):
+        new_common = new_rows.loc[common_keys, value_columns]
+        old_common = old_rows.loc[common_keys, value_columns]
+        for col in value_columns:
+            a, b = new_common[col], old_common[col]
+            try:
+                same = (a == b) | (a.isna() & b.isna())
+            except TypeError:
+                same = pd.Series(False, index=common_keys)
+            changed |= ~same.fillna(False).astype(bool)
+    changed_keys = common_keys[changed.to_numpy()]
+    return new_rows, old_rows, added_keys, deleted_keys, changed_keys
+
+
+def upsert_table(df, table_name, key_columns=None):
+    """
+    Saves a DataFrame by diffing it against the stored rows on `key_columns`
+    ('#' + 'Fiscal Year' by default) and issuing only the INSERT, UPDATE and
+    DELETE statements needed for the rows that changed, all in one transaction.
+
+    Falls back to save_table() (full replace) when the stored table can't be
+    diffed safely: it doesn't exist yet, its columns differ from the frame,
+    or either side has empty or duplicate keys.
+    Returns True on success and False on failure, exactly like save_table().
+    """
+    key_columns = list(key_columns or TASK_KEY_COLUMNS)
+    if (not all(col in df.columns for col in key_columns)
+            or df[key_columns].isna().any().any()
+            or df.duplicated(subset=key_columns).any()):
+        return save_table(df, table_name)
+
     try:
-        changelog_df = load_table('changelog')
-        if changelog_df is None:
-            changelog_df = pd.DataFrame()
-        entry = {
-            'Timestamp': datetime.now(),
-            'Action': action,
-            'Task ID': 'N/A',
-            'User': user,
-            'Source': source,
-            'Field Changed': field_changed,
-            'Old Value': old_value,
-            'New Value': new_value
-        }
-        combined = pd.concat([changelog_df, pd.DataFrame([entry])], ignore_index=True)
-        save_table(combined, 'changelog')
+        needs_full_save = False
+        with engine.begin() as conn:
+            try:
+                table = Table(table_name, MetaData(), autoload_with=conn)
+            except NoSuchTableError:
+                table = None
+
+            if table is None or set(table.columns.keys()) != set(df.columns):
+                needs_full_save = True
+            else:
+                if table_name in db_schema.TABLES and db_schema.is_typed(conn, table_name):
+                    # Bind values as the declared column types (e.g. '#' as an integer)
+                    df = db_schema.coerce_frame(df, table_name)
+                stored = pd.read_sql_query(select(table), conn)
+                if stored[key_columns].isna().any().any() or stored.duplicated(subset=key_columns).any():
+                    needs_full_save = True
+
+            if not needs_full_save:
+                # Parse stored dates the same way the frame holds them so equal values compare equal
+                for col in df.columns:
+                    if pd.api.types.is_datetime64_any_dtype(df[col]) and not pd.api.types.is_datetime64_any_dtype(stored[col]):
+                        stored[col] = pd.to_datetime(stored[col], errors='coerce')
+
+                value_columns = [col for col in df.columns if col not in key_columns]
+                new_rows, old_rows, added_keys, deleted_keys, changed_keys = _diff_keyed_frames(
+                    df, stored, key_columns, value_columns)
+
+                def _key_params(key):
+                    return {f'_key_{i}': _sql_value(v) for i, v in enumerate(key)}
+
+                def _row_params(keys):
+                    rows = new_rows.loc[keys, value_columns].astype(object)
+                    params = []
+                    for key, values in zip(keys, rows.itertuples(index=False, name=None)):
+                        row_params = _key_params(key)
+                        row_params.update({f'_val_{j}': _sql_value(v) for j, v in enumerate(values)})
+                        params.append(row_params)
+                    return params
+
+                value_binds = {col: bindparam(f'_val_{j}') for j, col in enumerate(value_columns)}
+
+                written = deleted_keys.append(changed_keys).append(added_keys)
+                summary_before = None
+                if table_name == 'tasks' and key_columns[0] == '#' and len(written):
+                    summary_before = _summary_before(conn, written.get_level_values(0))
+
+                if len(deleted_keys):
+                    conn.execute(table.delete().where(_key_filter(table, key_columns)),
+                                 [_key_params(key) for key in deleted_keys])
+                if len(changed_keys):
+                    conn.execute(table.update().where(_key_filter(table, key_columns)).values(value_binds),
+                                 _row_params(changed_keys))
+                if len(added_keys):
+                    insert_binds = {col: bindparam(f'_key_{i}') for i, col in enumerate(key_columns)}
+                    insert_binds.update(value_binds)
+                    conn.execute(table.insert().values(insert_binds),
+                                 _row_params(added_keys))
+                if table_name == 'tasks' and key_columns[0] == '#' and len(written):
+                    _update_search_index(conn, written.get_level_values(0))
+                    _update_dashboard_summary(conn, written.get_level_values(0), summary_before)
+
+        if needs_full_save:
+            return save_table(df, table_name)
+        bump_data_version(table_name)
+        return True
+    except Exception as e:
+        st.error(f"Error saving table '{table_name}': {e}")
+        return False
+
+
+# --- OPTIMISTIC CONCURRENCY FOR TASK SAVES ---
+# Every task row carries a row_version that is bumped on each write. A save only
+# touches the rows the user actually changed, and each UPDATE/DELETE only applies
+# if the row still has the version the user loaded. Edits by different people to
+# different tasks therefore merge; edits to a task someone else changed (or
+# deleted, or added under the same # and year) in the meantime are reported as
+# conflicts instead of silently overwriting it.
+TASK_VERSION_COLUMN = 'row_version'
+TASK_UPDATED_COLUMN = 'updated_at'
+# Bookkeeping columns maintained by commit_task_changes(), never edited by pages
+TASK_META_COLUMNS = [TASK_VERSION_COLUMN, TASK_UPDATED_COLUMN]
+
+
+def shown_row_versions(page_key, df):
+    """
+    Record the row versions of the tasks a page renders from `df` on this run and
+    return the ones recorded on the page's previous run (None the first time).
+
+    Clicking Save reruns the page, so the frame it reloads on that run already has
+    the current versions. The previous run's versions are the ones the user was
+    looking at; pass them to save_and_log_changes() as `shown_versions` so a task
+    someone else changed in the meantime is reported instead of overwritten.
+    """
+    state_key = f'_shown_row_versions_{page_key}'
+    previous = st.session_state.get(state_key)
+    if df is not None and TASK_VERSION_COLUMN in df.columns and all(col in df.columns for col in TASK_KEY_COLUMNS):
+        versions = pd.Series(df[TASK_VERSION_COLUMN].to_numpy(), index=_task_row_keys(df))
+        st.session_state[state_key] = versions[~versions.index.duplicated()]
+    return previous
+
+
+def _with_row_versions(df, versions):
+    """`df` with the row_version of every row found in `versions` set to the recorded one."""
+    if versions is None or TASK_VERSION_COLUMN not in df.columns:
+        return df
+    shown = versions.reindex(_task_row_keys(df)).to_numpy()
+    found = pd.notna(shown)
+    if not found.any():
+        return df
+    values = shown[found]
+    if pd.api.types.is_integer_dtype(df[TASK_VERSION_COLUMN]):
+        values = values.astype(df[TASK_VERSION_COLUMN].dtype)
+    df = df.copy()
+    df.loc[found, TASK_VERSION_COLUMN] = values
+    return df
+
+
+def commit_task_changes(original_df, updated_df):
+    """
+    Writes the difference between `original_df` (as loaded) and `updated_df` to the
+    tasks table in one transaction, checking each row's version.
+
+    Returns (applied_df, conflicts): `applied_df` is `updated_df` with the
+    conflicting rows put back as they were in `original_df`, and `conflicts` is a
+    list of (#, Fiscal Year, reason) tuples. Returns None when versioned saving
+    isn't possible (the frames have empty or duplicate keys, or the database hasn't
+    been migrated to carry row versions) so the caller can fall back to upsert_table().
+    """
+    key_columns = TASK_KEY_COLUMNS
+    vcol = TASK_VERSION_COLUMN
+    if vcol not in original_df.columns:
+        return None
+    for frame in (original_df, updated_df):
+        if (not all(col in frame.columns for col in key_columns)
+                or frame[key_columns].isna().any().any()
+                or frame.duplicated(subset=key_columns).any()):
+            return None
+
+    value_columns = [col for col in updated_df.columns if col not in key_columns and col not in TASK_META_COLUMNS]
+    shared_columns = [col for col in value_columns if col in original_df.columns]
+    new_rows, old_rows, added_keys, deleted_keys, changed_keys = _diff_keyed_frames(
+        updated_df, original_df, key_columns, shared_columns)
+    if len(value_columns) != len(shared_columns):
+        # Columns added by the page count as a change on every row that sets them
+        extra = [col for col in value_columns if col not in shared_columns]
+        common = new_rows.index.intersection(old_rows.index, sort=False)
+        has_extra = new_rows.loc[common, extra].notna().any(axis=1).to_numpy()
+        changed_keys = changed_keys.union(common[has_extra], sort=False)
+
+    conflicts = []
+    with engine.begin() as conn:
+        table = Table('tasks', MetaData(), autoload_with=conn)
+        if vcol not in table.c:
+            return None
+        if not (len(added_keys) or len(deleted_keys) or len(changed_keys)):
+            return updated_df.copy(), conflicts
+        missing = [col for col in value_columns if col not in table.c]
+        if missing:
+            db_schema.add_missing_columns(conn, 'tasks', missing)
+            table = Table('tasks', MetaData(), autoload_with=conn)
+
+        typed_rows = db_schema.coerce_frame(new_rows.reset_index(drop=True), 'tasks').set_axis(new_rows.index)
+        version_col = table.c[vcol]
+
+        def _key_where(key):
+            return and_(*[table.c[col] == _sql_value(v) for col, v in zip(key_columns, key)])
+
+        def _version_where(key):
+            seen = _sql_value(old_rows.at[key, vcol])
+            return version_col.is_(None) if seen is None else version_col == seen
+
+        now = datetime.now()
+
+        def _values(key):
+            values = {col: _sql_value(typed_rows.at[key, col]) for col in value_columns}
+            if TASK_UPDATED_COLUMN in table.c:
+                values[TASK_UPDATED_COLUMN] = now
+            return values
+
+        written = deleted_keys.append(changed_keys).append(added_keys)
+        summary_before = _summary_before(conn, written.get_level_values(0))
+        for key in deleted_keys:
+            result = conn.execute(table.delete().where(_key_where(key), _version_where(key)))
+            if result.rowcount == 0:
+                conflicts.append((*key, 'changed or deleted by someone else'))
+        for key in changed_keys:
+            values = _values(key)
+            values[vcol] = func.coalesce(version_col, 0) + 1
+            result = conn.execute(table.update().where(_key_where(key), _version_where(key)).values(values))
+            if result.rowcount == 0:
+                conflicts.append((*key, 'changed or deleted by someone else'))
+        if len(added_keys):
+            existing = set()
+            for key in added_keys:
+                if conn.execute(select(table.c[key_columns[0]]).where(_key_where(key))).first() is not None:
+                    existing.add(key)
+                    conflicts.append((*key, 'added by someone else'))
+            rows = []
+            for key in added_keys:
+                if key not in existing:
+                    row = {col: _sql_value(v) for col, v in zip(key_columns, key)}
+                    row.update(_values(key))
+                    row[vcol] = 1
+                    rows.append(row)
+            if rows:
+                conn.execute(table.insert(), rows)
+        _update_search_index(conn, written.get_level_values(0))
+        _update_dashboard_summary(conn, written.get_level_values(0), summary_before)
+    bump_data_version('tasks')
+
+    if not conflicts:
+        return updated_df.copy(), conflicts
+    # Put the conflicting rows back the way the user found them
+    conflict_keys = pd.MultiIndex.from_tuples([c[:2] for c in conflicts])
+    keep = ~new_rows.index.isin(conflict_keys)
+    restore = old_rows.index.isin(conflict_keys)
+    applied = pd.concat([new_rows[keep], old_rows[restore]], ignore_index=True)
+    return applied, conflicts
+
+
+def append_changelog_entries(entries):
+    """
+    Append new rows to the changelog table with a single bulk INSERT.
+
+    `entries` is a DataFrame or a list of dicts in the changelog layout. The
+    changelog only ever grows, so the existing log is never read or rewritten here.
+    Returns True on success.
+    """
+    new_log_df = entries if isinstance(entries, pd.DataFrame) else pd.DataFrame(entries)
+    if new_log_df.empty:
+        return True
+    new_log_df = new_log_df.copy()
+    if 'Task ID' in new_log_df.columns:
+        # Task IDs mix task numbers with 'N/A'; store them uniformly as text
+        new_log_df['Task ID'] = new_log_df['Task ID'].map(lambda v: None if pd.isna(v) else str(v)).astype(object)
+    try:
+        with engine.begin() as conn:
+            # if_exists='append' inserts via executemany and creates the table on first use
+            new_log_df.to_sql('changelog', conn, if_exists='append', index=False)
+        bump_data_version('changelog')
         return True
     except Exception as e:
         try:
-            st.error(f"Failed to append changelog entry: {e}")
+            st.error(f"Failed to append changelog entries: {e}")
         except Exception:
             pass
         return False
 
-# --- FULLY IMPLEMENTED CHANGELOG FUNCTION ---
-def save_and_log_changes(original_df, updated_df, user_email="system", source_page="Unknown"):
-    """
-    Compares two dataframes, logs the changes to the 'changelog' table,
-    and then saves the updated 'tasks' table.
-    """
-    try:
-        timestamp = datetime.now()
-        log_entries = []
-
-        def _ensure_df(selection):
-            """Normalize selection to a DataFrame to avoid Series leaking into log payloads."""
-            if isinstance(selection, pd.Series):
-                return selection.to_frame().T
-            return selection if isinstance(selection, pd.DataFrame) else pd.DataFrame()
-
-        def _format_log_value(val):
-            if isinstance(val, pd.Timestamp):
-                return val.strftime('%Y-%m-%d') if not pd.isna(val) else ''
-            if pd.isna(val):
-                return ''
-            return str(val)
-
-        # Use '#' as the index for comparison
-        original_indexed = original_df.set_index('#')
-        updated_indexed = updated_df.set_index('#')
-
-        # 1. Find DELETED tasks
-        deleted_ids = original_indexed.index.difference(updated_indexed.index)
-        for task_id in deleted_ids:
-            orig_rows = _ensure_df(original_indexed.loc[task_id])
-            for _, orig_row in orig_rows.iterrows():
-                fy = orig_row.get('Fiscal Year', '')
-                fy_display = format_fy(fy) if fy else ''
-                task_name = orig_row.get('TASK', '')
-                log_entries.append({
-                    'Timestamp': timestamp,
-                    'Action': 'DELETE',
-                    'Task ID': task_id,
-                    'User': user_email,
-                    'Source': f"{source_page} ({fy_display})" if fy_display else source_page,
-                    'Field Changed': 'ENTIRE TASK',
-                    'Old Value': _format_log_value(task_name),
-                    'New Value': ''
-                })
-
-        # 2. Find ADDED tasks
-        added_ids = updated_indexed.index.difference(original_indexed.index)
-        for task_id in added_ids:
-            new_rows = _ensure_df(updated_indexed.loc[task_id])
-            for _, new_row in new_rows.iterrows():
-                fy = new_row.get('Fiscal Year', '')
-                fy_display = format_fy(fy) if fy else ''
-                task_name = new_row.get('TASK', '')
-                log_entries.append({
+
+def append_changelog_entry(action, source, field_changed, old_value, new_value, user="system"):
+    """Append a single changelog entry to the changelog table."""
+    entry = {
+        'Timestamp': datetime.now(),
+        'Action': action,
+        'Task ID': 'N/A',
+        'User': user,
+        'Source': source,
+        'Field Changed': field_changed,
+        'Old Value': old_value,
+        'New Value': new_value
+    }
+    return append_changelog_entries([entry])
+
+# --- CHANGELOG DIFF ENGINE ---
+CHANGELOG_COLUMNS = ['Timestamp', 'Action', 'Task ID', 'User', 'Source', 'Field Changed', 'Old Value', 'New Value']
+
+
+def _format_log_value(val):
+    if isinstance(val, pd.Timestamp):
+        return val.strftime('%Y-%m-%d') if not pd.isna(val) else ''
+    if pd.isna(val):
+        return ''
+    return str(val)
+
+
+def _fy_source(source_page, fy):
+    """Source label for whole-task entries, e.g. 'Bulk Edit (FY26)'."""
+    fy_display = format_fy(fy) if fy else ''
+    return f"{source_page} ({fy_display})" if fy_display else source_page
+
+
+def _cells_differ(old, new):
+    """Element-wise `str(old) != str(new)` for two aligned Series, without per-cell work where possible.
+
+    Same-dtype, non-object columns compare natively (equal values always print the
+    same); anything else falls back to comparing the string forms of the cells.
+    """
+    if old.dtype == new.dtype and old.dtype != object:
+        same = (old.to_numpy() == new.to_numpy()) | (old.isna().to_numpy() & new.isna().to_numpy())
+        return ~same
+    old_str = np.array([str(v) for v in old.to_numpy(dtype=object)], dtype=object)
+    new_str = np.array([str(v) for v in new.to_numpy(dtype=object)], dtype=object)
+    return old_str != new_str
+
+
+def _entire_task_entries(rows, ids, action, timestamp, user_email, source_page):
+    """ADD/DELETE changelog rows for whole tasks; `ids` holds the logged Task ID per row."""
+    task_names = rows['TASK'] if 'TASK' in rows.columns else pd.Series('', index=rows.index)
+    fiscal_years = rows['Fiscal Year'] if 'Fiscal Year' in rows.columns else pd.Series('', index=rows.index)
+    names = task_names.map(_format_log_value).tolist()
+    blank = [''] * len(rows)
+    return pd.DataFrame({
+        'Timestamp': timestamp,
+        'Action': action,
+        'Task ID': list(ids),
+        'User': user_email,
+        'Source': [_fy_source(source_page, fy) for fy in fiscal_years.tolist()],
+        'Field Changed': 'ENTIRE TASK',
+        'Old Value': names if action == 'DELETE' else blank,
+        'New Value': blank if action == 'DELETE' else names,
+    }, columns=CHANGELOG_COLUMNS)
+
+
+def build_changelog_entries(original_df, updated_df, user_email="system", source_page="Unknown", timestamp=None):
+    """
+    Describe how `original_df` became `updated_df` as changelog rows (a DataFrame).
+
+    - DELETE / ADD: one 'ENTIRE TASK' row per task whose '#' disappeared / appeared.
+    - EDIT: rows sharing '#', 'Fiscal Year' and 'TASK' are paired with a single merge,
+      whole columns are compared at once, and only the differing cells are emitted.
+    """
+    timestamp = timestamp if timestamp is not None else datetime.now()
+    original = original_df.reset_index(drop=True)
+    updated = updated_df.reset_index(drop=True)
+    original_ids = pd.Index(original['#'])
+    updated_ids = pd.Index(updated['#'])
+    frames = []
+
+    # 1. DELETED tasks, grouped by id in sorted id order
+    deleted_ids = original_ids.difference(updated_ids)
+    if len(deleted_ids):
+        pos = pd.Series(deleted_ids.get_indexer(original_ids))
+        pos = pos[pos >= 0].sort_values(kind='stable')
+        frames.append(_entire_task_entries(original.loc[pos.index], deleted_ids[pos.to_numpy()],
+                                           'DELETE', timestamp, user_email, source_page))
+
+    # 2. ADDED tasks
+    added_ids = updated_ids.difference(original_ids)
+    if len(added_ids):
+        pos = pd.Series(added_ids.get_indexer(updated_ids))
+        pos = pos[pos >= 0].sort_values(kind='stable')
+        frames.append(_entire_task_entries(updated.loc[pos.index], added_ids[pos.to_numpy()],
+                                           'ADD', timestamp, user_email, source_page))
+
+    # 3. EDITED tasks: pair each original row with the first updated row sharing its
+    # '#', 'Fiscal Year' and 'TASK' (missing keys never match), then diff column-wise.
+    common_ids = original_ids.intersection(updated_ids)
+    if len(common_ids):
+        key_cols = ['#', 'Fiscal Year', 'TASK']
+        left = original[key_cols].astype(object)
+        left['_orig_pos'] = np.arange(len(left))
+        right = updated[key_cols].astype(object)
+        right['_upd_pos'] = np.arange(len(right))
+        left = left[left[key_cols].notna().all(axis=1)]
+        right = right[right[key_cols].notna().all(axis=1)].drop_duplicates(subset=key_cols, keep='first')
+        pairs = left.merge(right, on=key_cols, how='inner', sort=False)
+        # Log in the order the ids first appear in the original frame, then by row
+        pairs['_id_pos'] = common_ids.get_indexer(pairs['#'])
+        pairs = pairs.sort_values(['_id_pos', '_orig_pos'], kind='stable')
+
+        compare_cols = [col for col in original.columns if col not in ['#', 'id']]
+        if not pairs.empty and compare_cols:
+            orig_pos = pairs['_orig_pos'].to_numpy()
+            upd_pos = pairs['_upd_pos'].to_numpy()
+            old_cols, new_cols, differ = [], [], []
+            for col in compare_cols:
+                old = original[col].iloc[orig_pos].reset_index(drop=True)
+                if col in updated.columns:
+                    new = updated[col].iloc[upd_pos].reset_index(drop=True)
+                else:
+                    new = pd.Series([None] * len(pairs), dtype=object)
+                old_cols.append(old)
+                new_cols.append(new)
+                differ.append(_cells_differ(old, new))
+
+            # Melt only the differing cells into log rows, row-major (task, then column)
+            row_idx, col_idx = np.nonzero(np.column_stack(differ))
+            if len(row_idx):
+                task_ids = common_ids[pairs['_id_pos'].to_numpy()[row_idx]]
+                orig_fys = original['Fiscal Year'].iloc[orig_pos].to_numpy(dtype=object)[row_idx]
+                old_values = np.empty(len(row_idx), dtype=object)
+                new_values = np.empty(len(row_idx), dtype=object)
+                for c in np.unique(col_idx):
+                    in_col = col_idx == c
+                    rows = row_idx[in_col]
+                    old_values[in_col] = [_format_log_value(v) for v in old_cols[c].iloc[rows].to_numpy(dtype=object)]
+                    new_values[in_col] = [_format_log_value(v) for v in new_cols[c].iloc[rows].to_numpy(dtype=object)]
+                frames.append(pd.DataFrame({
                     'Timestamp': timestamp,
-                    'Action': 'ADD',
-                    'Task ID': task_id,
+                    'Action': 'EDIT',
+                    'Task ID': list(task_ids),
                     'User': user_email,
-                    'Source': f"{source_page} ({fy_display})" if fy_display else source_page,
-                    'Field Changed': 'ENTIRE TASK',
-                    'Old Value': '',
-                    'New Value': _format_log_value(task_name)
-                })
-
-        # 3. Find EDITED tasks (handle multiple fiscal years per task_id)
-        common_ids = original_indexed.index.intersection(updated_indexed.index)
-        for task_id in common_ids:
-            orig_task_rows = original_indexed.loc[original_indexed.index == task_id]
-            updated_task_rows = updated_indexed.loc[updated_indexed.index == task_id]
-
-            for _, orig_row in orig_task_rows.iterrows():
-                orig_fy = orig_row.get('Fiscal Year')
-                orig_task_name = orig_row.get('TASK')
-
-                updated_row_match = updated_task_rows[
-                    (updated_task_rows['Fiscal Year'] == orig_fy) &
-                    (updated_task_rows['TASK'] == orig_task_name)
-                ]
-
-                if not updated_row_match.empty:
-                    updated_row = updated_row_match.iloc[0]
-                    for col in original_df.columns:
-                        if col not in ['#', 'id']:
-                            old_val = orig_row.get(col)
-                            new_val = updated_row.get(col)
-                            if str(old_val) != str(new_val):
-                                log_entries.append({
-                                    'Timestamp': timestamp, 'Action': 'EDIT', 'Task ID': task_id,
-                                    'User': user_email, 'Source': f"{source_page} ({format_fy(orig_fy)})", 'Field Changed': col, 
-                                    'Old Value': _format_log_value(old_val), 'New Value': _format_log_value(new_val)
-                                })
-        
-        # Save the log if there are new entries
-        if log_entries:
-            changelog_df = load_table('changelog')
-            new_log_df = pd.DataFrame(log_entries)
-            if changelog_df is None:
-                changelog_df = pd.DataFrame()
-            
-            combined_log = pd.concat([changelog_df, new_log_df], ignore_index=True)
-            save_table(combined_log, 'changelog')
-        
-        # Finally, save the updated tasks table
-        saved = save_table(updated_df, 'tasks')
+                    'Source': [f"{source_page} ({format_fy(fy)})" for fy in orig_fys],
+                    'Field Changed': [compare_cols[c] for c in col_idx],
+                    'Old Value': old_values,
+                    'New Value': new_values,
+                }, columns=CHANGELOG_COLUMNS))
+
+    if not frames:
+        return pd.DataFrame(columns=CHANGELOG_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# --- Bulk upload preview ---
+UPLOAD_DIFF_COLUMNS = ['#', 'action', 'field', 'old', 'new']
+
+
+def diff_upload(original_df, proposed_df, key='#'):
+    """
+    Field-by-field preview of applying an upload: one row per changed field with
+    columns '#', 'action' ('UPDATE' or 'APPEND'), 'field', 'old' and 'new'.
+    Rows of proposed_df whose key isn't in original_df (compared as text) are APPENDs.
+    """
+    diffs = []
+    compare_cols = [c for c in original_df.columns if c != key]
+
+    # Build dicts for quick lookup
+    orig_map = original_df.set_index(key).to_dict(orient='index')
+    prop_map = proposed_df.set_index(key).to_dict(orient='index')
+    orig_keys = {str(k): k for k in orig_map}
+
+    for pid, prow in prop_map.items():
+        orig_key = orig_keys.get(str(pid))
+        if orig_key is not None:
+            orig = orig_map[orig_key]
+            for col in compare_cols:
+                o = orig.get(col, None)
+                n = prow.get(col, None)
+                # Normalize datetimes to strings for comparison
+                if hasattr(o, 'to_pydatetime'):
+                    o = str(o)
+                if hasattr(n, 'to_pydatetime'):
+                    n = str(n)
+                if pd.isna(o) and pd.isna(n):
+                    continue
+                if (o is None and n is None) or (o == n):
+                    continue
+                diffs.append({'#': pid, 'action': 'UPDATE', 'field': col, 'old': o, 'new': n})
+        else:
+            # New appended row
+            for col in compare_cols:
+                n = prow.get(col, None)
+                if n is not None and not (pd.isna(n)):
+                    diffs.append({'#': pid, 'action': 'APPEND', 'field': col, 'old': '', 'new': n})
+    return pd.DataFrame(diffs, columns=UPLOAD_DIFF_COLUMNS)
 
-        # If save succeeded, regenerate public ICS calendar (best-effort)
-        if saved:
-            try:
-                generate_and_publish_ics(updated_df)
-            except Exception as e:
-                # Non-fatal: ICS generation/publish should not block data save
-                st.warning(f"Calendar (.ics) generation failed: {e}")
+
+# --- FULLY IMPLEMENTED CHANGELOG FUNCTION ---
+def save_and_log_changes(original_df, updated_df, user_email="system", source_page="Unknown", shown_versions=None):
+    """
+    Compares two dataframes, saves the rows that changed to the 'tasks' table
+    and logs the changes to the 'changelog' table.
+
+    Rows someone else changed since `original_df` was loaded (or, for the rows in
+    `shown_versions`, since the page showed them; see shown_row_versions()) are not
+    overwritten; they are reported with st.warning and the function returns False.
+    """
+    try:
+        if shown_versions is not None:
+            original_df = _with_row_versions(original_df, shown_versions)
+        with timed_span('save_and_log_changes: write tasks'):
+            result = commit_task_changes(original_df, updated_df)
+        if result is None:
+            # Database without row versions: diff against the stored table instead
+            with timed_span('save_and_log_changes: changelog diff'):
+                new_log_df = build_changelog_entries(original_df, updated_df, user_email, source_page)
+            if not new_log_df.empty:
+                with timed_span('save_and_log_changes: changelog write'):
+                    append_changelog_entries(new_log_df)
+            with timed_span('save_and_log_changes: write tasks'):
+                saved = upsert_table(updated_df, 'tasks')
+            published = saved
+        else:
+            applied_df, conflicts = result
+            with timed_span('save_and_log_changes: changelog diff'):
+                new_log_df = build_changelog_entries(
+                    original_df.drop(columns=TASK_META_COLUMNS, errors='ignore'),
+                    applied_df.drop(columns=TASK_META_COLUMNS, errors='ignore'),
+                    user_email, source_page)
+            if not new_log_df.empty:
+                with timed_span('save_and_log_changes: changelog write'):
+                    append_changelog_entries(new_log_df)
+            if conflicts:
+                shown = ', '.join(f"#{c[0]} ({format_fy(c[1])}): {c[2]}" for c in conflicts[:10])
+                more = f" and {len(conflicts) - 10} more" if len(conflicts) > 10 else ""
+                st.warning(f"{len(conflicts)} task(s) were not saved because they changed since you loaded them: "
+                           f"{shown}{more}. Your other changes were saved; reload the page to see the latest data.")
+            saved = not conflicts
+            published = True
+
+        # Regenerate the public ICS calendar in the background; rapid saves share one rebuild
+        if published:
+            with timed_span('save_and_log_changes: queue publish'):
+                enqueue_job('publish_ics', coalesce_key='publish_ics')
 
         return saved
 
@@ -377,12 +2253,8 @@ def save_and_log_changes(original_df, updated_df, user_email="system", source_pa
         return False
 
 # --- UPDATED Email Sending Function ---
-def send_comment_email(recipient_email, author_email, task_details, comment_text):
-    """Constructs and sends a single comment notification email with more details."""
-    if not all([SENDER_EMAIL, SENDER_PASSWORD]):
-        st.error("Email credentials are not configured in secrets. Email cannot be sent.")
-        return
-
+def _build_comment_email(recipient_email, author_email, task_details, comment_text):
+    """Builds the comment notification message for one recipient."""
     message = MIMEMultipart()
     message['From'] = SENDER_EMAIL
     message['To'] = recipient_email
@@ -428,13 +2300,104 @@ def send_comment_email(recipient_email, author_email, task_details, comment_text
     </html>
     """
     message.attach(MIMEText(html, 'html'))
+    return message
+
+
+def _email_configured():
+    return bool(SENDER_EMAIL) and (bool(SENDER_PASSWORD) or not SMTP_STARTTLS)
+
+
+def _open_smtp():
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    try:
+        if SMTP_STARTTLS:
+            server.starttls()
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _send_batch(batch):
+    """Sends a list of (recipient_email, message) over one SMTP session. Returns the failures."""
+    failures = []
+    with _smtp_slots:
+        server = None
+        try:
+            for recipient_email, message in batch:
+                for attempt in range(2):
+                    try:
+                        if server is None:
+                            with timed_span('send_emails: smtp connect'):
+                                server = _open_smtp()
+                        with timed_span('send_emails: smtp send'):
+                            refused = server.sendmail(SENDER_EMAIL, [recipient_email], message.as_string())
+                        if refused:
+                            failures.append((recipient_email, str(refused)))
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        # The server dropped the session (idle timeout, per-session limit): reconnect once
+                        server = None
+                        if attempt:
+                            failures.append((recipient_email, str(e)))
+                    except Exception as e:
+                        failures.append((recipient_email, str(e)))
+                        if not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                            # Connection-level failure; start a fresh session for the next message
+                            if server is not None:
+                                server.close()
+                            server = None
+                        break
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    server.close()
+    return failures
+
+
+def send_emails(messages, max_connections=None):
+    """
+    Sends (recipient_email, message) pairs, reusing one authenticated SMTP session for
+    up to SMTP_BATCH_SIZE messages. Larger sends are split over at most
+    `max_connections` (default SMTP_MAX_CONNECTIONS) parallel sessions.
+    Returns a list of (recipient_email, error) for the messages that weren't sent.
+    """
+    messages = list(messages)
+    if not messages:
+        return []
+    if not _email_configured():
+        raise RuntimeError("Email credentials are not configured in secrets.")
+    batch_size = max(1, SMTP_BATCH_SIZE)
+    batches = [messages[i:i + batch_size] for i in range(0, len(messages), batch_size)]
+    workers = min(len(batches), max(1, max_connections or SMTP_MAX_CONNECTIONS))
+    if workers == 1:
+        results = [_send_batch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hrl-smtp') as pool:
+            results = list(pool.map(_send_batch, batches))
+    return [failure for result in results for failure in result]
+
+
+def _deliver_email(recipient_email, message):
+    """Sends one message over SMTP. Raises on any failure."""
+    failures = send_emails([(recipient_email, message)])
+    if failures:
+        raise RuntimeError(failures[0][1])
+
 
+def send_comment_email(recipient_email, author_email, task_details, comment_text):
+    """Constructs and sends a single comment notification email with more details."""
+    if not _email_configured():
+        st.error("Email credentials are not configured in secrets. Email cannot be sent.")
+        return
+
+    message = _build_comment_email(recipient_email, author_email, task_details, comment_text)
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.sendmail(SENDER_EMAIL, [recipient_email], message.as_string())
-        server.quit()
+        _deliver_email(recipient_email, message)
     except Exception as e:
         st.error(f"Failed to send email to {recipient_email}: {e}")
 
@@ -448,7 +2411,9 @@ def add_comment_and_notify(task_id, author_email, comment_text, assigned_title,
     new_comment_id = comments_df['comment_id'].max() + 1 if not comments_df.empty else 1
     new_comment = pd.DataFrame([{'comment_id': new_comment_id, 'task_id': task_id, 'user_email': author_email, 'timestamp': datetime.now(), 'comment_text': comment_text}])
     updated_comments = pd.concat([comments_df, new_comment], ignore_index=True)
-    save_table(updated_comments, 'comments')
+    if save_table(updated_comments, 'comments'):
+        with engine.begin() as conn:
+            _update_search_index(conn, [task_id])
 
     users_df = load_table('users')
     tasks_df = load_table('tasks')
@@ -474,9 +2439,13 @@ def add_comment_and_notify(task_id, author_email, comment_text, assigned_title,
         new_notifications = []
         last_id = notifications_df['notification_id'].max() if not notifications_df.empty else 0
 
+        # Emails are sent in the background (all recipients over one SMTP session)
+        # so the comment is saved without waiting on SMTP
+        email_details = {col: _sql_value(task_details.get(col))
+                         for col in ('TASK', 'PLANNER BUCKET', 'Fiscal Year', 'START', 'END')}
+        enqueue_job('comment_email', {'recipients': sorted(recipients_to_notify), 'author_email': author_email,
+                                      'task_details': email_details, 'comment_text': comment_text})
         for recipient_email in recipients_to_notify:
-            send_comment_email(recipient_email, author_email, task_details, comment_text)
-            
             last_id += 1
             header = f"New comment from {author_email} on task #{task_id}"
             message = f"{header} |:| {comment_text}"
@@ -577,94 +2546,288 @@ def delete_filter_preset(user_email, preset_name):
         return False
 
 
-# --- iCalendar generation & publishing ---
+# --- Calendar engine ---
+# Every calendar the app produces (Calendar View and Find & Filter downloads, the
+# published feeds, generate_calendar_local.py, calendar_server) goes through the
+# same serializer, ics_export's columnar one, which keeps each event's bytes per
+# task UID so only edited tasks are re-serialized. build_calendar() filters,
+# counts and serializes in one pass and memoizes the result per filter selection
+# and 'tasks' data version, so a page rerun with the same filters costs nothing.
+CALENDAR_NAME = 'HRL Project Tracker'
+_CALENDAR_BUILD_CACHE_SIZE = 16
+_CALENDAR_BUILDS = OrderedDict()
+
+
+def _scheduled_tasks(tasks_df):
+    """The rows of tasks_df that become calendar events (START and END both set)."""
+    if tasks_df is None or tasks_df.empty or 'START' not in tasks_df.columns or 'END' not in tasks_df.columns:
+        return pd.DataFrame(columns=tasks_df.columns if tasks_df is not None else [])
+    return tasks_df[pd.notna(tasks_df['START']) & pd.notna(tasks_df['END'])]
+
+
+def _calendar_selection(years=None, buckets=None, task_keys=None):
+    """Normalize build_calendar() filters. Returns (years, buckets, task_keys, cache key)."""
+    years = _as_list(years)
+    if years is not None:
+        years = [_as_year(y) for y in years]
+    buckets = _as_list(buckets)
+    if task_keys is not None:
+        task_keys = [(_as_year(number), _as_year(year)) for number, year in task_keys]
+    cache_key = (
+        None if years is None else tuple(map(str, years)),
+        None if buckets is None else tuple(map(str, buckets)),
+        None if task_keys is None else hashlib.sha1(repr(task_keys).encode('utf-8')).hexdigest(),
+    )
+    return years, buckets, task_keys, cache_key
+
+
+def _cached_calendar(cache_key):
+    """Return (tasks version, memoized build or None). Caller holds _cache_lock."""
+    version = _TABLE_VERSIONS.get('tasks', 0)
+    cached = _CALENDAR_BUILDS.get(cache_key)
+    if cached is not None and cached[0] == version:
+        _CALENDAR_BUILDS.move_to_end(cache_key)
+        _count_cache('calendar', 'hits')
+        return version, cached[1]
+    _count_cache('calendar', 'misses')
+    return version, None
+
+
+def build_calendar(years=None, buckets=None, task_keys=None):
+    """
+    Build the calendar for a filter selection in one pass.
+
+    years and buckets filter like load_tasks(); task_keys optionally narrows the
+    result to the given (#, Fiscal Year) pairs (e.g. the rows a search matched, or a
+    single task). Returns a dict with
+      'events': DataFrame of the tasks included as events (START and END set),
+      'event_count': the number of events,
+      'ics': the .ics file as bytes,
+    or None if the tasks can't be loaded. Results are memoized per selection until
+    the 'tasks' data version changes.
+    """
+    years, buckets, task_keys, cache_key = _calendar_selection(years, buckets, task_keys)
+    with _cache_lock:
+        version, build = _cached_calendar(cache_key)
+    if build is not None:
+        return {**build, 'events': build['events'].copy()}
+
+    tasks_df = load_tasks(years=years, buckets=buckets)
+    if tasks_df is None:
+        return None
+    if task_keys is not None:
+        wanted = set(task_keys)
+        keys = zip(tasks_df['#'].map(_as_year), tasks_df['Fiscal Year'].map(_as_year))
+        tasks_df = tasks_df[[key in wanted for key in keys]]
+    events = _scheduled_tasks(tasks_df)
+    with timed_span('build_calendar: serialize'):
+        ics_bytes = ics_export.generate_ics_from_df(events, calendar_name=CALENDAR_NAME)
+    build = {'events': events, 'event_count': len(events), 'ics': ics_bytes}
+
+    with _cache_lock:
+        if _TABLE_VERSIONS.get('tasks', 0) == version:
+            _CALENDAR_BUILDS[cache_key] = (version, build)
+            _CALENDAR_BUILDS.move_to_end(cache_key)
+            while len(_CALENDAR_BUILDS) > _CALENDAR_BUILD_CACHE_SIZE:
+                _CALENDAR_BUILDS.popitem(last=False)
+    return {**build, 'events': events.copy()}
+
+
+def calendar_ics_chunks(years=None, buckets=None):
+    """
+    build_calendar(years, buckets)['ics'] as an iterator of chunks, for streaming
+    large feeds: a memoized calendar is returned whole, otherwise the events are
+    serialized chunk by chunk as they are sent. None if the tasks can't be loaded.
+    """
+    years, buckets, _, cache_key = _calendar_selection(years, buckets)
+    with _cache_lock:
+        _, build = _cached_calendar(cache_key)
+    if build is not None:
+        return iter([build['ics']])
+    tasks_df = load_tasks(years=years, buckets=buckets)
+    if tasks_df is None:
+        return None
+    return ics_export.iter_ics_from_df(_scheduled_tasks(tasks_df), calendar_name=CALENDAR_NAME)
+
+
+def generate_calendar_ics(tasks_df):
+    """Serialize an already loaded tasks frame (e.g. one being published) with the calendar engine."""
+    return ics_export.generate_ics_from_df(_scheduled_tasks(tasks_df), calendar_name=CALENDAR_NAME)
+
+
 def generate_calendar_from_tasks(tasks_df):
-    """Return an icalendar.Calendar built from the tasks DataFrame.
+    """Return the calendar engine's output for tasks_df as an icalendar.Calendar (for .walk())."""
+    return Calendar.from_ical(generate_calendar_ics(tasks_df))
+
+# --- Calendar publishing ---
+# The published calendar is split into the main feed plus one feed per planner
+# bucket and per fiscal year. Each object is stored gzip-encoded with the SHA-256
+# of its content in the object metadata, and is only uploaded again when that
+# hash changes. S3 clients are created once per set of credentials. Setting
+# S3_STANDIN_DIR stores the objects in a local directory instead of S3, which is
+# handy for trying the publishing path without network access or boto3.
+_S3_CLIENTS = {}
+_PUBLISHED_HASHES = {}
+_publish_lock = threading.Lock()
+
+
+class _FilesystemS3:
+    """Stand-in for the two boto3 S3 client calls used here, keeping objects under a directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split('/'))
+
+    def put_object(self, Bucket, Key, Body, **params):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(Body)
+        with open(path + '.meta.json', 'w') as f:
+            json.dump({name: value for name, value in params.items()}, f)
+        return {}
+
+    def head_object(self, Bucket, Key):
+        with open(self._path(Bucket, Key) + '.meta.json') as f:
+            return json.load(f)
+
+
+def _s3_settings():
+    """The `S3` secrets section, with S3_BUCKET / S3_KEY_PREFIX / S3_STANDIN_DIR / S3_GZIP
+    environment overrides. Returns None if calendars aren't published to S3."""
+    try:
+        settings = dict(st.secrets.get('S3') or {})
+    except Exception:
+        settings = {}
+    for name in ('BUCKET', 'KEY_PREFIX', 'STANDIN_DIR', 'GZIP'):
+        if os.environ.get(f'S3_{name}'):
+            settings[name] = os.environ[f'S3_{name}']
+    if settings.get('STANDIN_DIR') and not settings.get('BUCKET'):
+        settings['BUCKET'] = 'hrl-project-tracker'
+    return settings if settings.get('BUCKET') else None
+
+
+def _s3_client(s3_info):
+    """Shared S3 client (or filesystem stand-in) for these settings, or None if unavailable."""
+    if s3_info.get('STANDIN_DIR'):
+        return _FilesystemS3(s3_info['STANDIN_DIR'])
+    if not _BOTO3_AVAILABLE:
+        return None
+    credentials = (s3_info.get('AWS_ACCESS_KEY_ID'), s3_info.get('AWS_SECRET_ACCESS_KEY'))
+    with _publish_lock:
+        client = _S3_CLIENTS.get(credentials)
+        if client is None:
+            # Build boto3 client using provided credentials if available
+            if all(credentials):
+                client = boto3.client('s3', aws_access_key_id=credentials[0], aws_secret_access_key=credentials[1])
+            else:
+                client = boto3.client('s3')
+            _S3_CLIENTS[credentials] = client
+        return client
 
-    Uses the icalendar library to produce an object compatible with .to_ical() and .walk().
-    For byte-level ICS output (user downloads), prefer ics_export.generate_ics_from_df() instead.
-    """
-    cal = Calendar()
-    cal.add('prodid', '-//HRL Project Tracker//EN')
-    cal.add('version', '2.0')
-    cal.add('method', 'PUBLISH')
-    cal.add('x-wr-calname', 'HRL Project Tracker')
 
-    if tasks_df is None or tasks_df.empty:
-        return cal
+def _feed_slug(name):
+    slug = re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+    return slug or 'untitled'
 
-    for _, row in tasks_df.iterrows():
-        start = row.get('START')
-        end = row.get('END')
-        if pd.isna(start) and pd.isna(end):
-            continue
 
-        ev = Event()
-        uid_val = str(row.get('#', uuid.uuid4()))
-        ev.add('uid', uid_val + '@hrl-project-tracker')
-        ev.add('summary', str(row.get('TASK', 'No Title')))
-        if pd.notna(start):
-            ev.add('dtstart', start)
-        if pd.notna(end):
-            ev.add('dtend', end)
-        desc = []
-        desc.append(f"Planner Bucket: {row.get('PLANNER BUCKET', '')}")
-        desc.append(f"Assignment Title: {row.get('ASSIGNMENT TITLE', '')}")
-        desc.append(f"Progress: {row.get('PROGRESS', '')}")
-        fy = row.get('Fiscal Year', '')
-        if fy:
-            desc.append(f"Fiscal Year: {format_fy(fy)}")
-        ev.add('description', '\n'.join(desc))
-        cal.add_component(ev)
-
-    return cal
+def calendar_feeds(tasks_df):
+    """Yield (relative key, tasks) for the main calendar and each per-bucket and per-year feed."""
+    yield 'calendar.ics', tasks_df
+    if tasks_df is None or tasks_df.empty:
+        return
+    used = set()
+    for bucket, group in tasks_df.groupby('PLANNER BUCKET', sort=True):
+        slug = _feed_slug(bucket)
+        if slug in used:
+            # Names that differ only in punctuation or case
+            slug = f"{slug}-{hashlib.sha1(str(bucket).encode('utf-8')).hexdigest()[:6]}"
+        used.add(slug)
+        yield f'calendar/bucket/{slug}.ics', group
+    years = pd.to_numeric(tasks_df['Fiscal Year'], errors='coerce')
+    for year, group in tasks_df.groupby(years, sort=True):
+        yield f'calendar/year/{format_fy(int(year))}.ics', group
+
+
+_STAMP_LINES = re.compile(rb'^(?:DTSTAMP|LAST-MODIFIED):[^\r\n]*\r\n', re.MULTILINE)
+
+
+def _feed_digest(ics_bytes):
+    # Tasks never edited since updated_at was added are stamped with the time they
+    # were first rendered, which differs between processes; leave the stamps out
+    return hashlib.sha256(_STAMP_LINES.sub(b'', ics_bytes)).hexdigest()
+
+
+def _publish_object(s3, bucket, key, ics_bytes, use_gzip):
+    """Upload one feed unless the stored object already has this content. Returns True if uploaded."""
+    digest = _feed_digest(ics_bytes)
+    with _publish_lock:
+        known = _PUBLISHED_HASHES.get((bucket, key))
+    if known is None:
+        try:
+            known = s3.head_object(Bucket=bucket, Key=key).get('Metadata', {}).get('content-sha256')
+        except Exception:
+            known = None
+    if known == digest:
+        with _publish_lock:
+            _PUBLISHED_HASHES[(bucket, key)] = digest
+        return False
+    params = {'ContentType': 'text/calendar; charset=utf-8', 'ACL': 'public-read',
+              'Metadata': {'content-sha256': digest}, 'CacheControl': 'no-cache'}
+    body = ics_bytes
+    if use_gzip:
+        # mtime=0 keeps the compressed bytes identical for identical content
+        body = gzip.compress(ics_bytes, mtime=0)
+        params['ContentEncoding'] = 'gzip'
+    s3.put_object(Bucket=bucket, Key=key, Body=body, **params)
+    with _publish_lock:
+        _PUBLISHED_HASHES[(bucket, key)] = digest
+    return True
 
 
 def generate_and_publish_ics(tasks_df, local_path='calendar.ics'):
-    """Generate an .ics file from tasks_df and either upload to S3 (if configured) or write locally.
+    """Generate the calendar feeds from tasks_df and either upload them to S3 (if configured) or write locally.
 
     Behavior:
     - If st.secrets contains a section `S3` with keys `BUCKET`, `KEY_PREFIX` (optional),
       `AWS_ACCESS_KEY_ID`, `AWS_SECRET_ACCESS_KEY` (or use IAM role), the function will upload
-      the generated calendar to that S3 bucket and return the public HTTPS URL.
+      `calendar.ics` plus `calendar/bucket/<bucket>.ics` and `calendar/year/<FY>.ics` to that
+      S3 bucket (gzip-encoded unless `GZIP` is false, skipping feeds whose content hasn't
+      changed) and return the public HTTPS URL of the main feed.
     - Otherwise, it writes a local `calendar.ics` next to the running script and returns the path.
 
     This function is best-effort and will not raise on upload errors (it will raise only on programming errors).
     """
-    cal = generate_calendar_from_tasks(tasks_df)
-
-    ics_bytes = cal.to_ical()
+    s3_info = _s3_settings()
+    s3 = _s3_client(s3_info) if s3_info else None
 
-    # Prefer S3 publish if configured and boto3 available
-    s3_info = None
-    try:
-        s3_info = st.secrets.get('S3')
-    except Exception:
-        s3_info = None
-
-    if s3_info and _BOTO3_AVAILABLE:
+    if s3 is not None:
         bucket = s3_info.get('BUCKET')
         key_prefix = s3_info.get('KEY_PREFIX', '')
-        key_name = (key_prefix.rstrip('/') + '/' if key_prefix else '') + 'calendar.ics'
-
-        # Build boto3 client using provided credentials if available
+        prefix = key_prefix.rstrip('/') + '/' if key_prefix else ''
+        use_gzip = _as_bool(s3_info.get('GZIP', True))
         try:
-            if s3_info.get('AWS_ACCESS_KEY_ID') and s3_info.get('AWS_SECRET_ACCESS_KEY'):
-                s3 = boto3.client('s3', aws_access_key_id=s3_info.get('AWS_ACCESS_KEY_ID'), aws_secret_access_key=s3_info.get('AWS_SECRET_ACCESS_KEY'))
-            else:
-                s3 = boto3.client('s3')
-
-            s3.put_object(Bucket=bucket, Key=key_name, Body=ics_bytes, ContentType='text/calendar', ACL='public-read')
+            uploaded = 0
+            for key, feed_df in calendar_feeds(tasks_df):
+                ics_bytes = generate_calendar_ics(feed_df)
+                with timed_span('generate_and_publish_ics: upload'):
+                    uploaded += _publish_object(s3, bucket, prefix + key, ics_bytes, use_gzip)
+            if uploaded:
+                print(f"Published {uploaded} calendar feed(s) to s3://{bucket}/{prefix}")
             # Construct URL (note: this may vary by region or hosting settings)
-            url = f"https://{bucket}.s3.amazonaws.com/{key_name}"
+            url = f"https://{bucket}.s3.amazonaws.com/{prefix}calendar.ics"
             return url
-        except (BotoCoreError, NoCredentialsError) as e:
-            # Fall through to local write
-            st.warning(f"S3 upload failed or not configured properly: {e}")
         except Exception as e:
-            st.warning(f"S3 upload failed: {e}")
+            # Fall through to local write
+            if _BOTO3_AVAILABLE and isinstance(e, (BotoCoreError, NoCredentialsError)):
+                st.warning(f"S3 upload failed or not configured properly: {e}")
+            else:
+                st.warning(f"S3 upload failed: {e}")
 
     # Fallback: write local file
+    ics_bytes = generate_calendar_ics(tasks_df)
     try:
         base_dir = os.path.dirname(__file__)
         out_path = os.path.join(base_dir, local_path)
@@ -674,6 +2837,251 @@ def generate_and_publish_ics(tasks_df, local_path='calendar.ics'):
     except Exception as e:
         raise
 
+# --- Background jobs (ICS publishing, email) ---
+# Side effects of a save (rebuilding the public calendar, notification emails) run
+# on a small thread pool instead of in the user's request. Jobs are stored in the
+# 'jobs' table first, so work queued before a restart is picked up again. A job
+# enqueued with a coalesce_key is merged into a pending job with the same key, and
+# new jobs wait JOB_COALESCE_DELAY seconds before running, so a burst of saves
+# produces a single calendar rebuild. Failed jobs are retried with a backoff.
+# Only the app runs the worker (Main.py calls start_job_worker()); other processes
+# that import this module (scripts, calendar_server.py) just queue their jobs for it.
+# Set JOB_WORKERS to 0 to run jobs inline instead (scripts, debugging).
+JOB_WORKERS = _db_setting('JOB_WORKERS', 2, int)
+JOB_COALESCE_DELAY = _db_setting('JOB_COALESCE_DELAY', 1.0, float)
+JOB_MAX_ATTEMPTS = _db_setting('JOB_MAX_ATTEMPTS', 3, int)
+JOB_RETRY_DELAY = _db_setting('JOB_RETRY_DELAY', 30.0, float)
+JOB_POLL_INTERVAL = _db_setting('JOB_POLL_INTERVAL', 5.0, float)
+# A job still 'running' after this long belongs to a process that died
+JOB_STALE_AFTER = _db_setting('JOB_STALE_AFTER', 600.0, float)
+
+_job_lock = threading.Lock()
+_job_wakeup = threading.Event()
+_job_worker = None
+_job_executor = None
+_jobs_in_flight = set()
+_jobs_table_ready = False
+
+
+def _run_publish_ics_job(payload):
+    tasks_df = load_table('tasks')
+    if tasks_df is None:
+        raise RuntimeError("could not load tasks")
+    generate_and_publish_ics(tasks_df)
+
+
+def _run_comment_email_job(payload):
+    # Jobs queued by older versions carry a single 'recipient_email'
+    recipients = payload.get('recipients') or [payload['recipient_email']]
+    messages = [(recipient, _build_comment_email(recipient, payload['author_email'],
+                                                 payload['task_details'], payload['comment_text']))
+                for recipient in recipients]
+    failures = send_emails(messages)
+    if len(failures) == len(messages):
+        raise RuntimeError('; '.join(f"{r}: {e}" for r, e in failures))
+    if failures:
+        # Retry only the recipients that failed, so nobody gets the email twice
+        retry = dict(payload, recipients=[r for r, _ in failures])
+        retry.pop('recipient_email', None)
+        enqueue_job('comment_email', retry, delay=JOB_RETRY_DELAY)
+
+
+_JOB_HANDLERS = {
+    'publish_ics': _run_publish_ics_job,
+    'comment_email': _run_comment_email_job,
+}
+
+
+def _ensure_jobs_table():
+    global _jobs_table_ready
+    if not _jobs_table_ready:
+        with engine.begin() as conn:
+            db_schema.jobs.create(conn, checkfirst=True)
+        _jobs_table_ready = True
+
+
+def enqueue_job(kind, payload=None, coalesce_key=None, delay=None):
+    """
+    Queues a background job and returns its job_id. If `coalesce_key` is given and a
+    job with that key is still pending, no new job is added and its id is returned.
+    The job runs after `delay` seconds (default JOB_COALESCE_DELAY).
+    Jobs are run inline when JOB_WORKERS is 0 or the queue can't be used; returns
+    None in that case. Queued jobs are run by the app's worker (see start_job_worker()).
+    """
+    if kind not in _JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if JOB_WORKERS <= 0:
+        _run_job_inline(kind, payload)
+        return None
+    jobs = db_schema.jobs
+    now = datetime.now()
+    try:
+        _ensure_jobs_table()
+        with _job_lock, engine.begin() as conn:
+            if coalesce_key is not None:
+                pending = conn.execute(
+                    select(jobs.c.job_id).where(jobs.c.coalesce_key == coalesce_key, jobs.c.status == 'pending')
+                ).first()
+                if pending is not None:
+                    return pending[0]
+            result = conn.execute(jobs.insert().values(
+                kind=kind, coalesce_key=coalesce_key, payload=json.dumps(payload or {}, default=str),
+                status='pending', attempts=0, created_at=now, updated_at=now,
+                run_after=now + pd.Timedelta(seconds=JOB_COALESCE_DELAY if delay is None else delay).to_pytimedelta(),
+            ))
+            job_id = result.inserted_primary_key[0]
+    except Exception as e:
+        print(f"Could not queue '{kind}' job, running it now instead: {e}")
+        _run_job_inline(kind, payload)
+        return None
+    _job_wakeup.set()
+    return job_id
+
+
+def _run_job_inline(kind, payload):
+    try:
+        _JOB_HANDLERS[kind](payload or {})
+    except Exception as e:
+        try:
+            st.warning(f"Background task '{kind}' failed: {e}")
+        except Exception:
+            print(f"Background task '{kind}' failed: {e}")
+
+
+def _claim_jobs(limit):
+    """Marks up to `limit` due jobs as running and returns them as (job_id, kind, payload, attempts)."""
+    jobs = db_schema.jobs
+    now = datetime.now()
+    claimed = []
+    with engine.begin() as conn:
+        candidates = conn.execute(
+            select(jobs.c.job_id, jobs.c.kind, jobs.c.payload, jobs.c.attempts, jobs.c.coalesce_key)
+            .where(jobs.c.status == 'pending', jobs.c.run_after <= now)
+            .order_by(jobs.c.job_id).limit(limit * 4)
+        ).all()
+        running_keys = set(conn.execute(
+            select(jobs.c.coalesce_key).where(jobs.c.status == 'running', jobs.c.coalesce_key.is_not(None))
+        ).scalars())
+        for job_id, kind, payload, attempts, coalesce_key in candidates:
+            if len(claimed) >= limit:
+                break
+            if coalesce_key is not None and coalesce_key in running_keys:
+                # Let the running one finish; this one will see its result
+                continue
+            result = conn.execute(
+                jobs.update().where(jobs.c.job_id == job_id, jobs.c.status == 'pending')
+                .values(status='running', attempts=jobs.c.attempts + 1, updated_at=now)
+            )
+            if result.rowcount == 1:
+                claimed.append((job_id, kind, payload, attempts + 1))
+                if coalesce_key is not None:
+                    running_keys.add(coalesce_key)
+    return claimed
+
+
+def _execute_job(job_id, kind, payload, attempts):
+    jobs = db_schema.jobs
+    try:
+        handler = _JOB_HANDLERS.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        handler(json.loads(payload) if payload else {})
+        values = {'status': 'done', 'last_error': None}
+    except Exception as e:
+        if attempts < JOB_MAX_ATTEMPTS:
+            delay = pd.Timedelta(seconds=JOB_RETRY_DELAY * attempts).to_pytimedelta()
+            values = {'status': 'pending', 'run_after': datetime.now() + delay, 'last_error': str(e)}
+        else:
+            values = {'status': 'failed', 'last_error': str(e)}
+    values['updated_at'] = datetime.now()
+    try:
+        with engine.begin() as conn:
+            conn.execute(jobs.update().where(jobs.c.job_id == job_id).values(**values))
+    except Exception as e:
+        print(f"Could not record the result of job {job_id}: {e}")
+    finally:
+        with _job_lock:
+            _jobs_in_flight.discard(job_id)
+        _job_wakeup.set()
+
+
+def _requeue_stale_jobs():
+    jobs = db_schema.jobs
+    cutoff = datetime.now() - pd.Timedelta(seconds=JOB_STALE_AFTER).to_pytimedelta()
+    with engine.begin() as conn:
+        conn.execute(jobs.update().where(jobs.c.status == 'running', jobs.c.updated_at < cutoff)
+                     .values(status='pending', run_after=datetime.now()))
+
+
+def _seconds_until_next_job():
+    jobs = db_schema.jobs
+    with engine.connect() as conn:
+        next_due = conn.execute(select(func.min(jobs.c.run_after)).where(jobs.c.status == 'pending')).scalar()
+    if next_due is None:
+        return JOB_POLL_INTERVAL
+    wait = (pd.Timestamp(next_due) - pd.Timestamp(datetime.now())).total_seconds()
+    return min(max(wait, 0.05), JOB_POLL_INTERVAL)
+
+
+def _job_worker_loop():
+    try:
+        _ensure_jobs_table()
+        _requeue_stale_jobs()
+    except Exception as e:
+        print(f"Background job worker could not start: {e}")
+        return
+    while True:
+        timeout = JOB_POLL_INTERVAL
+        try:
+            with _job_lock:
+                free = JOB_WORKERS - len(_jobs_in_flight)
+            if free > 0:
+                for job in _claim_jobs(free):
+                    with _job_lock:
+                        _jobs_in_flight.add(job[0])
+                    _job_executor.submit(_execute_job, *job)
+                # Sleep until the next pending job is due (or a new one is queued)
+                timeout = _seconds_until_next_job()
+        except Exception as e:
+            print(f"Background job worker error: {e}")
+        _job_wakeup.wait(timeout)
+        _job_wakeup.clear()
+
+
+def start_job_worker():
+    """Starts the background job worker for this process (once). Safe to call repeatedly.
+    Only the app calls this; the worker also picks up jobs queued before it started."""
+    global _job_worker, _job_executor
+    if JOB_WORKERS <= 0:
+        return
+    with _job_lock:
+        if _job_worker is not None and _job_worker.is_alive():
+            return
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='hrl-job')
+        _job_worker = threading.Thread(target=_job_worker_loop, name='hrl-job-dispatcher', daemon=True)
+        _job_worker.start()
+
+
+def get_job_stats(limit=50):
+    """Returns (counts by kind and status, the most recent `limit` jobs) as DataFrames."""
+    jobs = db_schema.jobs
+    try:
+        _ensure_jobs_table()
+        with engine.connect() as conn:
+            counts = pd.read_sql_query(
+                select(jobs.c.kind, jobs.c.status, func.count().label('jobs'))
+                .group_by(jobs.c.kind, jobs.c.status).order_by(jobs.c.kind, jobs.c.status), conn)
+            recent = pd.read_sql_query(
+                select(jobs.c.job_id, jobs.c.kind, jobs.c.status, jobs.c.attempts, jobs.c.created_at,
+                       jobs.c.updated_at, jobs.c.last_error)
+                .order_by(jobs.c.job_id.desc()).limit(limit), conn)
+        return counts, recent
+    except Exception as e:
+        st.error(f"Failed to read background jobs: {e}")
+        return pd.DataFrame(), pd.DataFrame()
+
+
 # --- Database integrity check (development use) ---
 def check_database_integrity():
     """Check and report the number of rows in critical tables."""
@@ -693,3 +3101,10 @@ def check_database_integrity():
         st.error(f"Database integrity check failed: {e}")
         return None
 
+
+# --- Instrument the public functions ---
+for _name, _fn in list(globals().items()):
+    if (isinstance(_fn, types.FunctionType) and _fn.__module__ == __name__ and not _name.startswith('_')
+            and _name not in _UNTIMED_FUNCTIONS and not isgeneratorfunction(_fn)):
+        globals()[_name] = _timed(_fn)
+del _name, _fn
@@ -0,0 +1,348 @@
+# File: db_schema.py
+"""
+Typed table definitions for the HRL Project Tracker database.
+
+Every table the app uses is declared here with proper column types, primary keys
+and the secondary indexes the pages filter on. `init_local_db.py` and
+`migrate_to_db.py` build new databases from these definitions, `migrate_schema.py`
+upgrades an existing (untyped, `to_sql`-created) database in place, and
+`data_manager.save_table` writes into typed tables without dropping them.
+"""
+import pandas as pd
+from sqlalchemy import (MetaData, Table, Column, Integer, Text, DateTime, Boolean,
+                        Index, PrimaryKeyConstraint, inspect, text)
+from sqlalchemy.schema import CreateColumn
+
+metadata = MetaData()
+
+tasks = Table(
+    'tasks', metadata,
+    Column('#', Integer, nullable=False),
+    Column('Fiscal Year', Integer, nullable=False),
+    Column('SEMESTER', Text),
+    Column('PLANNER BUCKET', Text),
+    Column('TASK', Text),
+    Column('ASSIGNMENT TITLE', Text),
+    Column('AUDIENCE', Text),
+    Column('START', DateTime),
+    Column('END', DateTime),
+    Column('PROGRESS', Text),
+    # Bumped on every write; saves only succeed against the version they read
+    Column('row_version', Integer, nullable=False, server_default='1', default=1),
+    # Time of the last versioned write; published as the event's LAST-MODIFIED
+    Column('updated_at', DateTime),
+    PrimaryKeyConstraint('#', 'Fiscal Year', name='pk_tasks'),
+    Index('ix_tasks_fiscal_year', 'Fiscal Year'),
+    Index('ix_tasks_planner_bucket', 'PLANNER BUCKET'),
+    Index('ix_tasks_assignment_title', 'ASSIGNMENT TITLE'),
+)
+
+users = Table(
+    'users', metadata,
+    Column('email', Text, primary_key=True),
+    Column('password', Text),
+    Column('first_name', Text),
+    Column('last_name', Text),
+    Column('assignment_title', Text),
+    Column('role', Text),
+    Column('status', Text),
+)
+
+settings = Table(
+    'settings', metadata,
+    Column('email', Text, primary_key=True),
+    Column('frequency', Text),
+)
+
+bucket_icons = Table(
+    'bucket_icons', metadata,
+    Column('bucket_name', Text, primary_key=True),
+    Column('icon', Text),
+)
+
+comments = Table(
+    'comments', metadata,
+    Column('comment_id', Integer, primary_key=True, autoincrement=False),
+    Column('task_id', Integer),
+    Column('user_email', Text),
+    Column('timestamp', DateTime),
+    Column('comment_text', Text),
+    Index('ix_comments_task_id', 'task_id'),
+)
+
+# The changelog is append-only and has no natural key; rows are only ever
+# read back in bulk, ordered and filtered by time.
+changelog = Table(
+    'changelog', metadata,
+    Column('Timestamp', DateTime),
+    Column('Action', Text),
+    Column('Task ID', Text),
+    Column('User', Text),
+    Column('Source', Text),
+    Column('Field Changed', Text),
+    Column('Old Value', Text),
+    Column('New Value', Text),
+    Index('ix_changelog_timestamp', 'Timestamp'),
+)
+
+notifications = Table(
+    'notifications', metadata,
+    Column('notification_id', Integer, primary_key=True, autoincrement=False),
+    Column('user_email', Text),
+    Column('message', Text),
+    Column('is_read', Boolean),
+    Column('timestamp', DateTime),
+    Index('ix_notifications_user_read', 'user_email', 'is_read'),
+)
+
+# created_at stays text: presets store ISO strings to avoid driver binding issues.
+filter_presets = Table(
+    'filter_presets', metadata,
+    Column('preset_id', Integer, primary_key=True, autoincrement=False),
+    Column('user_email', Text),
+    Column('preset_name', Text),
+    Column('years', Text),
+    Column('buckets', Text),
+    Column('created_at', Text),
+    Index('ix_filter_presets_user_email', 'user_email'),
+)
+
+# Background work (calendar publishing, email) queued by data_manager. Jobs with
+# the same coalesce_key that are still pending are merged into one.
+jobs = Table(
+    'jobs', metadata,
+    Column('job_id', Integer, primary_key=True),
+    Column('kind', Text, nullable=False),
+    Column('coalesce_key', Text),
+    Column('payload', Text),
+    Column('status', Text, nullable=False),
+    Column('attempts', Integer, nullable=False, server_default='0', default=0),
+    Column('created_at', DateTime),
+    Column('run_after', DateTime),
+    Column('updated_at', DateTime),
+    Column('last_error', Text),
+    Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    Index('ix_jobs_coalesce_key', 'coalesce_key'),
+)
+
+# One counter per table, bumped after every write made through data_manager so
+# other processes (e.g. calendar_server) can tell their cached copies are stale.
+data_versions = Table(
+    'data_versions', metadata,
+    Column('table_name', Text, primary_key=True),
+    Column('version', Integer, nullable=False, server_default='0', default=0),
+    Column('updated_at', DateTime),
+)
+
+TABLES = metadata.tables
+
+
+def create_schema(bind):
+    """Create any missing tables (with keys and indexes). Existing tables are left untouched."""
+    metadata.create_all(bind, checkfirst=True)
+
+
+def reset_schema(bind):
+    """Drop and recreate every tracker table. Only for initializing a fresh database."""
+    metadata.drop_all(bind, checkfirst=True)
+    metadata.create_all(bind)
+
+
+def is_typed(conn, table_name):
+    """True if `table_name` exists and carries the primary key and indexes declared here."""
+    table = TABLES[table_name]
+    insp = inspect(conn)
+    if not insp.has_table(table_name):
+        return False
+    pk_columns = [col.name for col in table.primary_key.columns]
+    if pk_columns and insp.get_pk_constraint(table_name).get('constrained_columns') != pk_columns:
+        return False
+    existing_indexes = {ix['name'] for ix in insp.get_indexes(table_name)}
+    return all(ix.name in existing_indexes for ix in table.indexes)
+
+
+# --- Type coercion ---
+def _to_datetime(series):
+    try:
+        return pd.to_datetime(series, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        # pandas < 2.0 has no format='mixed'
+        return pd.to_datetime(series, errors='coerce')
+
+
+def _to_integer(series):
+    numeric = pd.to_numeric(series, errors='coerce')
+    whole = numeric.dropna()
+    if (whole % 1 == 0).all():
+        return numeric.astype('Int64')
+    return numeric
+
+
+def _to_bool(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 't', 'yes', 'y')
+    return bool(value)
+
+
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def coerce_frame(df, table_name):
+    """Return a copy of `df` whose columns are converted to the declared column types.
+
+    Columns that aren't declared for the table are passed through unchanged;
+    missing values in columns with a scalar default get that default.
+    """
+    table = TABLES.get(table_name)
+    out = df.copy()
+    if table is None:
+        return out
+    for col in out.columns:
+        if col not in table.c:
+            continue
+        col_type = table.c[col].type
+        if isinstance(col_type, DateTime):
+            if not pd.api.types.is_datetime64_any_dtype(out[col]):
+                out[col] = _to_datetime(out[col])
+        elif isinstance(col_type, Boolean):
+            out[col] = out[col].map(_to_bool).astype(object)
+        elif isinstance(col_type, Integer):
+            if not pd.api.types.is_integer_dtype(out[col]):
+                out[col] = _to_integer(out[col])
+        elif isinstance(col_type, Text):
+            out[col] = out[col].map(_to_text).astype(object)
+        default = table.c[col].default
+        if default is not None and default.is_scalar and out[col].isna().any():
+            out[col] = out[col].fillna(default.arg)
+    return out
+
+
+# --- Writing into typed tables ---
+def add_missing_columns(conn, table_name, columns):
+    """ALTER TABLE to add any of `columns` the stored table doesn't have yet (as TEXT)."""
+    existing = {col['name'] for col in inspect(conn).get_columns(table_name)}
+    quote = conn.dialect.identifier_preparer.quote
+    for col in columns:
+        if col not in existing:
+            conn.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(col)} TEXT"))
+
+
+def add_declared_columns(conn, table_name):
+    """ALTER TABLE to add declared columns an existing table is missing. Returns their names."""
+    existing = {col['name'] for col in inspect(conn).get_columns(table_name)}
+    quote = conn.dialect.identifier_preparer.quote
+    added = []
+    for col in TABLES[table_name].columns:
+        if col.name not in existing:
+            ddl = CreateColumn(col).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {ddl}"))
+            added.append(col.name)
+    return added
+
+
+def write_frame(conn, df, table_name):
+    """Replace the contents of a typed table with `df`, keeping its keys and indexes.
+
+    Must run inside a transaction (e.g. `with engine.begin() as conn`), so readers
+    never observe the table half-written.
+    """
+    table = TABLES[table_name]
+    table.create(conn, checkfirst=True)
+    add_missing_columns(conn, table_name, df.columns)
+    conn.execute(table.delete())
+    coerce_frame(df, table_name).to_sql(table_name, conn, if_exists='append', index=False)
+
+
+# --- Migrating existing databases ---
+def _read_existing(conn, table_name):
+    quote = conn.dialect.identifier_preparer.quote
+    return pd.read_sql_query(text(f"SELECT * FROM {quote(table_name)}"), conn)
+
+
+def _check_primary_key(df, table_name):
+    """Raise ValueError if the rows in `df` can't satisfy the table's primary key."""
+    pk_columns = [col.name for col in TABLES[table_name].primary_key.columns]
+    if not pk_columns:
+        return
+    missing = [col for col in pk_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"'{table_name}' has no {', '.join(missing)} column(s) to use as its primary key")
+    blank_keys = int(df[pk_columns].isna().any(axis=1).sum())
+    if blank_keys:
+        raise ValueError(f"'{table_name}' has {blank_keys} row(s) with an empty {' / '.join(pk_columns)}")
+    duplicates = int(df.duplicated(subset=pk_columns).sum())
+    if duplicates:
+        raise ValueError(f"'{table_name}' has {duplicates} row(s) with a duplicate {' / '.join(pk_columns)}")
+
+
+def migrate_table(engine, table_name):
+    """Rebuild one untyped table as its typed definition, preserving every row.
+
+    The old table is renamed to a backup, the typed table is created and filled,
+    and the backup is dropped only once the copy succeeded; on failure the backup
+    is renamed back. (Each step commits on its own because SQLite doesn't run DDL
+    inside transactions.) Columns that exist in the old table but aren't declared
+    here are kept as TEXT. Tables that are already typed only get any newly
+    declared columns added. Raises ValueError, without changing anything, if existing
+    rows would violate the primary key so they can be fixed by hand first.
+    Returns a status message.
+    """
+    table = TABLES[table_name]
+    backup_name = f"{table_name}__pre_schema"
+    with engine.connect() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        insp = inspect(conn)
+        if not insp.has_table(table_name):
+            table.create(conn)
+            conn.commit()
+            return 'created'
+        if is_typed(conn, table_name):
+            added = add_declared_columns(conn, table_name)
+            conn.commit()
+            if added:
+                return f"added column(s) {', '.join(added)}"
+            return 'already up to date'
+
+        existing = coerce_frame(_read_existing(conn, table_name), table_name)
+        _check_primary_key(existing, table_name)
+        conn.rollback()
+
+        if insp.has_table(backup_name):
+            raise ValueError(f"a previous migration left '{backup_name}' behind; inspect and drop it first")
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} RENAME TO {quote(backup_name)}"))
+        conn.commit()
+        try:
+            table.create(conn)
+            add_missing_columns(conn, table_name, existing.columns)
+            existing.to_sql(table_name, conn, if_exists='append', index=False, chunksize=1000)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            table.drop(conn, checkfirst=True)
+            conn.execute(text(f"ALTER TABLE {quote(backup_name)} RENAME TO {quote(table_name)}"))
+            conn.commit()
+            raise
+        conn.execute(text(f"DROP TABLE {quote(backup_name)}"))
+        conn.commit()
+    return f'migrated {len(existing)} row(s)'
+
+
+def migrate_schema(engine):
+    """Migrate every tracker table. Returns {table_name: status message}."""
+    results = {}
+    for table_name in TABLES:
+        try:
+            results[table_name] = migrate_table(engine, table_name)
+        except Exception as e:
+            results[table_name] = f'FAILED: {e}'
+    return results
@@ -1,14 +1,16 @@
 from pathlib import Path
-from data_manager import load_table, generate_calendar_from_tasks
+from data_manager import build_calendar
 
 
 def main():
     # Load tasks from the configured DB (works with local SQLite fallback)
-    tasks = load_table('tasks')
-    cal = generate_calendar_from_tasks(tasks)
+    calendar = build_calendar()
+    if calendar is None:
+        print("Could not load tasks; calendar not written")
+        return
     out = Path(__file__).parent / 'calendar.ics'
-    out.write_bytes(cal.to_ical())
-    print(f"Wrote calendar to: {out.resolve()}")
+    out.write_bytes(calendar['ics'])
+    print(f"Wrote {calendar['event_count']} events to: {out.resolve()}")
 
 
 if __name__ == '__main__':
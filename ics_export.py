@@ -1,7 +1,25 @@
-import uuid
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
 
+UID_DOMAIN = 'hrl-project-tracker'
+
+# --- Event cache ---
+# Serialized VEVENT blocks keyed by UID, with a fingerprint of the row fields the
+# block depends on. A row whose fingerprint is unchanged reuses its block, so a
+# calendar rebuild only re-renders the tasks that were edited.
+_EVENT_CACHE_SIZE = 20000
+_EVENT_CACHE = OrderedDict()
+_EVENT_CACHE_LOCK = threading.Lock()
+_EVENT_FIELDS = ('TASK', 'START', 'END', 'PLANNER BUCKET', 'ASSIGNMENT TITLE', 'PROGRESS', 'Fiscal Year',
+                 'row_version', 'updated_at')
+_MISSING = object()
+# Description lines shown only for tasks that have a value
+_OPTIONAL_DETAILS = (('Assignment', 'ASSIGNMENT TITLE'), ('Progress', 'PROGRESS'))
+
 def _format_fy(year):
     """Convert a numeric year to fiscal year format (e.g. 2024 → FY25)."""
     try:
@@ -51,6 +69,80 @@ def _format_date(dt: pd.Timestamp):
     return False, _to_utc_string(ts)
 
 
+def _present(value):
+    return value is not None and value is not _MISSING and not pd.isna(value)
+
+
+def task_uid(number, fiscal_year, fallback=None) -> str:
+    """Stable event UID for a task, derived from its # and Fiscal Year.
+
+    Rows without a # use a hash of `fallback` (e.g. the task name and bucket) instead.
+    """
+    try:
+        year = int(fiscal_year) if _present(fiscal_year) else ''
+    except (ValueError, TypeError):
+        year = str(fiscal_year)
+    if _present(number):
+        try:
+            number = int(number)
+        except (ValueError, TypeError):
+            number = str(number).strip()
+        return f"task-{number}-{year}@{UID_DOMAIN}"
+    digest = hashlib.sha1(repr(fallback).encode('utf-8')).hexdigest()[:16]
+    return f"task-{digest}-{year}@{UID_DOMAIN}"
+
+
+def unique_uid(uid, seen_uids) -> str:
+    """Suffix `uid` if it was already used in this calendar (the same task listed twice), and record it."""
+    base, n = uid, 2
+    while uid in seen_uids:
+        uid = base.replace('@', f'-{n}@', 1)
+        n += 1
+    seen_uids.add(uid)
+    return uid
+
+
+def row_fingerprint(row, fields) -> str:
+    """Hash of the given fields of a row; columns the row doesn't have count as distinct from empty values."""
+    parts = []
+    for field in fields:
+        value = row.get(field, _MISSING)
+        if value is _MISSING:
+            parts.append('\x00')
+        elif not _present(value):
+            parts.append('')
+        else:
+            parts.append(str(value))
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def event_revision(row, fingerprint, previous=None):
+    """Return (SEQUENCE, LAST-MODIFIED as an aware UTC datetime) for a task row.
+
+    Rows that carry row_version / updated_at use those, so every process publishes
+    the same values. Otherwise they are derived from `previous`, the
+    (fingerprint, sequence, last_modified) cached for the same UID: unchanged rows
+    keep them, changed rows get the next sequence and the current time.
+    """
+    unchanged = previous is not None and previous[0] == fingerprint
+    version = row.get('row_version')
+    if _present(version):
+        sequence = max(int(version) - 1, 0)
+    elif previous is None:
+        sequence = 0
+    else:
+        sequence = previous[1] if unchanged else previous[1] + 1
+
+    updated = row.get('updated_at')
+    if _present(updated):
+        last_modified = datetime.strptime(_to_utc_string(updated), '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+    elif unchanged:
+        last_modified = previous[2]
+    else:
+        last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+    return sequence, last_modified
+
+
 def _escape_text(text: str) -> str:
     if text is None:
         return ''
@@ -58,77 +150,337 @@ def _escape_text(text: str) -> str:
     return str(text).replace('\n', '\\n').replace(',', '\\,').replace(';', '\\;')
 
 
-def generate_ics_from_df(df: pd.DataFrame, calendar_name: str = 'HRL Project Tracker') -> bytes:
-    """Generate an ICS file (as bytes) from a DataFrame with at least the
-    columns: 'TASK', 'START', 'END', 'PLANNER BUCKET', 'Fiscal Year'.
+def _fold_line(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1), never inside a UTF-8 character."""
+    if len(line) <= 75 and line.isascii():
+        return line
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    pieces = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(data[:cut])
+        data = data[cut:]
+        # Continuation lines start with a space, which counts towards their 75 octets
+        limit = 74
+    pieces.append(data)
+    return b'\r\n '.join(pieces).decode('utf-8')
+
+
+def _render_event(row, uid, sequence, last_modified):
+    """Serialize one task row as VEVENT lines. Returns (is_timed, lines)."""
+    start_ts = pd.to_datetime(row.get('START'))
+    end_ts = pd.to_datetime(row.get('END'))
+
+    is_all_day_start, start_str = _format_date(start_ts)
+    is_all_day_end, end_str = _format_date(end_ts)
+    stamp = last_modified.strftime('%Y%m%dT%H%M%SZ')
 
-    START and END should be parsable by pandas.to_datetime.
-    """
     lines = []
-    lines.append('BEGIN:VCALENDAR')
-    lines.append('VERSION:2.0')
-    lines.append('PRODID:-//HRL Project Tracker//EN')
-    lines.append('METHOD:PUBLISH')
-    lines.append(f'X-WR-CALNAME:{_escape_text(calendar_name)}')
-    lines.append('CALSCALE:GREGORIAN')
+    lines.append('BEGIN:VEVENT')
+    lines.append(_fold_line(f'UID:{uid}'))
+    lines.append(f'DTSTAMP:{stamp}')
+    lines.append(f'LAST-MODIFIED:{stamp}')
+    lines.append(f'SEQUENCE:{sequence}')
 
-    now_stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    # If both are all-day (date-only), use VALUE=DATE and RFC5545 exclusive DTEND
+    if is_all_day_start and is_all_day_end:
+        # make DTEND exclusive by adding one day to the end date
+        end_exclusive = (end_ts + timedelta(days=1)).strftime('%Y%m%d')
+        lines.append(f'DTSTART;VALUE=DATE:{start_str}')
+        lines.append(f'DTEND;VALUE=DATE:{end_exclusive}')
+    else:
+        # Ensure we have Zulu times; if input lacked tz we used formatting with Z above
+        lines.append(f'DTSTART:{start_str}')
+        # For non all-day, make DTEND inclusive as provided
+        lines.append(f'DTEND:{end_str}')
 
-    has_timed = False
-    for _, row in df.iterrows():
-        start = row.get('START')
-        end = row.get('END')
-        if pd.isna(start) or pd.isna(end):
-            continue
+    summary = f"{row.get('PLANNER BUCKET','')} - {row.get('TASK','')}"
+    description_parts = []
+    if 'TASK' in row:
+        description_parts.append(str(row.get('TASK')))
+    if 'PLANNER BUCKET' in row:
+        description_parts.append(f"Bucket: {row.get('PLANNER BUCKET')}")
+    if 'Fiscal Year' in row:
+        description_parts.append(f"FY: {_format_fy(row.get('Fiscal Year'))}")
+    for label, field in _OPTIONAL_DETAILS:
+        if _present(row.get(field)) and str(row.get(field)):
+            description_parts.append(f"{label}: {row.get(field)}")
+    description = '\n'.join([p for p in description_parts if p])
 
-        start_ts = pd.to_datetime(start)
-        end_ts = pd.to_datetime(end)
+    lines.append(_fold_line(f'SUMMARY:{_escape_text(summary)}'))
+    if description:
+        lines.append(_fold_line(f'DESCRIPTION:{_escape_text(description)}'))
 
-        is_all_day_start, start_str = _format_date(start_ts)
-        is_all_day_end, end_str = _format_date(end_ts)
+    lines.append('END:VEVENT')
+    return not (is_all_day_start and is_all_day_end), lines
 
-        if not (is_all_day_start and is_all_day_end):
-            has_timed = True
 
-        uid = str(uuid.uuid4()) + '@hrl-project-tracker'
+def _store_events(entries):
+    """Add (uid, entry) pairs to the event cache, evicting the least recently used."""
+    with _EVENT_CACHE_LOCK:
+        for uid, entry in entries:
+            _EVENT_CACHE[uid] = entry
+            _EVENT_CACHE.move_to_end(uid)
+        while len(_EVENT_CACHE) > _EVENT_CACHE_SIZE:
+            _EVENT_CACHE.popitem(last=False)
 
-        lines.append('BEGIN:VEVENT')
-        lines.append(f'UID:{uid}')
-        lines.append(f'DTSTAMP:{now_stamp}')
 
-        # If both are all-day (date-only), use VALUE=DATE and RFC5545 exclusive DTEND
-        if is_all_day_start and is_all_day_end:
-            # make DTEND exclusive by adding one day to the end date
-            end_exclusive = (end_ts + timedelta(days=1)).strftime('%Y%m%d')
-            lines.append(f'DTSTART;VALUE=DATE:{start_str}')
-            lines.append(f'DTEND;VALUE=DATE:{end_exclusive}')
-        else:
-            # Ensure we have Zulu times; if input lacked tz we used formatting with Z above
-            lines.append(f'DTSTART:{start_str}')
-            # For non all-day, make DTEND inclusive as provided
-            lines.append(f'DTEND:{end_str}')
+def _frame_fingerprints(frame):
+    """Fingerprint of the event fields of every row of `frame`. Both serializers use
+    this, so a row's cached event is found whichever of them renders the frame."""
+    fields = [f for f in _EVENT_FIELDS if f in frame.columns]
+    try:
+        hashed = frame[fields].assign(__fields__='|'.join(fields))
+        return pd.util.hash_pandas_object(hashed, index=False).tolist()
+    except TypeError:
+        # Unhashable cell values (e.g. lists)
+        return [row_fingerprint(row, _EVENT_FIELDS) for _, row in frame.iterrows()]
+
+
+def _cached_event(row, uid, fingerprint):
+    """Return (is_timed, block) for a row, re-rendering only if its fingerprint changed."""
+    with _EVENT_CACHE_LOCK:
+        cached = _EVENT_CACHE.get(uid)
+        if cached is not None:
+            _EVENT_CACHE.move_to_end(uid)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[3], cached[4]
+
+    previous = cached[:3] if cached is not None else None
+    sequence, last_modified = event_revision(row, fingerprint, previous)
+    is_timed, lines = _render_event(row, uid, sequence, last_modified)
+    block = '\r\n'.join(lines)
+    _store_events([(uid, (fingerprint, sequence, last_modified, is_timed, block))])
+    return is_timed, block
+
+
+def clear_event_cache():
+    """Forget every cached VEVENT block."""
+    with _EVENT_CACHE_LOCK:
+        _EVENT_CACHE.clear()
+
+
+# --- Columnar serializer ---
+# generate_ics_from_df() formats whole columns at once (dates, escaping, UIDs and
+# fingerprints) and only falls back to the row-by-row serializer above for frames
+# whose dates pandas can't parse as one column (e.g. mixed time zones).
+def _parse_datetimes(series):
+    """Parse a column to datetime64, or return None if it can't be done column-wise."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    try:
+        parsed = pd.to_datetime(series, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        return None
+    return parsed if pd.api.types.is_datetime64_any_dtype(parsed) else None
+
+
+# Character positions kept from numpy's ISO strings ('2025-01-31' / '2025-01-31T09:30:00')
+_DATE_CHARS = [0, 1, 2, 3, 5, 6, 8, 9]
+_DATETIME_CHARS = _DATE_CHARS + [10, 11, 12, 14, 15, 17, 18]
+_ESCAPES = str.maketrans({'\n': '\\n', ',': '\\,', ';': '\\;'})
+
+
+def _compact(ts, unit):
+    """Format a datetime column as YYYYMMDD (unit 'D') or YYYYMMDDTHHMMSS (unit 's')
+    in its own wall-clock time, without formatting each value in Python like .dt.strftime."""
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)
+    text = np.datetime_as_string(ts.to_numpy().astype(f'M8[{unit}]'))
+    keep = _DATE_CHARS if unit == 'D' else _DATETIME_CHARS
+    chars = text.view('<U1').reshape(len(text), -1)[:, keep]
+    compact = np.ascontiguousarray(chars).view(f'<U{len(keep)}').ravel()
+    return pd.Series(compact.astype(object), index=ts.index)
+
 
-        summary = f"{row.get('PLANNER BUCKET','')} - {row.get('TASK','')}"
-        description_parts = []
-        if 'TASK' in row:
-            description_parts.append(str(row.get('TASK')))
-        if 'PLANNER BUCKET' in row:
-            description_parts.append(f"Bucket: {row.get('PLANNER BUCKET')}")
-        if 'Fiscal Year' in row:
-            description_parts.append(f"FY: {_format_fy(row.get('Fiscal Year'))}")
-        description = '\n'.join([p for p in description_parts if p])
+def _utc_strings(ts):
+    """Vectorized _to_utc_string(): naive values are taken as local time."""
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize(datetime.now().astimezone().tzinfo)
+    return _compact(ts.dt.tz_convert('UTC'), 's') + 'Z'
 
-        lines.append(f'SUMMARY:{_escape_text(summary)}')
-        if description:
-            lines.append(f'DESCRIPTION:{_escape_text(description)}')
 
-        lines.append('END:VEVENT')
+def _is_midnight(ts):
+    return (ts - ts.dt.normalize()) == pd.Timedelta(0)
 
-    lines.append('END:VCALENDAR')
 
+def _text(frame, col):
+    """str() of every value in a column, as the row-wise serializer formats them."""
+    return frame[col].astype(object).map(str)
+
+
+def _escape_column(text):
+    """Vectorized _escape_text() for a column of strings; each distinct value is escaped once."""
+    codes, uniques = pd.factorize(text)
+    escaped = np.array([value.translate(_ESCAPES) for value in uniques], dtype=object)
+    return pd.Series(escaped[codes], index=text.index)
+
+
+def _whole_numbers(series):
+    return (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            and series.notna().all() and bool((series % 1 == 0).all()))
+
+
+def _uid_column(frame, seen_uids):
+    """task_uid() for every row, made unique against `seen_uids` in row order like unique_uid()."""
+    number, year = frame.get('#'), frame.get('Fiscal Year')
+    if number is not None and year is not None and _whole_numbers(number) and _whole_numbers(year):
+        uids = ('task-' + number.astype('int64').astype(str) + '-'
+                + year.astype('int64').astype(str) + f'@{UID_DOMAIN}').tolist()
+    else:
+        def _values(col):
+            return frame[col].tolist() if col in frame.columns else [None] * len(frame)
+        uids = [task_uid(n, y, fallback=(t, b)) for n, y, t, b in
+                zip(_values('#'), _values('Fiscal Year'), _values('TASK'), _values('PLANNER BUCKET'))]
+    distinct = set(uids)
+    if len(distinct) != len(uids) or not distinct.isdisjoint(seen_uids):
+        return [unique_uid(uid, seen_uids) for uid in uids]
+    seen_uids.update(distinct)
+    return uids
+
+
+def _render_events(frame, uids, sequences, last_modified, start, end):
+    """Serialize every row of `frame` as a VEVENT block. Returns (is_timed, blocks)."""
+    stamp = _compact(last_modified, 's') + 'Z'
+    start_all_day, end_all_day = _is_midnight(start), _is_midnight(end)
+    all_day = start_all_day & end_all_day
+    start_date = _compact(start, 'D')
+    # _format_date() returns the date form for a midnight endpoint even if the other one is timed
+    start_str = start_date.where(start_all_day, _utc_strings(start))
+    end_str = _compact(end, 'D').where(end_all_day, _utc_strings(end))
+    end_exclusive = _compact(end + timedelta(days=1), 'D')
+    dates = ('DTSTART;VALUE=DATE:' + start_date + '\r\nDTEND;VALUE=DATE:' + end_exclusive).where(
+        all_day, 'DTSTART:' + start_str + '\r\nDTEND:' + end_str)
+
+    # Escaping distributes over concatenation, so each field is escaped once and
+    # SUMMARY / DESCRIPTION are assembled from the escaped pieces
+    blank = pd.Series('', index=frame.index, dtype=object)
+    task = _escape_column(_text(frame, 'TASK')) if 'TASK' in frame.columns else blank
+    bucket = _escape_column(_text(frame, 'PLANNER BUCKET')) if 'PLANNER BUCKET' in frame.columns else blank
+    summary = bucket + ' - ' + task
+
+    description = task
+    parts = []
+    if 'PLANNER BUCKET' in frame.columns:
+        parts.append('Bucket: ' + bucket)
+    if 'Fiscal Year' in frame.columns:
+        codes, years = pd.factorize(frame['Fiscal Year'].astype(object), use_na_sentinel=False)
+        fiscal_years = np.array([_escape_text(_format_fy(y)) for y in years], dtype=object)
+        parts.append('FY: ' + pd.Series(fiscal_years[codes], index=frame.index))
+    for label, field in _OPTIONAL_DETAILS:
+        if field in frame.columns:
+            present = frame[field].notna()
+            value = _escape_column(_text(frame, field))
+            parts.append((label + ': ' + value).where(present & (value != ''), ''))
+    for part in parts:
+        joined = (description + '\\n' + part).where(description != '', part)
+        description = joined.where(part != '', description)
+    description_line = ('\r\n' + ('DESCRIPTION:' + description).map(_fold_line)).where(description != '', '')
+    uid_line = ('UID:' + pd.Series(uids, index=frame.index, dtype=object)).map(_fold_line)
+
+    blocks = ('BEGIN:VEVENT\r\n' + uid_line
+              + '\r\nDTSTAMP:' + stamp + '\r\nLAST-MODIFIED:' + stamp
+              + '\r\nSEQUENCE:' + pd.Series(sequences, index=frame.index).astype(str)
+              + '\r\n' + dates
+              + '\r\n' + ('SUMMARY:' + summary).map(_fold_line) + description_line
+              + '\r\nEND:VEVENT')
+    return (~all_day).tolist(), blocks.tolist()
+
+
+def _columnar_events(df, seen_uids):
+    """Return [(is_timed, block)] for the rows of `df` with a START and END, or None
+    if the frame has to go through the row-wise serializer."""
+    if 'START' not in df.columns or 'END' not in df.columns:
+        return []
+    start, end = _parse_datetimes(df['START']), _parse_datetimes(df['END'])
+    if start is None or end is None:
+        return None
+    if (start.isna() & df['START'].notna()).any() or (end.isna() & df['END'].notna()).any():
+        # Values that only parse one at a time (mixed time zones) or not at all
+        return None
+    keep = (start.notna() & end.notna()).to_numpy()
+    frame, start, end = df[keep], start[keep], end[keep]
+    if frame.empty:
+        return []
+
+    fingerprints = _frame_fingerprints(frame)
+    uids = _uid_column(frame, seen_uids)
+
+    with _EVENT_CACHE_LOCK:
+        cached = [_EVENT_CACHE.get(uid) for uid in uids]
+        for uid, entry in zip(uids, cached):
+            if entry is not None:
+                _EVENT_CACHE.move_to_end(uid)
+    stale = [i for i, (entry, fp) in enumerate(zip(cached, fingerprints)) if entry is None or entry[0] != fp]
+
+    if stale:
+        sub = frame.iloc[stale]
+        # Same rules as event_revision(), for a changed row: stored values first,
+        # otherwise the next sequence and the current time
+        sequences = pd.Series([0 if cached[i] is None else cached[i][1] + 1 for i in stale], index=sub.index)
+        if 'row_version' in sub.columns:
+            version = pd.to_numeric(sub['row_version'], errors='coerce')
+            sequences = (version - 1).clip(lower=0).where(version.notna(), sequences).astype('int64')
+        now = pd.Timestamp.now(tz='UTC').floor('s')
+        last_modified = pd.Series(now, index=sub.index)
+        updated = _parse_datetimes(sub['updated_at']) if 'updated_at' in sub.columns else None
+        if updated is not None and updated.notna().any():
+            if updated.dt.tz is None:
+                updated = updated.dt.tz_localize(datetime.now().astimezone().tzinfo)
+            updated = updated.dt.tz_convert('UTC').dt.floor('s')
+            last_modified = updated.where(updated.notna(), last_modified)
+
+        stale_uids = [uids[i] for i in stale]
+        is_timed, blocks = _render_events(sub, stale_uids, sequences, last_modified,
+                                          start.iloc[stale], end.iloc[stale])
+        entries = []
+        modified_utc = last_modified.dt.tz_localize(None).to_numpy()
+        for j, (i, sequence, modified) in enumerate(zip(stale, sequences.tolist(), modified_utc)):
+            cached[i] = (fingerprints[i], sequence, modified, is_timed[j], blocks[j])
+            entries.append((uids[i], cached[i]))
+        _store_events(entries)
+
+    return [(entry[3], entry[4]) for entry in cached]
+
+
+def _rowwise_events(df, seen_uids):
+    """Row-by-row equivalent of _columnar_events()."""
+    events = []
+    for (_, row), fingerprint in zip(df.iterrows(), _frame_fingerprints(df)):
+        start = row.get('START')
+        end = row.get('END')
+        if pd.isna(start) or pd.isna(end):
+            continue
+        # Like the columnar path, skip values that don't parse as dates (e.g. '')
+        if pd.isna(pd.to_datetime(start, errors='coerce')) or pd.isna(pd.to_datetime(end, errors='coerce')):
+            continue
+
+        uid = unique_uid(task_uid(row.get('#'), row.get('Fiscal Year'),
+                                  fallback=(row.get('TASK'), row.get('PLANNER BUCKET'))), seen_uids)
+        events.append(_cached_event(row, uid, fingerprint))
+    return events
+
+
+def _calendar_header(calendar_name):
+    return [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//HRL Project Tracker//EN',
+        'METHOD:PUBLISH',
+        _fold_line(f'X-WR-CALNAME:{_escape_text(calendar_name)}'),
+        'CALSCALE:GREGORIAN',
+    ]
+
+
+def _calendar_footer(has_timed):
     # If there were timed events, include a simple VTIMEZONE for UTC to improve Outlook compatibility
     if has_timed:
-        tz_lines = [
+        return [
             'BEGIN:VTIMEZONE',
             'TZID:UTC',
             'BEGIN:STANDARD',
@@ -137,11 +489,56 @@ def generate_ics_from_df(df: pd.DataFrame, calendar_name: str = 'HRL Project Tra
             'TZOFFSETTO:+0000',
             'TZNAME:UTC',
             'END:STANDARD',
-            'END:VTIMEZONE'
+            'END:VTIMEZONE',
+            'END:VCALENDAR',
         ]
-        # Insert VTIMEZONE before END:VCALENDAR
-        ics_text = '\r\n'.join(lines[:-1] + tz_lines + [lines[-1]]) + '\r\n'
-    else:
-        ics_text = '\r\n'.join(lines) + '\r\n'
+    return ['END:VCALENDAR']
+
+
+def _encode_lines(lines):
+    return ''.join(line + '\r\n' for line in lines).encode('utf-8')
+
+
+# Tasks serialized per chunk when streaming. Each chunk costs a fixed amount of
+# pandas overhead, so much smaller chunks make the whole feed noticeably slower.
+STREAM_CHUNK_ROWS = 5000
+
 
-    return ics_text.encode('utf-8')
+def iter_ics_from_df(df: pd.DataFrame, calendar_name: str = 'HRL Project Tracker',
+                     chunk_rows=STREAM_CHUNK_ROWS, rowwise=False):
+    """Yield the bytes of generate_ics_from_df(df, calendar_name) in pieces.
+
+    The header comes first, then the events `chunk_rows` tasks at a time (None for
+    all at once), then the footer, so a response can start before the whole
+    calendar is built and never holds more than one chunk of it.
+    """
+    yield _encode_lines(_calendar_header(calendar_name))
+    has_timed = False
+    seen_uids = set()
+    step = max(int(chunk_rows or len(df)), 1)
+    for begin in range(0, len(df), step):
+        chunk = df.iloc[begin:begin + step]
+        events = None if rowwise else _columnar_events(chunk, seen_uids)
+        if events is None:
+            events = _rowwise_events(chunk, seen_uids)
+        if events:
+            has_timed = has_timed or any(is_timed for is_timed, _ in events)
+            yield _encode_lines(block for _, block in events)
+    yield _encode_lines(_calendar_footer(has_timed))
+
+
+def generate_ics_rowwise(df: pd.DataFrame, calendar_name: str = 'HRL Project Tracker') -> bytes:
+    """Row-by-row equivalent of generate_ics_from_df(); the reference its output is checked against."""
+    return b''.join(iter_ics_from_df(df, calendar_name, chunk_rows=None, rowwise=True))
+
+
+def generate_ics_from_df(df: pd.DataFrame, calendar_name: str = 'HRL Project Tracker') -> bytes:
+    """Generate an ICS file (as bytes) from a DataFrame with at least the
+    columns: 'TASK', 'START', 'END', 'PLANNER BUCKET', 'Fiscal Year'.
+
+    START and END should be parsable by pandas.to_datetime. Event UIDs come from
+    '#' and 'Fiscal Year', and SEQUENCE / LAST-MODIFIED from 'row_version' and
+    'updated_at' when the frame has them, so re-exports update events in place.
+    Lines longer than 75 octets are folded.
+    """
+    return b''.join(iter_ics_from_df(df, calendar_name, chunk_rows=None))
@@ -6,6 +6,8 @@ Initialize a local SQLite database (project_tracker.db) for development.
 It reads `Project Tracker.xlsx` (sheet 'DATA') for tasks, plus `users.json` and
 `user_settings.json` for users/settings. It also creates supportive tables:
 `bucket_icons`, `comments`, `changelog`, `notifications` if missing.
+All tables are created from the typed definitions in `db_schema.py`, so they
+get their primary keys and indexes.
 
 Run:
     python init_local_db.py
@@ -14,6 +16,7 @@ import os
 import json
 from sqlalchemy import create_engine
 import pandas as pd
+import db_schema
 
 
 def robust_date_parse(date_col):
@@ -32,6 +35,12 @@ def main():
     print(f"Initializing local DB at: {db_path}")
     engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
 
+    def write(df, table_name):
+        db_schema.coerce_frame(df, table_name).to_sql(table_name, engine, if_exists='append', index=False)
+
+    # Start from empty, typed tables (primary keys + indexes)
+    db_schema.reset_schema(engine)
+
     # --- Tasks ---
     if os.path.exists(excel_path):
         print(f"Loading tasks from Excel: {excel_path}")
@@ -51,7 +60,7 @@ def main():
         if '#' not in df_tasks.columns:
             df_tasks.insert(0, '#', range(1, len(df_tasks) + 1))
 
-        df_tasks.to_sql('tasks', engine, if_exists='replace', index=False)
+        write(df_tasks, 'tasks')
         print(f"Wrote {len(df_tasks)} tasks to 'tasks' table.")
     else:
         print(f"Excel file not found at {excel_path}. Skipping tasks import.")
@@ -75,11 +84,10 @@ def main():
             })
 
         df_users = pd.DataFrame(users_rows)
-        df_users.to_sql('users', engine, if_exists='replace', index=False)
+        write(df_users, 'users')
         print(f"Wrote {len(df_users)} users to 'users' table.")
     else:
-        print(f"users.json not found at {users_json_path}. Creating empty 'users' table.")
-        pd.DataFrame(columns=['email','password','first_name','last_name','assignment_title','role','status']).to_sql('users', engine, if_exists='replace', index=False)
+        print(f"users.json not found at {users_json_path}. Leaving 'users' table empty.")
 
     # --- Settings ---
     if os.path.exists(settings_json_path):
@@ -92,11 +100,10 @@ def main():
             settings_rows.append({'email': email, 'frequency': info.get('frequency', 'Never')})
 
         df_settings = pd.DataFrame(settings_rows)
-        df_settings.to_sql('settings', engine, if_exists='replace', index=False)
+        write(df_settings, 'settings')
         print(f"Wrote {len(df_settings)} rows to 'settings' table.")
     else:
-        print(f"user_settings.json not found. Creating empty 'settings' table.")
-        pd.DataFrame(columns=['email','frequency']).to_sql('settings', engine, if_exists='replace', index=False)
+        print(f"user_settings.json not found. Leaving 'settings' table empty.")
 
     # --- Bucket icons (deduce from tasks) ---
     try:
@@ -109,18 +116,14 @@ def main():
 
         icons_rows = [{'bucket_name': b, 'icon': '📌'} for b in bucket_names]
         df_icons = pd.DataFrame(icons_rows)
-        df_icons.to_sql('bucket_icons', engine, if_exists='replace', index=False)
+        write(df_icons, 'bucket_icons')
         print(f"Wrote {len(df_icons)} bucket icons to 'bucket_icons' table.")
     except Exception as e:
         print(f"Could not create bucket_icons: {e}")
 
-    # --- Comments, changelog, notifications (empty skeletons) ---
-    pd.DataFrame(columns=['comment_id', 'task_id', 'user_email', 'timestamp', 'comment_text']).to_sql('comments', engine, if_exists='replace', index=False)
-    pd.DataFrame(columns=['Timestamp','Action','Task ID','User','Source','Field Changed','Old Value','New Value']).to_sql('changelog', engine, if_exists='replace', index=False)
-    pd.DataFrame(columns=['notification_id','user_email','message','is_read','timestamp']).to_sql('notifications', engine, if_exists='replace', index=False)
-    # --- Filter presets ---
-    pd.DataFrame(columns=['preset_id','user_email','preset_name','years','buckets','created_at']).to_sql('filter_presets', engine, if_exists='replace', index=False)
-    print("Created empty 'comments', 'changelog', and 'notifications' tables.")
+    # --- Comments, changelog, notifications, filter presets ---
+    # Created empty by reset_schema() above.
+    print("Created empty 'comments', 'changelog', 'notifications' and 'filter_presets' tables.")
 
     print("Local DB initialization complete.")
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+migrate_schema.py
+
+Upgrade an existing database to the typed schema in `db_schema.py`: proper
+column types, primary keys (tasks are keyed by '#' + 'Fiscal Year') and the
+secondary indexes the pages filter on. Rows are preserved; tables that are
+already typed are left alone, so the script is safe to re-run.
+
+If a table has rows with an empty or duplicate key it is left untouched and
+reported as FAILED so the rows can be fixed by hand first.
+
+Run:
+    python migrate_schema.py                     # db_connection_string from .streamlit/secrets.toml, else project_tracker.db
+    python migrate_schema.py sqlite:///other.db  # explicit connection string
+"""
+import os
+import sys
+from sqlalchemy import create_engine
+import db_schema
+
+
+def get_connection_string(base_dir):
+    if len(sys.argv) > 1:
+        return sys.argv[1]
+    secrets_path = os.path.join(base_dir, '.streamlit', 'secrets.toml')
+    if os.path.exists(secrets_path):
+        try:
+            import toml
+            connection_string = toml.load(secrets_path).get('db_connection_string')
+            if connection_string:
+                return connection_string
+        except Exception as e:
+            print(f"Could not read {secrets_path}: {e}")
+    return f"sqlite:///{os.path.join(base_dir, 'project_tracker.db')}"
+
+
+def main():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    connection_string = get_connection_string(base_dir)
+    connect_args = {"check_same_thread": False} if connection_string.startswith('sqlite') else {}
+    engine = create_engine(connection_string, connect_args=connect_args)
+    print(f"Migrating schema on: {engine.url.render_as_string(hide_password=True)}")
+
+    results = db_schema.migrate_schema(engine)
+    for table_name, status in results.items():
+        print(f" - {table_name}: {status}")
+
+    failed = [name for name, status in results.items() if status.startswith('FAILED')]
+    if failed:
+        print(f"Schema migration finished with {len(failed)} failed table(s).")
+        sys.exit(1)
+    print("Schema migration complete.")
+
+
+if __name__ == '__main__':
+    main()
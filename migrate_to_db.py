@@ -2,6 +2,7 @@
 import pandas as pd
 import json
 from sqlalchemy import create_engine
+import db_schema
 import toml
 import os
 from getpass import getpass
@@ -49,7 +50,10 @@ def migrate():
         df_tasks['END'] = robust_date_parse(df_tasks['END'])
         # -------------------------
 
-        df_tasks.to_sql('tasks', engine, if_exists='replace', index=False)
+        # Typed table with its primary key and indexes (see db_schema.py)
+        db_schema.create_schema(engine)
+        with engine.begin() as conn:
+            db_schema.write_frame(conn, df_tasks, 'tasks')
         print(f"Successfully migrated {len(df_tasks)} tasks.")
 
         # (The rest of the migration for users, settings, etc. remains the same)
@@ -14,34 +14,42 @@ if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user i
 st.title("📊 Dashboard Report")
 
 df_original = data_manager.load_table('tasks')
+# Row versions as shown on the previous run, i.e. when the user made the edits being saved
+shown_versions = data_manager.shown_row_versions('dashboard', df_original)
 
 if df_original is not None:
     # --- FIND & EDIT A SINGLE TASK (top of page) ---
     with st.expander("🔍 Find & Edit a Single Task", expanded=False):
         search_query = st.text_input(
-            "Search by task name, planner bucket, or assignment title:",
+            "Search by task name, planner bucket, assignment title, audience or semester:",
             key="single_task_search",
             placeholder="e.g. 'RA Training' or 'Recruitment'"
         )
-        search_df = df_original.copy()
-        if search_query.strip():
-            q = search_query.strip()
-            mask = (
-                search_df['TASK'].str.contains(q, case=False, na=False) |
-                search_df['PLANNER BUCKET'].str.contains(q, case=False, na=False) |
-                search_df['ASSIGNMENT TITLE'].str.contains(q, case=False, na=False)
-            )
-            search_df = search_df[mask]
+        search_df = data_manager.search_task_frame(df_original, search_query)
 
         if search_df.empty:
             st.info("No tasks match your search. Try a different keyword.")
         else:
-            st.caption(f"{len(search_df)} task(s) found.")
-            search_labels = search_df.apply(
-                lambda r: f"[{r.get('PLANNER BUCKET', '')}] {r.get('TASK', '')} — {data_manager.format_fy(r.get('Fiscal Year', ''))}",
-                axis=1
-            ).tolist()
-            search_indices = search_df.index.tolist()
+            # Only the current page of matches becomes picker options
+            if st.session_state.get('single_task_last_search') != search_query:
+                st.session_state.single_task_last_search = search_query
+                st.session_state.single_task_page = 1
+            picker_page = data_manager.paginate(len(search_df), st.session_state.get('single_task_page', 1), 100)
+            st.session_state.single_task_page = picker_page['page']
+            if picker_page['pages'] > 1:
+                pg_col, caption_col = st.columns([1, 4])
+                with pg_col:
+                    st.number_input("Page", min_value=1, max_value=picker_page['pages'], step=1, key="single_task_page")
+                with caption_col:
+                    st.caption(f"{len(search_df)} task(s) found; showing {picker_page['start'] + 1}–{picker_page['stop']}. Narrow the search or pick a page.")
+            else:
+                st.caption(f"{len(search_df)} task(s) found.")
+            page_df = search_df.iloc[picker_page['start']:picker_page['stop']]
+            search_labels = [
+                f"[{bucket}] {task} — {data_manager.format_fy(year)}"
+                for bucket, task, year in zip(page_df['PLANNER BUCKET'], page_df['TASK'], page_df['Fiscal Year'])
+            ]
+            search_indices = page_df.index.tolist()
 
             selected_task_label = st.selectbox(
                 "Select a task to edit:",
@@ -88,7 +96,7 @@ if df_original is not None:
                     df_updated.at[task_idx, 'AUDIENCE'] = new_audience
                     df_updated.at[task_idx, 'ASSIGNMENT TITLE'] = new_assignment
                     df_updated.at[task_idx, 'TASK'] = new_task_desc
-                    if data_manager.save_and_log_changes(df_original, df_updated):
+                    if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                         st.success("Task updated successfully!")
                         st.rerun()
                     else:
@@ -99,7 +107,7 @@ if df_original is not None:
     # --- GLOBAL CONTROLS ---
     col1, col2 = st.columns(2)
     with col1:
-        year_options = ['All'] + sorted(df_original['Fiscal Year'].unique().tolist())
+        year_options = ['All'] + data_manager.facet_values('Fiscal Year')
         st.selectbox(
             "Select Fiscal Year for Dashboard View", 
             options=year_options,
@@ -126,11 +134,20 @@ if df_original is not None:
     st.markdown("---")
     
     # --- METRICS DISPLAY ---
+    # The numbers and charts come from the materialized dashboard summary; the
+    # filtered frames above are only needed for the editable tables below.
+    summary = data_manager.get_dashboard_summary(st.session_state.dashboard_year_filter, st.session_state.days_forward)
+    if summary is None:
+        summary = {
+            'total': len(display_df), 'overdue': len(overdue_df), 'unscheduled': len(unscheduled_df),
+            'upcoming': len(upcoming_tasks), 'by_bucket': display_df['PLANNER BUCKET'].value_counts(),
+            'by_progress': display_df['PROGRESS'].value_counts(),
+        }
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric(f"Total Tasks ({data_manager.format_fy(st.session_state.dashboard_year_filter)})", len(display_df))
-    col2.metric("Overdue Tasks", len(overdue_df))
-    col3.metric("Unscheduled Tasks", len(unscheduled_df))
-    col4.metric(f"Upcoming Tasks (Next {st.session_state.days_forward} Days)", len(upcoming_tasks))
+    col1.metric(f"Total Tasks ({data_manager.format_fy(st.session_state.dashboard_year_filter)})", summary['total'])
+    col2.metric("Overdue Tasks", summary['overdue'])
+    col3.metric("Unscheduled Tasks", summary['unscheduled'])
+    col4.metric(f"Upcoming Tasks (Next {st.session_state.days_forward} Days)", summary['upcoming'])
 
     st.markdown("---")
     
@@ -138,10 +155,10 @@ if df_original is not None:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader(f"Tasks by Planner Bucket ({data_manager.format_fy(st.session_state.dashboard_year_filter)})")
-        st.dataframe(display_df['PLANNER BUCKET'].value_counts())
+        st.dataframe(summary['by_bucket'])
     with col2:
         st.subheader(f"Tasks by Progress ({data_manager.format_fy(st.session_state.dashboard_year_filter)})")
-        progress_counts = display_df['PROGRESS'].value_counts()
+        progress_counts = summary['by_progress']
         if not progress_counts.empty:
             fig, ax = plt.subplots()
             ax.pie(progress_counts, labels=progress_counts.index, autopct='%1.1f%%', startangle=90)
@@ -153,13 +170,14 @@ if df_original is not None:
     st.markdown("---")
     
     # --- EDITABLE TABLES ---
+    hidden_columns = {col: None for col in data_manager.TASK_META_COLUMNS}
     st.subheader("Overdue Tasks")
     if not overdue_df.empty:
-        edited_overdue = st.data_editor(overdue_df, hide_index=True, key="overdue_editor", column_config={"PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"),"END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
+        edited_overdue = st.data_editor(overdue_df, hide_index=True, key="overdue_editor", column_config={**hidden_columns, "PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"),"END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
         if st.button("Save Overdue Task Changes"):
             df_updated = df_original.copy()
             df_updated.update(edited_overdue)
-            if data_manager.save_and_log_changes(df_original, df_updated):
+            if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                 st.success("Changes saved successfully!")
                 st.rerun()
     else:
@@ -169,11 +187,11 @@ if df_original is not None:
 
     st.subheader("Unscheduled Tasks (Placeholder Dates)")
     if not unscheduled_df.empty:
-        edited_unscheduled = st.data_editor(unscheduled_df, hide_index=True, key="unscheduled_editor", column_config={"PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"), "END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
+        edited_unscheduled = st.data_editor(unscheduled_df, hide_index=True, key="unscheduled_editor", column_config={**hidden_columns, "PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"), "END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
         if st.button("Save Unscheduled Task Changes"):
             df_updated = df_original.copy()
             df_updated.update(edited_unscheduled)
-            if data_manager.save_and_log_changes(df_original, df_updated):
+            if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                 st.success("Changes saved successfully!")
                 st.rerun()
     else:
@@ -183,11 +201,11 @@ if df_original is not None:
 
     st.subheader(f"Upcoming Tasks (Next {st.session_state.days_forward} Days)")
     if not upcoming_tasks.empty:
-        edited_upcoming = st.data_editor(upcoming_tasks, hide_index=True, key="upcoming_editor", column_config={"PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"), "END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
+        edited_upcoming = st.data_editor(upcoming_tasks, hide_index=True, key="upcoming_editor", column_config={**hidden_columns, "PROGRESS": st.column_config.SelectboxColumn("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], required=True), "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY"), "END": st.column_config.DateColumn("End Date", format="MM-DD-YYYY")})
         if st.button("Save Upcoming Task Changes"):
             df_updated = df_original.copy()
             df_updated.update(edited_upcoming)
-            if data_manager.save_and_log_changes(df_original, df_updated):
+            if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                 st.success("Changes saved successfully!")
                 st.rerun()
     else:
@@ -17,7 +17,6 @@ def _safe_rerun():
             pass
 from streamlit_calendar import calendar
 import data_manager
-import ics_export
 
 # --- AUTHENTICATION CHECK ---
 if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user is None:
@@ -28,6 +27,8 @@ if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user i
 st.title("📅 Calendar View")
 
 df_original = data_manager.load_table('tasks')
+# Row versions as shown on the previous run, i.e. when the user made the edits being saved
+shown_versions = data_manager.shown_row_versions('calendar', df_original)
 icons_df = data_manager.load_table('bucket_icons')
 
 # --- Filters: Fiscal Year and Planner Bucket ---
@@ -128,11 +129,9 @@ if df_original is not None:
         df_filtered = df_filtered[df_filtered['PLANNER BUCKET'].isin(selected_buckets)]
 
     # --- Show number of events included in the filtered download ---
-    try:
-        cal_preview = data_manager.generate_calendar_from_tasks(df_filtered)
-        event_count = sum(1 for c in cal_preview.walk() if c.name == 'VEVENT')
-    except Exception:
-        event_count = 0
+    # One (memoized) pass of the calendar engine gives both the count and the .ics download
+    calendar_build = data_manager.build_calendar(years=selected_years or None, buckets=selected_buckets or None)
+    event_count = calendar_build['event_count'] if calendar_build is not None else 0
 
     st.write(f"Events in current filter: **{event_count}**")
 
@@ -180,12 +179,10 @@ if df_original is not None:
     # (Preset application is handled by the Apply control above, which sets a temp session key and reruns.)
 
     # --- Export / Download .ics for users (uses filtered data) ---
-    try:
-        cal = data_manager.generate_calendar_from_tasks(df_filtered)
-        ics_bytes = cal.to_ical()
-        st.download_button(label="Download calendar (.ics)", data=ics_bytes, file_name="hrl_project_tracker.ics", mime="text/calendar")
-    except Exception as e:
-        st.warning(f"Could not prepare calendar download: {e}")
+    if calendar_build is not None:
+        st.download_button(label="Download calendar (.ics)", data=calendar_build['ics'], file_name="hrl_project_tracker.ics", mime="text/calendar")
+    else:
+        st.warning("Could not prepare calendar download.")
 
 if df_filtered is not None and icons_df is not None:
     if df_filtered.empty:
@@ -248,20 +245,18 @@ if df_filtered is not None and icons_df is not None:
         st.subheader("Export Calendar")
         export_col1, export_col2 = st.columns([1, 1])
         with export_col1:
-            if st.button("📥 Download .ics for all visible tasks"):
-                export_df = df_cal.copy()
-                export_df = export_df[pd.notna(export_df['START']) & pd.notna(export_df['END'])]
-                ics_bytes = ics_export.generate_ics_from_df(export_df)
-                st.download_button(label="Download calendar.ics", data=ics_bytes, file_name="hrl_project_tracker_calendar.ics", mime="text/calendar")
+            if st.button("📥 Download .ics for all visible tasks") and calendar_build is not None:
+                st.download_button(label="Download calendar.ics", data=calendar_build['ics'], file_name="hrl_project_tracker_calendar.ics", mime="text/calendar")
         with export_col2:
             if 'selected_task_id' in st.session_state and st.session_state['selected_task_id'] is not None:
                 task_id = st.session_state['selected_task_id']
                 if task_id in df_original.index:
                     if st.button("📥 Download .ics for selected task"):
-                        single_df = df_original.loc[[task_id]].copy()
-                        ics_bytes = ics_export.generate_ics_from_df(single_df)
-                        filename = f"task_{int(task_id)}.ics"
-                        st.download_button(label=f"Download .ics for task #{int(task_id)}", data=ics_bytes, file_name=filename, mime="text/calendar")
+                        task_key = (df_original.loc[task_id, '#'], df_original.loc[task_id, 'Fiscal Year'])
+                        single_build = data_manager.build_calendar(task_keys=[task_key])
+                        if single_build is not None:
+                            filename = f"task_{int(task_id)}.ics"
+                            st.download_button(label=f"Download .ics for task #{int(task_id)}", data=single_build['ics'], file_name=filename, mime="text/calendar")
 
         if clicked_event and clicked_event.get('callback') == 'eventClick':
             task_id = clicked_event['eventClick']['event'].get('id')
@@ -337,7 +332,7 @@ if df_filtered is not None and icons_df is not None:
                             df_updated.loc[task_id, 'Fiscal Year'] = new_fiscal_year
                         
                         user_email = st.session_state.logged_in_user
-                        if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Calendar Edit"):
+                        if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Calendar Edit", shown_versions=shown_versions):
                             st.success("Task updated and logged successfully!")
                             st.session_state['selected_task_id'] = None
                             st.rerun() 
@@ -23,13 +23,15 @@ if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user i
 # ...
 st.title("📊 Interactive Gantt Chart View")
 
-df = data_manager.load_table('tasks')
+# The filter options are counted in the database; the chart itself is loaded
+# below with the filters applied in the database.
+facets = data_manager.facet_counts(fields=['Fiscal Year', 'ASSIGNMENT TITLE', 'PROGRESS'])
 
-if df is not None:
+if facets is not None:
     st.info("Use the filters to set your view. You can also use your mouse to zoom and pan the chart.")
 
     # --- Filter ---
-    year_options = ['All'] + sorted(df['Fiscal Year'].unique().tolist())
+    year_options = ['All'] + facets['Fiscal Year']['value'].tolist()
     selected_year = st.selectbox(
         "Select Fiscal Year",
         options=year_options,
@@ -39,28 +41,25 @@ if df is not None:
     # Additional quick filters to focus the Gantt view
     colf1, colf2, colf3, colf4 = st.columns([2,2,2,2])
     with colf1:
-        assignees = sorted([str(x) for x in df['ASSIGNMENT TITLE'].dropna().unique()]) if 'ASSIGNMENT TITLE' in df.columns else []
+        assignees = [str(x) for x in facets['ASSIGNMENT TITLE']['value']]
         selected_assignees = st.multiselect("Filter by Assignment Title (Assignee)", options=assignees, default=assignees)
     with colf2:
-        progress_options = sorted([str(x) for x in df['PROGRESS'].dropna().unique()]) if 'PROGRESS' in df.columns else ["NOT STARTED","IN PROGRESS","COMPLETE"]
+        progress_options = [str(x) for x in facets['PROGRESS']['value']] or ["NOT STARTED","IN PROGRESS","COMPLETE"]
         selected_progress = st.multiselect("Filter by Progress", options=progress_options, default=progress_options)
     with colf3:
         color_by = st.selectbox("Color items by", options=["PLANNER BUCKET","PROGRESS"], index=0)
     with colf4:
         # Choose swimlane grouping
-        y_axis_option = st.selectbox("Group swimlanes by", options=["PLANNER BUCKET"] + (["ASSIGNMENT TITLE"] if 'ASSIGNMENT TITLE' in df.columns else []))
+        y_axis_option = st.selectbox("Group swimlanes by", options=["PLANNER BUCKET", "ASSIGNMENT TITLE"])
 
-    if selected_year == 'All':
-        chart_df = df
-    else:
-        chart_df = df[df['Fiscal Year'] == selected_year]
+    chart_df = data_manager.load_tasks(
+        years=None if selected_year == 'All' else selected_year,
+        assignees=selected_assignees or None,
+        progress=selected_progress or None,
+    )
+    if chart_df is None:
+        st.stop()
 
-    # Apply additional filters
-    if 'ASSIGNMENT TITLE' in chart_df.columns and selected_assignees:
-        chart_df = chart_df[chart_df['ASSIGNMENT TITLE'].isin(selected_assignees)]
-    if 'PROGRESS' in chart_df.columns and selected_progress:
-        chart_df = chart_df[chart_df['PROGRESS'].isin(selected_progress)]
-    
     chart_df = chart_df[chart_df['END'].dt.year > 1901].dropna(subset=['START', 'END'])
 
     st.markdown("---")
@@ -170,6 +169,10 @@ if df is not None:
                 st.plotly_chart(fig, width='stretch')
             with right_col:
                 st.markdown("### Task detail (selected)")
+                # Saving diffs against the whole table, so the editor works on all tasks
+                df = data_manager.load_table('tasks')
+                # Row versions as shown on the previous run, when the form below was filled in
+                shown_versions = data_manager.shown_row_versions('gantt_task_detail', df)
                 # Find the task row
                 try:
                     task_row = df[df['#'] == int(selected_task_id)].iloc[0]
@@ -213,7 +216,7 @@ if df is not None:
                             df_updated.at[i, 'SEMESTER'] = new_semester
                             df_updated.at[i, 'TASK'] = new_task_desc
 
-                            if data_manager.save_and_log_changes(df, df_updated, st.session_state.get('logged_in_user','system'), source_page='Gantt - Task Edit'):
+                            if data_manager.save_and_log_changes(df, df_updated, st.session_state.get('logged_in_user','system'), source_page='Gantt - Task Edit', shown_versions=shown_versions):
                                 st.success("Task updated and logged successfully.")
                                 st.session_state['selected_task_id'] = None
                                 st.rerun()
@@ -5,24 +5,20 @@ import data_manager
 
 st.title("📊 Three-Year Task Table View")
 
-df_original = data_manager.load_table('tasks')
+# Filter options are counted in the database; the tasks shown are loaded once the
+# filters and years are known, with the filtering done in the database.
+options_df = data_manager.load_tasks(columns=['#'])
+facets = data_manager.facet_counts(fields=['Fiscal Year', 'PLANNER BUCKET', 'ASSIGNMENT TITLE', 'SEMESTER'])
 
-if df_original is not None:
+if options_df is not None and facets is not None:
     # --- FILTERS ---
-    all_buckets = sorted(df_original['PLANNER BUCKET'].dropna().unique())
-    all_assignments = sorted(df_original['ASSIGNMENT TITLE'].dropna().unique())
-    all_semesters = sorted(df_original['SEMESTER'].dropna().unique())
+    all_buckets = facets['PLANNER BUCKET']['value'].tolist()
+    all_assignments = facets['ASSIGNMENT TITLE']['value'].tolist()
+    all_semesters = facets['SEMESTER']['value'].tolist()
     selected_bucket = st.selectbox("Filter by Planner Bucket", options=['All'] + all_buckets, key="filter_bucket")
     selected_assignment = st.selectbox("Filter by Assignment Title", options=['All'] + all_assignments, key="filter_assignment")
 
-    filtered_df = df_original.copy()
-    if selected_bucket != 'All':
-        filtered_df = filtered_df[filtered_df['PLANNER BUCKET'] == selected_bucket]
-    if selected_assignment != 'All':
-        filtered_df = filtered_df[filtered_df['ASSIGNMENT TITLE'] == selected_assignment]
-
-    df_original['Fiscal Year'] = pd.to_numeric(df_original.get('Fiscal Year', pd.Series()), errors='coerce')
-    available_years = sorted(df_original['Fiscal Year'].dropna().unique().tolist())
+    available_years = pd.to_numeric(facets['Fiscal Year']['value'], errors='coerce').dropna().tolist()
     available_years_str = [int(y) for y in available_years]
 
     if available_years_str:
@@ -39,6 +35,16 @@ if df_original is not None:
         selected_year = None
         years_to_show = []
 
+    filtered_df = data_manager.load_tasks(
+        years=years_to_show,
+        buckets=None if selected_bucket == 'All' else selected_bucket,
+        assignees=None if selected_assignment == 'All' else selected_assignment,
+    )
+    if filtered_df is None:
+        st.stop()
+    # Row versions as shown on the previous run, when the edits being saved were made
+    shown_versions = data_manager.shown_row_versions('three_year', filtered_df)
+
     st.markdown("---")
     st.subheader("Three-Year Task Comparison Table")
     # Get all unique tasks across the three years
@@ -51,7 +57,10 @@ if df_original is not None:
     all_tasks = sorted(valid_tasks.unique())
     # If no tasks found, try to show all tasks in the database for those years
     if not all_tasks:
-        all_tasks = sorted(df_original[df_original['Fiscal Year'].isin(years_to_show)]['TASK'].dropna().unique())
+        year_tasks = data_manager.load_tasks(years=years_to_show, columns=['TASK'])
+        if year_tasks is None:
+            st.stop()
+        all_tasks = sorted(year_tasks['TASK'].dropna().unique())
     if not all_tasks:
         st.info("No tasks found for the selected years.")
     st.markdown("---")
@@ -61,8 +70,8 @@ if df_original is not None:
     for year in years_to_show:
         columns += [f"{year} START", f"{year} END", f"{year} ASSIGNMENT TITLE", f"{year} PROGRESS", f"{year} SEMESTER"]
     table_rows = []
-    used_ids = set(df_original['#']) if not df_original.empty and '#' in df_original.columns else set()
-    next_id = int(df_original['#'].max()) + 1 if not df_original.empty and '#' in df_original.columns else 1
+    used_ids = set(options_df['#']) if not options_df.empty else set()
+    next_id = int(options_df['#'].max()) + 1 if not options_df.empty else 1
     for task in all_tasks:
         row = {"#": None, "PLANNER BUCKET": '', "TASK": task}
         for year in years_to_show:
@@ -116,6 +125,11 @@ if df_original is not None:
     )
     st.caption("Enter dates in YYYY-MM-DD format for START and END columns.")
     if st.button("Save All Changes"):
+        # Saving diffs against the whole table
+        df_original = data_manager.load_table('tasks')
+        if df_original is None:
+            st.stop()
+        df_original['Fiscal Year'] = pd.to_numeric(df_original['Fiscal Year'], errors='coerce')
         updated_df = df_original.copy()
         next_id = int(updated_df['#'].max()) + 1 if not updated_df.empty and '#' in updated_df.columns else 1
 
@@ -156,7 +170,8 @@ if df_original is not None:
                     updated_df.loc[mask, 'SEMESTER'] = row[f"{year} SEMESTER"]
         import data_manager
         user_email = st.session_state.get('logged_in_user', 'system')
-        data_manager.save_and_log_changes(df_original, updated_df, user_email, source_page="Three-Year Task View")
+        data_manager.save_and_log_changes(df_original, updated_df, user_email, source_page="Three-Year Task View",
+                                          shown_versions=shown_versions)
         st.success("All changes saved!")
 else:
     st.warning("Could not load tasks data.")
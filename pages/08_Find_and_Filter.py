@@ -2,7 +2,6 @@
 import streamlit as st
 import pandas as pd
 import data_manager
-import ics_export
 
 # --- AUTHENTICATION CHECK ---
 if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user is None:
@@ -13,47 +12,92 @@ if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user i
 st.title("🔍 Find, Filter & Edit Tasks")
 
 df_original = data_manager.load_table('tasks')
+# Row versions as shown on the previous run, i.e. when the user made the edits being saved
+shown_versions = data_manager.shown_row_versions('find_and_filter', df_original)
 users_df = data_manager.load_table('users')
 
 if df_original is not None and users_df is not None:
+    # Without a full-text index (e.g. a SQLite build lacking FTS5) search in memory too
+    search_in_memory = data_manager.TASK_SEARCH == 'pandas' or not data_manager.search_index_available()
+
     # --- FILTERS ---
     st.write("Use the controls below to filter, then click a task to edit or comment on it.")
     col1, col2, col3 = st.columns([2, 2, 3])
     with col1:
-        bucket_options = ['All'] + sorted([str(item) for item in df_original['PLANNER BUCKET'].unique()])
+        bucket_options = ['All'] + [str(item) for item in data_manager.facet_values('PLANNER BUCKET')]
         st.selectbox("Filter by Planner Bucket", options=bucket_options, key="find_bucket_filter")
     with col2:
-        year_options = ['All'] + sorted([str(item) for item in df_original['Fiscal Year'].unique()])
+        year_options = ['All'] + [str(item) for item in data_manager.facet_values('Fiscal Year')]
         st.selectbox("Filter by Fiscal Year", options=year_options, key="find_year_filter", format_func=lambda x: data_manager.format_fy(x))
     with col3:
-        search_term = st.text_input("Search across all fields (case-insensitive)")
-
-    # Apply filters sequentially
-    filtered_df = df_original.copy()
-    if 'find_bucket_filter' in st.session_state and st.session_state.find_bucket_filter != 'All':
-        filtered_df = filtered_df[filtered_df['PLANNER BUCKET'] == st.session_state.find_bucket_filter]
-    if 'find_year_filter' in st.session_state and st.session_state.find_year_filter != 'All':
-        filtered_df = filtered_df[filtered_df['Fiscal Year'].astype(str) == st.session_state.find_year_filter]
-    if search_term:
-        mask = filtered_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False, na=False).any(), axis=1)
-        filtered_df = filtered_df[mask]
+        if search_in_memory:
+            search_label = "Search tasks, buckets, assignments, audiences and semesters"
+            search_help = "Matches any part of those fields, case-insensitive. Comments are not searched."
+        else:
+            search_label = "Search tasks, buckets, assignments, audiences, semesters and comments"
+            search_help = "Every word must match the start of a word, case-insensitive."
+        search_term = st.text_input(search_label, help=search_help, key="find_search_term")
+
+    bucket_choice = st.session_state.get('find_bucket_filter', 'All')
+    year_choice = st.session_state.get('find_year_filter', 'All')
+    search_filters = {
+        'years': None if year_choice == 'All' else year_choice,
+        'buckets': None if bucket_choice == 'All' else bucket_choice,
+    }
+
+    # --- PAGING ---
+    # Only the current page of results is fetched, shown and turned into picker labels;
+    # changing a filter, the search or the page size goes back to the first page.
+    page_size = st.session_state.get('find_page_size', 50)
+    filter_signature = (bucket_choice, year_choice, search_term, page_size)
+    if st.session_state.get('find_filter_signature') != filter_signature:
+        st.session_state.find_filter_signature = filter_signature
+        st.session_state.find_page = 1
+
+    if search_in_memory:
+        # Filter and search the tasks already in memory
+        filtered_df = df_original
+        if bucket_choice != 'All':
+            filtered_df = filtered_df[filtered_df['PLANNER BUCKET'] == bucket_choice]
+        if year_choice != 'All':
+            filtered_df = filtered_df[filtered_df['Fiscal Year'].astype(str) == year_choice]
+        filtered_df = data_manager.search_task_frame(filtered_df, search_term)
+        results = {**data_manager.paginate(len(filtered_df), st.session_state.find_page, page_size), 'total': len(filtered_df)}
+        page_df = filtered_df.iloc[results['start']:results['stop']]
+    else:
+        # Count and fetch the page in SQL (ranked by the search index when searching)
+        results = data_manager.search_tasks_page(search_term, search_filters, st.session_state.find_page, page_size)
+        if results is None:
+            results = {**data_manager.paginate(0, 1, page_size), 'total': 0}
+            page_df = df_original.iloc[0:0]
+        else:
+            page_df = results['rows'][['#', 'Fiscal Year']].merge(df_original, on=['#', 'Fiscal Year'], how='inner')
+    st.session_state.find_page = results['page']
 
     st.markdown("---")
 
     # --- RESULTS TABLE (read-only summary) ---
-    st.subheader(f"Results ({len(filtered_df)} tasks)")
+    st.subheader(f"Results ({results['total']} tasks)")
 
-    if filtered_df.empty:
+    if results['total'] == 0:
         st.info("No tasks match your filters.")
     else:
-        # Build display labels for the selectbox
-        task_labels = {}
-        for _, row in filtered_df.iterrows():
-            label = f"#{int(row['#'])} — {row['TASK']} ({row['PLANNER BUCKET']}, {data_manager.format_fy(row['Fiscal Year'])})"
-            task_labels[label] = int(row['#'])
+        p_col1, p_col2, p_col3 = st.columns([1, 1, 3])
+        with p_col1:
+            st.selectbox("Rows per page", options=[25, 50, 100, 250], index=1, key="find_page_size")
+        with p_col2:
+            st.number_input("Page", min_value=1, max_value=results['pages'], step=1, key="find_page")
+        with p_col3:
+            st.caption(f"Page {results['page']} of {results['pages']}: tasks {results['start'] + 1}–{results['stop']} of {results['total']}")
+
+        # Build display labels for the selectbox (current page only)
+        task_labels = {
+            f"#{int(number)} — {task} ({bucket}, {data_manager.format_fy(year)})": int(number)
+            for number, task, bucket, year in zip(page_df['#'], page_df['TASK'], page_df['PLANNER BUCKET'], page_df['Fiscal Year'])
+        }
 
         # Show a compact table overview
-        display_df = filtered_df[['#', 'TASK', 'ASSIGNMENT TITLE', 'PLANNER BUCKET', 'PROGRESS', 'START', 'END']].copy()
+        display_df = page_df[['#', 'TASK', 'ASSIGNMENT TITLE', 'PLANNER BUCKET', 'PROGRESS', 'START', 'END']].copy()
         display_df['START'] = pd.to_datetime(display_df['START']).dt.strftime('%m-%d-%Y')
         display_df['END'] = pd.to_datetime(display_df['END']).dt.strftime('%m-%d-%Y')
         st.dataframe(display_df, hide_index=True, use_container_width=True)
@@ -61,7 +105,7 @@ if df_original is not None and users_df is not None:
         # --- TASK SELECTOR ---
         st.markdown("---")
         selected_label = st.selectbox(
-            "Select a task to edit, delete, or comment on",
+            "Select a task on this page to edit, delete, or comment on",
             options=['--'] + list(task_labels.keys()),
             key="find_task_selector"
         )
@@ -81,22 +125,22 @@ if df_original is not None and users_df is not None:
                 with st.form(f"edit_form_{task_id}"):
                     e_col1, e_col2 = st.columns(2)
                     with e_col1:
-                        assignment_options = sorted(df_original['ASSIGNMENT TITLE'].dropna().unique().tolist())
+                        assignment_options = data_manager.facet_values('ASSIGNMENT TITLE')
                         current_assignment = task_row['ASSIGNMENT TITLE']
                         assignment_idx = assignment_options.index(current_assignment) if current_assignment in assignment_options else 0
                         edit_assignment = st.selectbox("Assignment Title", options=assignment_options, index=assignment_idx)
 
-                        bucket_opts = sorted(df_original['PLANNER BUCKET'].dropna().unique().tolist())
+                        bucket_opts = data_manager.facet_values('PLANNER BUCKET')
                         current_bucket = task_row['PLANNER BUCKET']
                         bucket_idx = bucket_opts.index(current_bucket) if current_bucket in bucket_opts else 0
                         edit_bucket = st.selectbox("Planner Bucket", options=bucket_opts, index=bucket_idx)
 
-                        semester_opts = sorted(df_original['SEMESTER'].dropna().unique().tolist())
+                        semester_opts = data_manager.facet_values('SEMESTER')
                         current_semester = task_row['SEMESTER']
                         semester_idx = semester_opts.index(current_semester) if current_semester in semester_opts else 0
                         edit_semester = st.selectbox("Semester", options=semester_opts, index=semester_idx)
 
-                        fy_opts = sorted(df_original['Fiscal Year'].dropna().unique().tolist())
+                        fy_opts = data_manager.facet_values('Fiscal Year')
                         current_fy = task_row['Fiscal Year']
                         fy_idx = fy_opts.index(current_fy) if current_fy in fy_opts else 0
                         edit_fy = st.selectbox("Fiscal Year", options=fy_opts, index=fy_idx, format_func=lambda x: data_manager.format_fy(x))
@@ -104,7 +148,7 @@ if df_original is not None and users_df is not None:
                     with e_col2:
                         edit_task_desc = st.text_area("Task Description", value=str(task_row['TASK']))
 
-                        audience_opts = sorted(df_original['AUDIENCE'].dropna().unique().tolist())
+                        audience_opts = data_manager.facet_values('AUDIENCE')
                         current_audience = task_row['AUDIENCE']
                         audience_idx = audience_opts.index(current_audience) if current_audience in audience_opts else 0
                         edit_audience = st.selectbox("Audience", options=audience_opts, index=audience_idx)
@@ -137,7 +181,7 @@ if df_original is not None and users_df is not None:
                         df_updated.loc[mask, 'END'] = pd.to_datetime(edit_end)
 
                         user_email = st.session_state.logged_in_user
-                        if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Find and Filter"):
+                        if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Find and Filter", shown_versions=shown_versions):
                             st.success("Task updated successfully!")
                             st.rerun()
                         else:
@@ -149,7 +193,7 @@ if df_original is not None and users_df is not None:
                 if st.button("🗑️ Confirm Delete", type="primary", key=f"delete_{task_id}"):
                     df_updated = df_original[df_original['#'] != task_id].copy()
                     user_email = st.session_state.logged_in_user
-                    if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Find and Filter"):
+                    if data_manager.save_and_log_changes(df_original, df_updated, user_email, "Find and Filter", shown_versions=shown_versions):
                         st.success(f"Task #{task_id} deleted and logged.")
                         st.rerun()
                     else:
@@ -198,13 +242,12 @@ if df_original is not None and users_df is not None:
             # --- ICS EXPORT FOR SELECTED TASK ---
             st.markdown("---")
             st.subheader("📅 Export to Calendar")
-            single_df = df_original[df_original['#'] == task_id].copy()
-            single_df = single_df[pd.notna(single_df['START']) & pd.notna(single_df['END'])]
-            if not single_df.empty:
-                ics_bytes = ics_export.generate_ics_from_df(single_df)
+            single_df = df_original[df_original['#'] == task_id]
+            single_build = data_manager.build_calendar(task_keys=zip(single_df['#'], single_df['Fiscal Year']))
+            if single_build is not None and single_build['event_count']:
                 st.download_button(
                     label=f"📥 Download .ics for task #{task_id}",
-                    data=ics_bytes,
+                    data=single_build['ics'],
                     file_name=f"task_{task_id}.ics",
                     mime="text/calendar"
                 )
@@ -212,13 +255,22 @@ if df_original is not None and users_df is not None:
     # --- ICS EXPORT FOR ALL FILTERED TASKS ---
     st.markdown("---")
     st.subheader("📅 Export Filtered Tasks to Calendar")
-    export_df = filtered_df.copy()
-    export_df = export_df[pd.notna(export_df['START']) & pd.notna(export_df['END'])]
-    if not export_df.empty:
-        ics_bytes = ics_export.generate_ics_from_df(export_df)
+    # Same selection as the results table (every page); a search narrows it to the matched rows by key
+    export_keys = None
+    if search_term and search_in_memory:
+        export_keys = zip(filtered_df['#'], filtered_df['Fiscal Year'])
+    elif search_term:
+        all_hits = data_manager.search_tasks(search_term, filters=search_filters, limit=None)
+        export_keys = zip(all_hits['#'], all_hits['Fiscal Year']) if all_hits is not None else []
+    export_build = data_manager.build_calendar(
+        years=search_filters['years'],
+        buckets=search_filters['buckets'],
+        task_keys=export_keys,
+    )
+    if export_build is not None and export_build['event_count']:
         st.download_button(
-            label=f"📥 Download .ics for all {len(export_df)} filtered tasks",
-            data=ics_bytes,
+            label=f"📥 Download .ics for all {export_build['event_count']} filtered tasks",
+            data=export_build['ics'],
             file_name="filtered_tasks_calendar.ics",
             mime="text/calendar",
             key="download_filtered_ics"
@@ -21,7 +21,7 @@ if df_original is not None:
         st.markdown("**Assignment Title**")
         assignment_title_sel = st.selectbox(
             "Select existing Assignment Title",
-            options=sorted(df_original['ASSIGNMENT TITLE'].dropna().unique().tolist()),
+            options=data_manager.facet_values('ASSIGNMENT TITLE'),
             key="at_sel"
         )
         assignment_title_new = st.text_input("Or enter a new Assignment Title (overrides selection above if filled):", key="at_new")
@@ -32,7 +32,7 @@ if df_original is not None:
         st.markdown("**Planner Bucket**")
         planner_bucket_sel = st.selectbox(
             "Select existing Planner Bucket",
-            options=sorted(df_original['PLANNER BUCKET'].dropna().unique().tolist()),
+            options=data_manager.facet_values('PLANNER BUCKET'),
             key="pb_sel"
         )
         planner_bucket_new = st.text_input("Or enter a new Planner Bucket (overrides selection above if filled):", key="pb_new")
@@ -41,14 +41,14 @@ if df_original is not None:
         st.markdown("**Semester**")
         semester_sel = st.selectbox(
             "Select existing Semester",
-            options=sorted(df_original['SEMESTER'].dropna().unique().tolist()),
+            options=data_manager.facet_values('SEMESTER'),
             key="sem_sel"
         )
         semester_new = st.text_input("Or enter a new Semester value (overrides selection above if filled):", key="sem_new")
 
         fiscal_year = st.selectbox(
             "Fiscal Year",
-            options=sorted(df_original['Fiscal Year'].dropna().unique().tolist()),
+            options=data_manager.facet_values('Fiscal Year'),
             format_func=lambda x: data_manager.format_fy(x)
         )
 
@@ -56,7 +56,7 @@ if df_original is not None:
         st.markdown("**Audience**")
         audience_sel = st.selectbox(
             "Select existing Audience",
-            options=sorted(df_original['AUDIENCE'].dropna().unique().tolist()),
+            options=data_manager.facet_values('AUDIENCE'),
             key="aud_sel"
         )
         audience_new = st.text_input("Or enter a new Audience value (overrides selection above if filled):", key="aud_new")
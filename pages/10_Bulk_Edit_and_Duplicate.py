@@ -14,6 +14,8 @@ if 'logged_in_user' not in st.session_state or st.session_state.logged_in_user i
 st.title("⚙️ Bulk Edit & Duplicate Tasks")
 
 df_original = data_manager.load_table('tasks')
+# Row versions as shown on the previous run, i.e. when the user made the edits being saved
+shown_versions = data_manager.shown_row_versions('bulk_edit', df_original)
 
 if df_original is not None:
     st.info("Select a Planner Bucket and Fiscal Year to filter the data you want to manage.")
@@ -21,11 +23,11 @@ if df_original is not None:
     # --- 1. FILTERS ---
     col1, col2 = st.columns(2)
     with col1:
-        bucket_options = sorted(df_original['PLANNER BUCKET'].dropna().unique().tolist())
+        bucket_options = data_manager.facet_values('PLANNER BUCKET')
         selected_bucket = st.selectbox("Filter by Planner Bucket", options=bucket_options)
     with col2:
         # Ensure only valid integer years are in the options
-        year_values = pd.to_numeric(df_original['Fiscal Year'], errors='coerce').dropna().unique()
+        year_values = pd.to_numeric(pd.Series(data_manager.facet_values('Fiscal Year')), errors='coerce').dropna()
         year_options = sorted([int(y) for y in year_values])
         selected_year = st.selectbox("Filter by Fiscal Year", options=year_options, index=len(year_options)-1 if year_options else 0, format_func=lambda x: data_manager.format_fy(x))
 
@@ -53,7 +55,7 @@ if df_original is not None:
                 "Delete": st.column_config.CheckboxColumn(required=True),
                 "ASSIGNMENT TITLE": st.column_config.SelectboxColumn(
                     "Assignment Title",
-                    options=sorted(df_original['ASSIGNMENT TITLE'].dropna().unique().tolist()),
+                    options=data_manager.facet_values('ASSIGNMENT TITLE'),
                     required=False
                 ),
                 "PROGRESS": st.column_config.SelectboxColumn(
@@ -63,12 +65,12 @@ if df_original is not None:
                 ),
                 "SEMESTER": st.column_config.SelectboxColumn(
                     "Semester",
-                    options=sorted(df_original['SEMESTER'].dropna().unique().tolist()),
+                    options=data_manager.facet_values('SEMESTER'),
                     required=False
                 ),
                 "AUDIENCE": st.column_config.SelectboxColumn(
                     "Audience",
-                    options=sorted(df_original['AUDIENCE'].dropna().unique().tolist()),
+                    options=data_manager.facet_values('AUDIENCE'),
                     required=False
                 ),
                 "START": st.column_config.DateColumn("Start Date", format="MM-DD-YYYY, dddd"),
@@ -81,7 +83,7 @@ if df_original is not None:
             if st.button("Save Quick Changes"):
                 df_updated = df_original.copy()
                 df_updated.update(edited_df.drop(columns=['Delete']))
-                if data_manager.save_and_log_changes(df_original, df_updated):
+                if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                     st.success("Changes saved and logged successfully!")
                     st.rerun()
         with col_delete:
@@ -90,7 +92,7 @@ if df_original is not None:
                 if not rows_to_delete.empty:
                     indices_to_delete = rows_to_delete.index
                     df_after_delete = df_original.drop(indices_to_delete)
-                    if data_manager.save_and_log_changes(df_original, df_after_delete):
+                    if data_manager.save_and_log_changes(df_original, df_after_delete, shown_versions=shown_versions):
                         st.success(f"Successfully deleted and logged {len(indices_to_delete)} task(s)!")
                         st.rerun()
                 else:
@@ -103,14 +105,14 @@ if df_original is not None:
                 new_task_desc = st.text_input("Task Description", key="new_task_desc")
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    at_options = sorted(df_original['ASSIGNMENT TITLE'].dropna().unique().tolist())
+                    at_options = data_manager.facet_values('ASSIGNMENT TITLE')
                     new_assignment = st.selectbox("Assignment Title", options=at_options, key="new_at_sel")
                     new_assignment_custom = st.text_input("Or type a new Assignment Title:", key="new_at_custom")
-                    sem_options = sorted(df_original['SEMESTER'].dropna().unique().tolist())
+                    sem_options = data_manager.facet_values('SEMESTER')
                     new_semester = st.selectbox("Semester", options=sem_options, key="new_sem_sel")
                     new_semester_custom = st.text_input("Or type a new Semester:", key="new_sem_custom")
                 with col_b:
-                    aud_options = sorted(df_original['AUDIENCE'].dropna().unique().tolist())
+                    aud_options = data_manager.facet_values('AUDIENCE')
                     new_audience = st.selectbox("Audience", options=aud_options, key="new_aud_sel")
                     new_audience_custom = st.text_input("Or type a new Audience:", key="new_aud_custom")
                     new_progress = st.selectbox("Progress", options=["NOT STARTED", "IN PROGRESS", "COMPLETE"], key="new_progress")
@@ -133,7 +135,7 @@ if df_original is not None:
                         record['START'] = pd.to_datetime(new_start)
                         record['END'] = pd.to_datetime(new_end)
                         df_updated = pd.concat([df_original, pd.DataFrame([record])], ignore_index=True)
-                        if data_manager.save_and_log_changes(df_original, df_updated):
+                        if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                             st.success("Task added successfully!")
                             st.rerun()
 
@@ -285,46 +287,7 @@ if df_original is not None:
                     if st.button("Preview changes (dry-run)"):
                         proposed = build_proposed_df()
                         # Build a row-by-row diff: for updated rows, show fields that changed
-                        diffs = []
-                        key = '#'
-                        compare_cols = [c for c in df_original.columns if c != key]
-
-                        # Build dicts for quick lookup
-                        orig_map = df_original.set_index(key).to_dict(orient='index')
-                        prop_map = proposed.set_index(key).to_dict(orient='index')
-
-                        # Check for updates and appends
-                        for pid, prow in prop_map.items():
-                            pid_str = str(pid)
-                            if pid_str in [str(x) for x in orig_map.keys()]:
-                                orig = orig_map[pid]
-                                for col in compare_cols:
-                                    o = orig.get(col, None)
-                                    n = prow.get(col, None)
-                                    # Normalize datetimes to strings for comparison
-                                    try:
-                                        if hasattr(o, 'to_pydatetime'):
-                                            o = str(o)
-                                    except Exception:
-                                        pass
-                                    try:
-                                        if hasattr(n, 'to_pydatetime'):
-                                            n = str(n)
-                                    except Exception:
-                                        pass
-                                    if pd.isna(o) and pd.isna(n):
-                                        continue
-                                    if (o is None and n is None) or (o == n):
-                                        continue
-                                    diffs.append({'#': pid, 'action': 'UPDATE', 'field': col, 'old': o, 'new': n})
-                            else:
-                                # New appended row
-                                for col in compare_cols:
-                                    n = prow.get(col, None)
-                                    if n is not None and not (pd.isna(n)):
-                                        diffs.append({'#': pid, 'action': 'APPEND', 'field': col, 'old': '', 'new': n})
-
-                        diffs_df = pd.DataFrame(diffs)
+                        diffs_df = data_manager.diff_upload(df_original, proposed)
                         st.subheader("Preview of changes")
                         if diffs_df.empty:
                             st.info("No changes detected between current data and uploaded file (with selected options).")
@@ -364,7 +327,7 @@ if df_original is not None:
                                 import io
                                 proposed_df = pd.read_csv(io.StringIO(st.session_state['bulk_upload_proposed_csv']))
 
-                            if data_manager.save_and_log_changes(df_original, proposed_df):
+                            if data_manager.save_and_log_changes(df_original, proposed_df, shown_versions=shown_versions):
                                 st.success("Proposed changes applied and logged successfully!")
                                 # clear preview cache
                                 del st.session_state['bulk_upload_proposed_csv']
@@ -396,7 +359,7 @@ if df_original is not None:
             if st.button("💾 Save Progress Updates", key="save_progress_updates"):
                 df_updated = df_original.copy()
                 df_updated.update(edited_progress_df)
-                if data_manager.save_and_log_changes(df_original, df_updated):
+                if data_manager.save_and_log_changes(df_original, df_updated, shown_versions=shown_versions):
                     st.success("Progress updates saved successfully!")
                     st.rerun()
 
@@ -421,7 +384,7 @@ if df_original is not None:
         last_id = df_original['#'].max()
         duplicated_tasks['#'] = range(last_id + 1, last_id + 1 + len(duplicated_tasks))
         df_after_duplication = pd.concat([df_original, duplicated_tasks], ignore_index=True)
-        if data_manager.save_and_log_changes(df_original, df_after_duplication):
+        if data_manager.save_and_log_changes(df_original, df_after_duplication, shown_versions=shown_versions):
             st.success(f"Successfully duplicated and logged {len(duplicated_tasks)} tasks to {data_manager.format_fy(new_fy)}!")
             st.balloons()
             st.rerun()
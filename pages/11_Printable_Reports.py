@@ -307,6 +307,8 @@ def find_task_bucket_duplicates(df):
 # --- Page UI ---
 st.title("📄 Printable Reports")
 df = data_manager.load_table('tasks')
+# Row versions as shown on the previous run, i.e. when the user made the edits being saved
+shown_versions = data_manager.shown_row_versions('printable_reports', df)
 
 if df is not None:
     st.subheader("Summary Report")
@@ -318,10 +320,10 @@ if df is not None:
     st.subheader("Planner Bucket Breakdown")
     col1, col2 = st.columns(2)
     with col1:
-        bucket_options = sorted(df['PLANNER BUCKET'].unique().tolist())
+        bucket_options = data_manager.facet_values('PLANNER BUCKET')
         selected_bucket = st.selectbox("Select a Planner Bucket", options=bucket_options)
     with col2:
-        year_options_bucket = sorted(df['Fiscal Year'].unique().tolist())
+        year_options_bucket = data_manager.facet_values('Fiscal Year')
         selected_year_bucket = st.selectbox("Select a Fiscal Year", options=year_options_bucket, format_func=lambda x: data_manager.format_fy(x))
     if selected_bucket and selected_year_bucket:
         st.download_button(
@@ -334,7 +336,7 @@ if df is not None:
     st.subheader("Calendar Report (List Format)")
     col1, col2 = st.columns(2)
     with col1:
-        year_options = sorted(df['Fiscal Year'].unique().tolist())
+        year_options = data_manager.facet_values('Fiscal Year')
         selected_year_cal = st.selectbox("Select a Year", options=year_options, index=len(year_options)-1, format_func=lambda x: data_manager.format_fy(x))
     with col2:
         month_names = [py_calendar.month_name[i] for i in range(1, 13)]
@@ -364,7 +366,7 @@ if df is not None:
     st.subheader("Fiscal Year Comparison Report")
     col1, col2 = st.columns(2)
     with col1:
-        year_options_comp = sorted(df['Fiscal Year'].unique().tolist())
+        year_options_comp = data_manager.facet_values('Fiscal Year')
         year1 = st.selectbox("Select the first year (older)", options=year_options_comp, index=0, format_func=lambda x: data_manager.format_fy(x))
     with col2:
         year2 = st.selectbox("Select the second year (newer)", options=year_options_comp, index=len(year_options_comp)-1, format_func=lambda x: data_manager.format_fy(x))
@@ -382,7 +384,7 @@ if df is not None:
     
     st.markdown("---")
     st.subheader("Bucket Task Timeline (3 Years)")
-    year_options_timeline = sorted(df['Fiscal Year'].unique().tolist())
+    year_options_timeline = data_manager.facet_values('Fiscal Year')
     default_years = year_options_timeline[-3:] if len(year_options_timeline) >= 3 else year_options_timeline
     selected_years = st.multiselect("Pick exactly three fiscal years", options=year_options_timeline, default=default_years, format_func=lambda x: data_manager.format_fy(x))
     if len(selected_years) == 3:
@@ -412,7 +414,7 @@ if df is not None:
             if st.button("Delete selected duplicates", type="primary", disabled=len(selected_rows) == 0):
                 updated_df = df.drop(index=selected_rows).copy()
                 user_email = getattr(st.session_state, 'logged_in_user', 'system')
-                if data_manager.save_and_log_changes(df, updated_df, user_email=user_email, source_page="Duplicate Task Cleaner"):
+                if data_manager.save_and_log_changes(df, updated_df, user_email=user_email, source_page="Duplicate Task Cleaner", shown_versions=shown_versions):
                     st.success(f"Deleted {len(selected_rows)} duplicate task(s).")
                     st.rerun()
                 else:
@@ -424,7 +426,7 @@ if df is not None:
                 removed_count = len(df) - len(cleaned_df)
                 if removed_count > 0:
                     user_email = getattr(st.session_state, 'logged_in_user', 'system')
-                    if data_manager.save_and_log_changes(df, cleaned_df, user_email=user_email, source_page="Duplicate Task Cleaner (auto)"):
+                    if data_manager.save_and_log_changes(df, cleaned_df, user_email=user_email, source_page="Duplicate Task Cleaner (auto)", shown_versions=shown_versions):
                         st.success(f"Automatically removed {removed_count} duplicate row(s).")
                         st.rerun()
                     else:
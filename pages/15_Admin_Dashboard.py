@@ -59,6 +59,95 @@ if all(df is not None for df in [icons_df_original, tasks_df_original, users_df_
             except Exception as e:
                 st.error(f"Failed to generate/publish calendar: {e}")
 
+    # --- Table cache statistics ---
+    with st.expander("Table Cache Statistics"):
+        st.write("Tables are cached in memory for all sessions until they are written again. Hit rates show how often a page was served without querying the database.")
+        cache_stats = data_manager.get_table_cache_stats()
+        st.caption(f"Current data version: {data_manager.get_data_version()}")
+        if cache_stats.empty:
+            st.info("No tables have been loaded yet.")
+        else:
+            st.dataframe(cache_stats, hide_index=True, width='stretch')
+        if st.button("Clear table cache"):
+            data_manager.clear_table_cache()
+            st.success("Table cache cleared. The next page load will read from the database.")
+
+    # --- Search index ---
+    with st.expander("Task Search Index"):
+        st.write("Find & Filter searches a full-text index of task names, buckets, assignment titles, audiences, semesters and comments. Saves made in the app keep it current; rebuild it after the database was changed by other means (imports, scripts, restores).")
+        if st.button("Rebuild search index"):
+            indexed = data_manager.rebuild_search_index()
+            if indexed is not None:
+                st.success(f"Search index rebuilt ({indexed:,} tasks).")
+            else:
+                st.info("This database has no full-text search index; searches scan the task columns instead.")
+
+    # --- Dashboard summary ---
+    with st.expander("Dashboard Summary"):
+        st.write("The Dashboard's task counts and charts are read from a summary table that task saves keep current and that is rebuilt once a day. Rebuild it after the database was changed by other means (imports, scripts, restores).")
+        if st.button("Rebuild dashboard summary"):
+            if data_manager.rebuild_dashboard_summary():
+                st.success("Dashboard summary rebuilt.")
+
+    # --- Database connection pool ---
+    with st.expander("Database Connection Pool"):
+        st.write("How long page loads waited for a database connection. Sustained waits or timeouts mean the pool is too small (set DB_POOL_SIZE / DB_MAX_OVERFLOW in the environment or secrets).")
+        pool_stats = data_manager.get_pool_stats()
+        st.dataframe(pd.DataFrame([pool_stats]), hide_index=True, width='stretch')
+        if st.button("Reset pool statistics"):
+            data_manager.reset_pool_stats()
+            st.success("Pool statistics reset.")
+
+    # --- Function timings ---
+    with st.expander("Function Timings"):
+        st.write("How long data_manager functions (and the phases of saves, table loads and calendar builds) took in this app process. Percentiles are in milliseconds; the slowest totals are listed first.")
+        timing_windows = {"Last 5 minutes": 300, "Last hour": 3600, "Last 24 hours": 86400, "Since start (or reset)": None}
+        timing_window = st.selectbox("Window", options=list(timing_windows), index=1, key="timing_window")
+        timing_stats = data_manager.get_timing_stats(timing_windows[timing_window])
+        if not data_manager.TIMING_ENABLED:
+            st.info("Timing is turned off (TIMING_ENABLED=false).")
+        elif timing_stats.empty:
+            st.info("No calls recorded in this window.")
+        else:
+            st.dataframe(timing_stats, hide_index=True, width='stretch')
+        st.caption(f"Keeps the last {data_manager.TIMING_BUFFER_SIZE:,} spans in memory"
+                   + (f"; also appended to {data_manager.TIMING_LOG}." if data_manager.TIMING_LOG else "."))
+        if st.button("Reset timings"):
+            data_manager.reset_timing_stats()
+            st.success("Timings reset.")
+
+    # --- Page profiling ---
+    with st.expander("Page Profiling"):
+        st.write("When on, every rerun of a page records its total time, database queries, DataFrame copies and rows handled. Admins also see the numbers for their own reruns in the sidebar.")
+        profiling = st.toggle("Profile page reruns (this app process)", value=data_manager.PAGE_PROFILING,
+                              key="page_profiling")
+        if profiling != data_manager.PAGE_PROFILING:
+            data_manager.set_page_profiling(profiling)
+        include_log = bool(data_manager.PAGE_PROFILE_LOG) and st.checkbox(
+            f"Include earlier sessions from {data_manager.PAGE_PROFILE_LOG}", key="page_profile_include_log")
+        if include_log:
+            page_stats = data_manager.summarize_page_profiles(data_manager.read_page_profile_log())
+        else:
+            page_stats = data_manager.get_page_profile_stats()
+        if page_stats.empty:
+            st.info("No page runs profiled yet.")
+        else:
+            st.dataframe(page_stats, hide_index=True, width='stretch')
+        st.caption("PAGE_PROFILING=true turns profiling on at startup; PAGE_PROFILE_LOG=pages.jsonl appends every run to that file.")
+        if st.button("Reset page profiles"):
+            data_manager.reset_page_profiles()
+            st.success("Page profiles reset.")
+
+    # --- Background jobs ---
+    with st.expander("Background Jobs"):
+        st.write("Calendar publishing and comment emails run in the background after a save. Failed jobs are retried a few times before being marked failed.")
+        job_counts, recent_jobs = data_manager.get_job_stats()
+        if job_counts.empty:
+            st.info("No background jobs have been queued yet.")
+        else:
+            st.dataframe(job_counts, hide_index=True, width='stretch')
+            st.dataframe(recent_jobs, hide_index=True, width='stretch')
+
     # --- Filter presets inspector ---
     with st.expander("Filter Presets Inspector"):
         st.write("Inspect and manage saved filter presets stored in the database.")
@@ -188,9 +277,7 @@ if all(df is not None for df in [icons_df_original, tasks_df_original, users_df_
             
             # 2. Save any administrative log entries we created for icon-only changes
             if log_entries and not tasks_were_updated:
-                new_log_df = pd.DataFrame(log_entries)
-                changelog_updated = pd.concat([changelog_df_original, new_log_df], ignore_index=True)
-                data_manager.save_table(changelog_updated, 'changelog')
+                data_manager.append_changelog_entries(log_entries)
             
             # 3. Save the final state of the icons table
             if data_manager.save_table(edited_icons_df, 'bucket_icons'):
@@ -0,0 +1,245 @@
+"""Time the app's heavy operations on synthetic databases of growing size.
+
+Usage:
+    python scripts/benchmark_suite.py [sizes] [--repeat N] [--save PATH] [--compare PATH] [--threshold PCT]
+
+    sizes        comma-separated task counts (default 1k,10k), e.g. 1k,10k,100k,1M
+    --repeat     runs per benchmark (default 3); the fastest and the median are reported
+    --save       where to write the results as JSON
+                 (default benchmark_results/<date>_<time>.json next to the app)
+    --compare    earlier results file; benchmarks more than --threshold percent
+                 (default 20) slower than there are reported, and the exit code is 1
+    --data-dir   where the synthetic databases are kept between runs (default: a temp dir)
+
+For every size, scripts/generate_synthetic_data.py builds a throwaway SQLite
+database, and a separate process (data_manager reads DB_CONNECTION_STRING when it
+is imported) times:
+  load_table (cold and warm), save_and_log_changes (ten edited tasks),
+  ICS generation (cold event cache and warm), the Printable Reports PDF builders,
+  the in-memory task search, the filter option counts, the dashboard summary (build
+  and read), the full-text search index (build and query) and the bulk upload diff.
+Benchmarks whose run time grows too fast to be useful at large sizes are skipped
+above a row limit and recorded as skipped. Background jobs triggered by the saves
+are queued but never run, so nothing is published.
+"""
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+# Row limits above which a benchmark is skipped
+PDF_FULL_LIST_MAX = 5000
+PDF_SUMMARY_MAX = 50000
+DIFF_MAX = 200000
+
+
+def option(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def page_functions(relative_path):
+    """The top-level imports and functions of a page, without running its UI code."""
+    path = os.path.join(ROOT, relative_path)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {'__name__': 'benchmarked_page'}
+    exec(compile(tree, path, 'exec'), namespace)
+    return namespace
+
+
+# --- Benchmarks (run inside the worker process) ---
+def run_benchmarks(n_tasks, repeat):
+    import pandas as pd
+    import data_manager
+    import ics_export
+
+    results = {}
+
+    def bench(name, fn, setup=None, limit=None):
+        if limit is not None and n_tasks > limit:
+            results[name] = {'skipped': f'more than {limit:,} tasks'}
+            return
+        runs = []
+        for _ in range(repeat):
+            args = setup() if setup else ()
+            started = time.perf_counter()
+            fn(*args)
+            runs.append(time.perf_counter() - started)
+        results[name] = {'min': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+    # load_table
+    def cold_load():
+        data_manager.clear_table_cache()
+        return ()
+    bench('load_table (cold)', lambda: data_manager.load_table('tasks'), setup=cold_load)
+    bench('load_table (warm)', lambda: data_manager.load_table('tasks'))
+    tasks = data_manager.load_table('tasks')
+
+    # save_and_log_changes: a Dashboard-sized edit of ten tasks
+    edits = {'count': 0}
+
+    def edited_copy():
+        original = data_manager.load_table('tasks')
+        updated = original.copy()
+        rows = updated.index[edits['count'] * 10 % len(updated):][:10]
+        edits['count'] += 1
+        updated.loc[rows, 'PROGRESS'] = updated.loc[rows, 'PROGRESS'].map(
+            lambda p: 'IN PROGRESS' if p != 'IN PROGRESS' else 'COMPLETE')
+        return original, updated
+    bench('save_and_log_changes (10 tasks)',
+          lambda original, updated: data_manager.save_and_log_changes(original, updated, 'bench@example.edu', 'Benchmark'),
+          setup=edited_copy)
+    tasks = data_manager.load_table('tasks')
+
+    # ICS generation
+    def cold_events():
+        ics_export.clear_event_cache()
+        return ()
+    bench('ics (cold event cache)', lambda: data_manager.generate_calendar_ics(tasks), setup=cold_events)
+    bench('ics (warm)', lambda: data_manager.generate_calendar_ics(tasks))
+
+    # Printable Reports
+    reports = page_functions(os.path.join('pages', '11_Printable_Reports.py'))
+    latest_year = int(tasks['Fiscal Year'].max())
+    bucket = tasks['PLANNER BUCKET'].mode().iloc[0]
+    bench('pdf summary', lambda: reports['create_summary_report'](tasks), limit=PDF_SUMMARY_MAX)
+    bench('pdf bucket report', lambda: reports['create_bucket_report'](tasks, bucket, latest_year))
+    bench('pdf full year', lambda: reports['create_full_year_report'](tasks, latest_year))
+    bench('pdf full list', lambda: reports['create_full_list_report'](tasks), limit=PDF_FULL_LIST_MAX)
+
+    # In-memory search (the helper the Dashboard and Find & Filter share): the cold run
+    # builds the search keys of the data version, warm runs only scan them
+    def cold_keys():
+        data_manager.clear_table_cache()
+        return ()
+    bench('find & filter search (cold keys)', lambda: data_manager.search_task_frame(tasks, 'inspection'),
+          setup=cold_keys)
+    bench('find & filter search', lambda: data_manager.search_task_frame(tasks, 'inspection'))
+
+    # Filter options: every facet counted in the database, with an empty cache each run
+    bench('facet_counts', lambda: data_manager.facet_counts(), setup=cold_keys)
+
+    # Dashboard summary: the first read builds it, later ones only sum it
+    bench('dashboard summary build', data_manager.rebuild_dashboard_summary)
+    bench('get_dashboard_summary', lambda: data_manager.get_dashboard_summary('All', 30))
+
+    # Full-text index: the first search builds it, later ones only query it
+    bench('search index build', data_manager.rebuild_search_index)
+    bench('search_tasks (top 50)', lambda: data_manager.search_tasks('safety inspection'))
+    bench('search_tasks_page (page 3)', lambda: data_manager.search_tasks_page('', page=3, page_size=50))
+
+    # Bulk upload diff: 1% of the tasks changed plus 100 new rows
+    def upload():
+        proposed = tasks.copy()
+        changed = proposed.index[::100]
+        proposed.loc[changed, 'TASK'] = proposed.loc[changed, 'TASK'] + ' (updated)'
+        new_rows = tasks.tail(100).copy()
+        new_rows['#'] = new_rows['#'] + int(tasks['#'].max())
+        return tasks, pd.concat([proposed, new_rows], ignore_index=True)
+    bench('bulk upload diff', data_manager.diff_upload, setup=upload, limit=DIFF_MAX)
+    return results
+
+
+def worker(n_tasks, repeat):
+    """Entry point of the per-size process; prints the results as JSON on the last line."""
+    results = run_benchmarks(n_tasks, repeat)
+    print(json.dumps(results))
+
+
+# --- Driver ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print benchmarks that got slower than in the baseline file. Returns how many did."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (threshold {threshold:.0f}%):")
+    for size, benches in results.items():
+        for name, timing in benches.items():
+            before = baseline.get(size, {}).get(name, {})
+            if 'min' not in timing or 'min' not in before:
+                continue
+            change = (timing['min'] - before['min']) / before['min'] * 100
+            flag = 'SLOWER' if change > threshold else ('faster' if change < -threshold else '')
+            regressions += flag == 'SLOWER'
+            print(f"  {size:>8} {name:<34} {before['min']:9.3f}s -> {timing['min']:9.3f}s {change:+7.1f}% {flag}")
+    return regressions
+
+
+def main():
+    import generate_synthetic_data
+
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith('--') and not sys.argv[i - 1].startswith('--')]
+    sizes = [generate_synthetic_data.parse_count(s) for s in (args[0] if args else '1k,10k').split(',')]
+    repeat = int(option('--repeat', 3))
+    threshold = float(option('--threshold', 20))
+    data_dir = option('--data-dir') or tempfile.mkdtemp(prefix='tracker_bench_')
+    os.makedirs(data_dir, exist_ok=True)
+    save_path = option('--save') or os.path.join(
+        ROOT, 'benchmark_results', datetime.now().strftime('%Y%m%d_%H%M%S') + '.json')
+
+    results = {}
+    for n in sizes:
+        db_path = os.path.join(data_dir, f'synthetic_{n}.db')
+        if not os.path.exists(db_path):
+            print(f"Generating {n:,} tasks in {db_path}")
+            generate_synthetic_data.generate(db_path, n, verbose=False)
+        env = dict(os.environ, DB_CONNECTION_STRING=f'sqlite:///{db_path}', JOB_WORKERS='1',
+                   JOB_COALESCE_DELAY='86400', S3_STANDIN_DIR=os.path.join(data_dir, 's3'))
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', str(n), str(repeat)],
+                              env=env, cwd=data_dir, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stdout[-2000:], proc.stderr[-4000:])
+            sys.exit(f"Benchmarks failed at {n:,} tasks")
+        results[str(n)] = json.loads(proc.stdout.strip().splitlines()[-1])
+        # The saves changed the database; start from fresh data next time
+        os.remove(db_path)
+
+        print(f"\n{n:,} tasks")
+        for name, timing in results[str(n)].items():
+            if 'skipped' in timing:
+                print(f"  {name:<34} skipped ({timing['skipped']})")
+            else:
+                print(f"  {name:<34} min {timing['min']:9.4f}s   median {timing['median']:9.4f}s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+    with open(save_path, 'w') as f:
+        json.dump({
+            'meta': {'date': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+                     'python': platform.python_version(), 'platform': platform.platform(), 'repeat': repeat},
+            'results': results,
+        }, f, indent=2)
+    print(f"\nResults saved to {save_path}")
+
+    baseline = option('--compare')
+    if baseline and compare(results, baseline, threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    if '--worker' in sys.argv:
+        i = sys.argv.index('--worker')
+        worker(int(sys.argv[i + 1]), int(sys.argv[i + 2]))
+    else:
+        main()
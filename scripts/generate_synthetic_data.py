@@ -0,0 +1,240 @@
+"""Fill a throwaway SQLite database with synthetic tracker data.
+
+Usage:
+    python scripts/generate_synthetic_data.py [tasks] [db_path] [--seed N]
+
+    tasks      number of tasks, e.g. 1000, 50k, 1M (default 10000)
+    db_path    database file to (re)create (default: synthetic_<tasks>.db next to the app)
+
+Tasks are spread over consecutive fiscal years ending with the current one (about
+1000 per year, between 3 and 12 years; larger sizes make the years denser) with the app's planner buckets, assignment titles and progress values, and
+the users, comments, notifications and changelog rows are scaled to match. Every
+table is created from db_schema, so the database has the same keys and indexes as a
+real one. Point the app or a script at it with:
+
+    DB_CONNECTION_STRING=sqlite:///path/to/synthetic.db streamlit run Main.py
+
+The database is replaced if it exists; never point this at project_tracker.db.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import db_schema  # noqa: E402
+
+BUCKETS = [
+    'Academic', 'Admissions and Orientation', 'Billing and Financial', 'Budget and Rate Development',
+    'Camps and Conferences', 'Campus Events', 'Fall Closing', 'Fall Opening', 'Health and Life Safety',
+    'Housing Applications and Assignments', 'Planning', 'Policy and Contract', 'Professional Development',
+    'Recognition', 'Residential Curriculum', 'Spring Closing', 'Spring Opening', 'Staff Training and Development',
+    'Student Leadership', 'Student Staff Selection', 'Summer Closing', 'Summer Opening', 'Theme Meal',
+]
+ICONS = ['📚', '🎓', '💵', '📊', '🏕️', '🎉', '🍂', '🏫', '🚑', '🏠', '🗓️', '📜', '🧑‍🏫',
+         '🏆', '📖', '🌷', '🌱', '👥', '⭐', '📝', '☀️', '🌞', '🍽️']
+TITLES = [
+    'Director', 'Associate Director', 'Assistant Director - Operations', 'Assistant Director - Residence Life',
+    'Residence Hall Director', 'Area Coordinator', 'Marketing/ARH', 'Dining', 'Facilities', 'Business Office',
+    'Assignments Coordinator', 'Conference Services', 'Student Conduct', 'IT Support', 'Custodial Supervisor',
+    'Graduate Assistant', 'Administrative Assistant',
+]
+VERBS = ['Plan', 'Review', 'Submit', 'Schedule', 'Order', 'Update', 'Confirm', 'Prepare', 'Train', 'Publish']
+OBJECTS = ['welcome packets', 'staff schedule', 'room inventory', 'budget request', 'event flyers',
+           'move-in plan', 'safety inspection', 'meal menu', 'survey results', 'contract renewals',
+           'key audit', 'door decorations', 'RA applications', 'closing checklist', 'training agenda']
+PROGRESS = ['NOT STARTED', 'IN PROGRESS', 'COMPLETE']
+SEMESTERS = ['Fall', 'Spring', 'Summer']
+AUDIENCES = ['Internal', 'External', 'Students', 'Staff']
+TASKS_PER_YEAR = 1000
+MIN_YEARS, MAX_YEARS = 3, 12
+# Tasks without dates are stored either empty or as Excel's zero date
+DATE_SENTINEL = pd.Timestamp('1900-12-30')
+# Changelog fields and the whole-task marker, as data_manager.build_changelog_entries() logs them
+EDITED_FIELDS = ['PROGRESS', 'START', 'END', 'TASK', 'ASSIGNMENT TITLE']
+ENTIRE_TASK = 'ENTIRE TASK'
+
+
+def parse_count(text):
+    text = str(text).strip().lower().replace('_', '')
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def make_users(n, rng):
+    first = np.array(['Alex', 'Jordan', 'Sam', 'Taylor', 'Casey', 'Morgan', 'Riley', 'Jamie', 'Avery', 'Quinn'])
+    last = np.array(['Olson', 'Nguyen', 'Berg', 'Hanson', 'Larson', 'Garcia', 'Schmidt', 'Kim', 'Johnson', 'Lee'])
+    emails = [f'user{i}@example.edu' for i in range(n)]
+    return pd.DataFrame({
+        'email': emails,
+        'password': 'synthetic',
+        'first_name': first[rng.integers(0, len(first), n)],
+        'last_name': last[rng.integers(0, len(last), n)],
+        'assignment_title': np.array(TITLES)[np.arange(n) % len(TITLES)],
+        'role': np.where(np.arange(n) < max(1, n // 10), 'admin', 'user'),
+        'status': np.where(rng.random(n) < 0.95, 'active', 'inactive'),
+    })
+
+
+def make_tasks(n, rng):
+    years = min(max(-(-n // TASKS_PER_YEAR), MIN_YEARS), MAX_YEARS)
+    today = pd.Timestamp.today()
+    last_year = today.year if today.month >= 7 else today.year - 1
+    fiscal_year = last_year - years + 1 + np.sort(rng.integers(0, years, n))
+    # Fiscal year N runs July N .. June N+1 (displayed as FY N+1)
+    start = (pd.to_datetime(pd.Series(fiscal_year.astype(str) + '-07-01'))
+             + pd.to_timedelta(rng.integers(0, 365, n), unit='D'))
+    end = start + pd.to_timedelta(rng.choice([0, 0, 0, 1, 2, 6, 13, 30], n), unit='D')
+    undated = rng.random(n)
+    start = start.mask(undated < 0.05).mask((undated >= 0.05) & (undated < 0.10), DATE_SENTINEL)
+    end = end.mask(undated < 0.05).mask((undated >= 0.05) & (undated < 0.10), DATE_SENTINEL)
+
+    names = (np.array(VERBS)[rng.integers(0, len(VERBS), n)].astype(object) + ' '
+             + np.array(OBJECTS)[rng.integers(0, len(OBJECTS), n)].astype(object))
+    # Some longer task names with punctuation, as typed in the real tracker
+    long_names = rng.random(n) < 0.1
+    names[long_names] = names[long_names] + ', then share with hall staff; see notes'
+
+    # Older years are mostly done, the current one mostly open
+    age = (fiscal_year.max() - fiscal_year) / max(1, years - 1)
+    progress = np.where(rng.random(n) < age, 'COMPLETE', np.array(PROGRESS)[rng.integers(0, 3, n)])
+    return pd.DataFrame({
+        '#': np.arange(1, n + 1),
+        'Fiscal Year': fiscal_year,
+        'SEMESTER': np.where(rng.random(n) < 0.3, np.array(SEMESTERS)[rng.integers(0, 3, n)], None),
+        'PLANNER BUCKET': np.array(BUCKETS)[rng.integers(0, len(BUCKETS), n)],
+        'TASK': names,
+        'ASSIGNMENT TITLE': np.array(TITLES)[rng.integers(0, len(TITLES), n)],
+        'AUDIENCE': np.where(rng.random(n) < 0.4, np.array(AUDIENCES)[rng.integers(0, 4, n)], None),
+        'START': start.to_numpy(),
+        'END': end.to_numpy(),
+        'PROGRESS': progress,
+        'row_version': rng.integers(1, 4, n),
+        'updated_at': pd.Timestamp.now().floor('s') - pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s'),
+    })
+
+
+def make_comments(tasks, users, n, rng):
+    now = pd.Timestamp.now().floor('s')
+    return pd.DataFrame({
+        'comment_id': np.arange(1, n + 1),
+        'task_id': tasks['#'].to_numpy()[rng.integers(0, len(tasks), n)],
+        'user_email': users['email'].to_numpy()[rng.integers(0, len(users), n)],
+        'timestamp': now - pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s'),
+        'comment_text': np.array(['Done, thanks!', 'Can we move this a week later?', 'Waiting on the vendor.',
+                                  'Added the draft to the shared drive.', 'Who owns this now?'])[rng.integers(0, 5, n)],
+    })
+
+
+def make_notifications(comments, users, n, rng):
+    pick = rng.integers(0, len(comments), n)
+    return pd.DataFrame({
+        'notification_id': np.arange(1, n + 1),
+        'user_email': users['email'].to_numpy()[rng.integers(0, len(users), n)],
+        'message': 'New comment on task #' + comments['task_id'].to_numpy()[pick].astype(str),
+        'is_read': rng.random(n) < 0.7,
+        'timestamp': comments['timestamp'].to_numpy()[pick],
+    })
+
+
+def _log_dates(values):
+    """Dates as the changelog shows them (YYYY-MM-DD, '' when empty)."""
+    return pd.Series(values).dt.strftime('%Y-%m-%d').fillna('').to_numpy(dtype=object)
+
+
+def make_changelog(tasks, users, n, rng):
+    now = pd.Timestamp.now().floor('s')
+    pick = rng.integers(0, len(tasks), n)
+    picked = tasks.iloc[pick].reset_index(drop=True)
+    action = np.where(rng.random(n) < 0.9, 'EDIT', 'ADD')
+    field = np.where(action == 'EDIT', np.array(EDITED_FIELDS)[rng.integers(0, len(EDITED_FIELDS), n)], ENTIRE_TASK)
+    fy_labels = pd.Series(picked['Fiscal Year'].to_numpy() + 1).astype(str).str[-2:]
+
+    # New Value is the task's current value of the changed field, Old Value a different
+    # value of the same field; ADD rows log the task name as the new value
+    names = picked['TASK'].to_numpy(dtype=object)
+    old_value = np.full(n, '', dtype=object)
+    new_value = names.copy()
+    for name in EDITED_FIELDS:
+        rows = field == name
+        if not rows.any():
+            continue
+        if name == 'PROGRESS' or name == 'ASSIGNMENT TITLE':
+            choices = PROGRESS if name == 'PROGRESS' else TITLES
+            current = pd.Index(choices).get_indexer(picked.loc[rows, name])
+            older = (current + rng.integers(1, len(choices), len(current))) % len(choices)
+            new_value[rows] = picked.loc[rows, name].to_numpy(dtype=object)
+            old_value[rows] = np.array(choices, dtype=object)[older]
+        elif name == 'TASK':
+            # The same task under a different verb
+            rest = pd.Series(names[rows]).str.split(' ', n=1).str[1].to_numpy(dtype=object)
+            verbs = np.array(VERBS, dtype=object)[rng.integers(0, len(VERBS), len(rest))]
+            old_value[rows] = np.where(verbs + ' ' + rest == names[rows], 'Draft ' + rest, verbs + ' ' + rest)
+        else:
+            dates = pd.to_datetime(picked.loc[rows, name])
+            moved = dates - pd.to_timedelta(rng.integers(1, 15, len(dates)), unit='D')
+            new_value[rows] = _log_dates(dates)
+            old_value[rows] = _log_dates(moved.fillna(DATE_SENTINEL))
+
+    return pd.DataFrame({
+        'Timestamp': np.sort((now - pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s')).to_numpy()),
+        'Action': action,
+        'Task ID': picked['#'].to_numpy().astype(str),
+        'User': users['email'].to_numpy()[rng.integers(0, len(users), n)],
+        'Source': ('Dashboard (FY' + fy_labels + ')').to_numpy(),
+        'Field Changed': field,
+        'Old Value': old_value,
+        'New Value': new_value,
+    })
+
+
+def generate(db_path, n_tasks, seed=0, verbose=True):
+    """(Re)create db_path with n_tasks synthetic tasks and matching users, comments,
+    notifications and changelog. Returns {table name: row count}."""
+    rng = np.random.default_rng(seed)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    engine = create_engine(f'sqlite:///{db_path}')
+    db_schema.reset_schema(engine)
+
+    users = make_users(max(20, n_tasks // 500), rng)
+    tasks = make_tasks(n_tasks, rng)
+    comments = make_comments(tasks, users, max(1, int(n_tasks * 0.3)), rng)
+    frames = {
+        'users': users,
+        'settings': pd.DataFrame({'email': users['email'], 'frequency': 'Weekly'}),
+        'bucket_icons': pd.DataFrame({'bucket_name': BUCKETS, 'icon': ICONS}),
+        'tasks': tasks,
+        'comments': comments,
+        'notifications': make_notifications(comments, users, max(1, int(n_tasks * 0.4)), rng),
+        'changelog': make_changelog(tasks, users, n_tasks * 2, rng),
+    }
+    counts = {}
+    for table_name, df in frames.items():
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            db_schema.coerce_frame(df, table_name).to_sql(table_name, conn, if_exists='append', index=False,
+                                                          chunksize=50000)
+        counts[table_name] = len(df)
+        if verbose:
+            print(f"  {table_name:<14} {len(df):>10,} rows  {time.perf_counter() - started:6.1f}s")
+    engine.dispose()
+    return counts
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    seed = int(sys.argv[sys.argv.index('--seed') + 1]) if '--seed' in sys.argv else 0
+    if '--seed' in sys.argv:
+        args.remove(str(seed))
+    n = parse_count(args[0]) if args else 10000
+    path = os.path.abspath(args[1] if len(args) > 1 else os.path.join(ROOT, f'synthetic_{n}.db'))
+    if os.path.basename(path) == 'project_tracker.db':
+        print("Refusing to overwrite project_tracker.db")
+        sys.exit(1)
+    print(f"Writing {n:,} synthetic tasks to {path}")
+    generate(path, n, seed=seed)
@@ -0,0 +1,71 @@
+"""Compare the columnar ICS serializer against the row-by-row one on synthetic tasks.
+
+Usage:
+    python scripts/ics_benchmark.py [sizes]     e.g. 1000,10000,100000 (the default)
+
+For every size the script checks that ics_export.generate_ics_from_df() produces
+exactly the same bytes as ics_export.generate_ics_rowwise(), then times:
+  - cold: empty event cache, every event serialized
+  - warm: the same frame again, every event served from the cache
+The row-wise serializer takes a while at 100k events.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ics_export  # noqa: E402
+
+SIZES = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1000, 10000, 100000]
+BUCKETS = ['Admin', 'Theme Meal', 'Marketing; Outreach', 'Training, Fall', 'Facilities']
+
+
+def make_tasks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-07-01') + pd.to_timedelta(rng.integers(0, 1000, n), unit='D')
+    # A quarter of the tasks are timed, the rest all-day
+    timed = rng.random(n) < 0.25
+    start = start + pd.to_timedelta(np.where(timed, rng.integers(8, 17, n), 0), unit='h')
+    end = start + pd.to_timedelta(rng.integers(0, 5, n), unit='D') + pd.to_timedelta(np.where(timed, 1, 0), unit='h')
+    df = pd.DataFrame({
+        '#': np.arange(1, n + 1),
+        'Fiscal Year': rng.integers(2024, 2027, n),
+        'PLANNER BUCKET': rng.choice(BUCKETS, n),
+        'TASK': [f"Task {i}, part {i % 7}; see notes\nline two" if i % 10 == 0 else f"Task {i}" for i in range(n)],
+        'START': start,
+        'END': end,
+        'ASSIGNMENT TITLE': rng.choice(['Director', 'RD, North Hall', ''], n),
+        'PROGRESS': rng.choice(['NOT STARTED', 'IN PROGRESS', 'COMPLETE', None], n),
+        'row_version': rng.integers(1, 5, n),
+        'updated_at': pd.Timestamp('2025-01-01 09:30') + pd.to_timedelta(rng.integers(0, 10 ** 7, n), unit='s'),
+    })
+    # Some unscheduled tasks, which are skipped
+    df.loc[rng.random(n) < 0.05, 'START'] = pd.NaT
+    return df
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+# Let the warm run hold every event, not just the app's default cache size
+ics_export._EVENT_CACHE_SIZE = max(ics_export._EVENT_CACHE_SIZE, max(SIZES))
+
+print(f"{'events':>8} {'row-wise':>10} {'columnar':>10} {'warm':>10} {'events/s (columnar)':>20}")
+for n in SIZES:
+    df = make_tasks(n)
+    ics_export.clear_event_cache()
+    reference, rowwise_s = timed(ics_export.generate_ics_rowwise, df)
+    ics_export.clear_event_cache()
+    columnar, columnar_s = timed(ics_export.generate_ics_from_df, df)
+    _, warm_s = timed(ics_export.generate_ics_from_df, df)
+    if columnar != reference:
+        print(f"{n:>8} OUTPUT DIFFERS from the row-wise serializer")
+        sys.exit(1)
+    events = columnar.count(b'BEGIN:VEVENT')
+    print(f"{events:>8} {rowwise_s:>9.3f}s {columnar_s:>9.3f}s {warm_s:>9.3f}s {events / columnar_s:>20,.0f}")
@@ -0,0 +1,52 @@
+"""Publish the calendar feeds into a local S3 stand-in and show what was uploaded.
+
+Usage:
+    python scripts/publish_standin.py [directory]      (default: ./s3_standin)
+
+data_manager.generate_and_publish_ics() is pointed at a directory instead of S3
+through S3_STANDIN_DIR, so no network access or AWS credentials are needed. The
+feeds are published twice: the second run should upload nothing because no
+content changed. (To exercise the real boto3 calls offline instead, run the app
+under moto's mock_aws with S3_BUCKET set.)
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STANDIN_DIR = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, 's3_standin'))
+sys.path.insert(0, ROOT)
+
+os.environ.update({'S3_STANDIN_DIR': STANDIN_DIR, 'S3_BUCKET': 'hrl-project-tracker', 'JOB_WORKERS': '0'})
+import data_manager  # noqa: E402  (must see the environment above)
+
+
+def stored_objects():
+    objects = {}
+    for folder, _, files in os.walk(STANDIN_DIR):
+        for name in files:
+            if not name.endswith('.meta.json'):
+                path = os.path.join(folder, name)
+                objects[os.path.relpath(path, STANDIN_DIR)] = os.path.getmtime(path)
+    return objects
+
+
+tasks = data_manager.load_table('tasks')
+for attempt in ('first publish', 'unchanged republish'):
+    before = stored_objects()
+    started = time.perf_counter()
+    url = data_manager.generate_and_publish_ics(tasks)
+    elapsed = time.perf_counter() - started
+    after = stored_objects()
+    written = [name for name, mtime in after.items() if before.get(name) != mtime]
+    print(f"{attempt}: {len(written)} of {len(after)} object(s) written in {elapsed:.2f}s -> {url}")
+
+main = os.path.join(STANDIN_DIR, 'hrl-project-tracker', 'calendar.ics')
+with open(main, 'rb') as f:
+    body = f.read()
+with open(main + '.meta.json') as f:
+    meta = json.load(f)
+print(f"calendar.ics: {len(body)} bytes stored, {len(gzip.decompress(body))} bytes uncompressed, "
+      f"{meta.get('ContentEncoding')}, sha256 {meta['Metadata']['content-sha256'][:12]}...")
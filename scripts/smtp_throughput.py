@@ -0,0 +1,88 @@
+"""Compare one-session-per-email against batched SMTP delivery using a local aiosmtpd server.
+
+Usage:
+    pip install aiosmtpd
+    python scripts/smtp_throughput.py [number_of_messages] [handshake_delay_ms]
+
+No real email is sent: data_manager is pointed at an in-process SMTP stand-in
+through the SMTP_* environment variables. handshake_delay_ms adds latency to
+every new connection, to mimic the TLS + login cost of a real provider.
+"""
+import asyncio
+import os
+import sys
+import time
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import SMTP as _SMTPServer
+except ImportError:
+    print("aiosmtpd is not installed: pip install aiosmtpd")
+    sys.exit(1)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+HANDSHAKE_DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 100.0) / 1000.0
+PORT = 8025
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+class SlowHandshakeController(Controller):
+    """aiosmtpd controller whose sessions pause before greeting, like a remote server."""
+
+    def factory(self):
+        return _SlowSMTP(self.handler, **self.SMTP_kwargs)
+
+
+class _SlowSMTP(_SMTPServer):
+    async def _handle_client(self):
+        await asyncio.sleep(HANDSHAKE_DELAY)
+        await super()._handle_client()
+
+
+handler = CountingHandler()
+controller = SlowHandshakeController(handler, hostname='127.0.0.1', port=PORT)
+controller.start()
+
+os.environ.update({
+    'SMTP_SERVER': '127.0.0.1',
+    'SMTP_PORT': str(PORT),
+    'SMTP_STARTTLS': 'false',
+    'SENDER_EMAIL': 'tracker@localhost',
+    'SENDER_PASSWORD': '',
+    'JOB_WORKERS': '0',
+})
+import data_manager  # noqa: E402  (must see the environment above)
+
+task = {'TASK': 'Benchmark task', 'PLANNER BUCKET': 'Admin', 'Fiscal Year': 2025, 'START': None, 'END': None}
+messages = [
+    (f'user{i}@localhost', data_manager._build_comment_email(f'user{i}@localhost', 'author@localhost', task, 'Hello'))
+    for i in range(COUNT)
+]
+
+try:
+    started = time.perf_counter()
+    for recipient, message in messages:
+        data_manager._deliver_email(recipient, message)
+    per_message = time.perf_counter() - started
+
+    started = time.perf_counter()
+    failures = data_manager.send_emails(messages)
+    batched = time.perf_counter() - started
+finally:
+    controller.stop()
+
+print(f"{COUNT} messages, {HANDSHAKE_DELAY * 1000:.0f} ms per handshake")
+print(f"  one session per message: {per_message:.3f}s ({COUNT / per_message:.1f} msg/s)")
+print(f"  batched (batch size {data_manager.SMTP_BATCH_SIZE}, {data_manager.SMTP_MAX_CONNECTIONS} connections): "
+      f"{batched:.3f}s ({COUNT / batched:.1f} msg/s), {len(failures)} failed")
+print(f"  server received {handler.received} messages")
@@ -0,0 +1,74 @@
+"""Check that a stale Gantt edit is reported as a conflict instead of overwriting.
+
+Usage:
+    python scripts/test_concurrent_edits.py
+
+Builds a small synthetic database in a temporary directory, opens the Gantt task
+form for one task, saves a change to the same task from another session, then
+submits the (now stale) form. The save must be refused with a conflict warning
+and the other session's change must still be in the database. Exits non-zero on
+failure.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+workdir = tempfile.mkdtemp(prefix='tracker_conflict_')
+db_path = os.path.join(workdir, 'conflict.db')
+os.environ['DB_CONNECTION_STRING'] = f'sqlite:///{db_path}'
+
+import generate_synthetic_data  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+generate_synthetic_data.generate(db_path, 200, verbose=False)
+import data_manager  # noqa: E402
+
+tasks = data_manager.load_table('tasks')
+dated = tasks[(tasks['START'].dt.year > 1901) & (tasks['END'].dt.year > 1901) & (tasks['PROGRESS'] != 'COMPLETE')]
+task = dated.iloc[0]
+task_id, fiscal_year = int(task['#']), int(task['Fiscal Year'])
+print(f'Editing task #{task_id} ({data_manager.format_fy(fiscal_year)})')
+
+# Session A opens the task form on the Gantt page
+page = AppTest.from_file(os.path.join(ROOT, 'pages', '05_Gantt_Chart_View.py'), default_timeout=120)
+page.session_state['logged_in_user'] = 'coordinator.a@example.edu'
+page.session_state['selected_task_id'] = task_id
+page.run()
+assert not page.exception, [e.value for e in page.exception]
+
+# Session B renames the same task and saves it
+other = data_manager.load_table('tasks')
+renamed = other.copy()
+row = (renamed['#'] == task_id) & (renamed['Fiscal Year'] == fiscal_year)
+renamed.loc[row, 'TASK'] = 'Renamed by another coordinator'
+assert data_manager.save_and_log_changes(other, renamed, 'coordinator.b@example.edu', 'Conflict test')
+
+# Session A now marks the task complete from the form it loaded before B's save
+next(box for box in page.selectbox if box.label == 'Progress').set_value('COMPLETE')
+next(button for button in page.button if button.label == 'Save Changes').click()
+page.run()
+assert not page.exception, [e.value for e in page.exception]
+
+warnings = [w.value for w in page.warning]
+stored = data_manager.load_table('tasks')
+stored = stored[(stored['#'] == task_id) & (stored['Fiscal Year'] == fiscal_year)].iloc[0]
+print('Warnings:', warnings)
+print('Stored:', stored['TASK'], '/', stored['PROGRESS'])
+
+failures = []
+if not any('changed since you loaded them' in w for w in warnings):
+    failures.append('the stale save was not reported as a conflict')
+if stored['TASK'] != 'Renamed by another coordinator':
+    failures.append("the other session's change was overwritten")
+if stored['PROGRESS'] == 'COMPLETE':
+    failures.append('the stale edit was written')
+
+data_manager.engine.dispose()
+if failures:
+    print('FAIL:', '; '.join(failures))
+    sys.exit(1)
+print('OK: the stale edit was refused and the other change kept')